@@ -2,19 +2,23 @@
 # backend/app.py
 # ================================
 import sys  # <-- Missing import
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, send_file, g
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import logging
+import hmac
 import os
 from datetime import datetime
+from functools import wraps
 
 # Import your modules (ensure they exist and are correct)
+# The heavy service modules are imported by ServiceContainer.build()
 try:
-    from models.ai_engine import AIQuotationEngine
-    from services.google_sheets import GoogleSheetsService
-    from services.quotation_service import QuotationService
+    from services.bootstrap import ServiceContainer
+    # Registers the sqlite:// limiter storage used by RATELIMIT_STORAGE_URI
+    import services.shared_store  # noqa: F401
+    from utils.helpers import cooperative_workers, run_cpu_bound
     from config import Config
 except Exception as e:
     logging.critical(f"❌ Failed to import required modules: {e}", exc_info=True)
@@ -30,6 +34,12 @@ app = Flask(__name__)
 # Apply config from Config class
 app.config.from_object(Config)
 
+# Behind nginx every request comes from 127.0.0.1; take the client address
+# from X-Forwarded-For so rate limits and request capture see real clients
+if Config.TRUSTED_PROXY_HOPS:
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXY_HOPS)
+
 # Configure CORS
 # Allow your frontend domain only (recommended for production)
 frontend_origin = os.getenv("FRONTEND_URL", "https://logistics-services-4ikv.onrender.com")
@@ -66,31 +76,63 @@ def after_request(response):
 def options_preflight(path):
     return jsonify({'status': 'preflight OK'}), 200
 
+# Opt-in request capture for load replay (tools/replay.py)
+if Config.CAPTURE_REQUESTS_FILE:
+    from utils.request_capture import RequestCapture
+    RequestCapture(Config.CAPTURE_REQUESTS_FILE, Config.CAPTURE_SAMPLE_RATE,
+                   secret=Config.CAPTURE_CLIENT_SECRET).init_app(app)
+
+# Per-request cProfile hooks for /api/admin/profile/cpu; only installed when
+# the admin endpoints are enabled, and a flag check while no profile runs
+if Config.ADMIN_TOKEN:
+    from utils.profiling import profiler
+
+    @app.before_request
+    def start_request_profile():
+        g.request_profile = profiler.request_started()
+
+    @app.teardown_request
+    def finish_request_profile(exc):
+        profiler.request_finished(g.pop('request_profile', None))
+
 # Rate limiting
 try:
     limiter = Limiter(
         app=app,
         key_func=get_remote_address,
         default_limits=["200 per day", "50 per hour"],
-        storage_uri="memory://"  # Use in-memory storage (Render doesn't support Redis on free tier)
+        # memory:// per worker; sqlite:// or redis:// share counters across
+        # workers and instances, falling back to memory if the store fails
+        storage_uri=Config.RATELIMIT_STORAGE_URI,
+        in_memory_fallback_enabled=True
     )
     limiter.init_app(app)
 except Exception as e:
     logger.warning(f"⚠️ Rate limiter failed to initialize: {e}")
 
 # Initialize services (with error fallback)
-sheets_service = None
-ai_engine = None
-quotation_service = None
+# With LAZY_STARTUP the services are built in a background thread and the
+# data routes answer 503 until they are ready; otherwise startup blocks.
+services = ServiceContainer()
 
-try:
-    sheets_service = GoogleSheetsService()
-    ai_engine = AIQuotationEngine()
-    quotation_service = QuotationService(sheets_service, ai_engine)
-    logger.info("✅ Services initialized successfully")
-except Exception as e:
-    logger.critical(f"❌ Failed to initialize services: {e}", exc_info=True)
-    sys.exit(1)
+if Config.LAZY_STARTUP:
+    services.start_background(warm_up=True)
+else:
+    try:
+        services.build()
+    except Exception:
+        sys.exit(1)
+
+def requires_services(f):
+    """Return 503 while the services are still starting up; CORS preflights pass"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if request.method != 'OPTIONS' and not services.is_ready():
+            response = jsonify({'error': 'Service unavailable', 'startup': services.status()})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        return f(*args, **kwargs)
+    return decorated
 
 # === Routes ===
 
@@ -98,6 +140,11 @@ except Exception as e:
 def health():
     return {"status": "ok"}
 
+@app.route("/api/readyz")
+def readiness():
+    status = services.status()
+    return jsonify(status), (200 if status['ready'] else 503)
+
 @app.route("/api/health", methods=['GET'])
 def health_check():
     return jsonify({
@@ -108,6 +155,7 @@ def health_check():
 
 @app.route('/api/quotations/search', methods=['POST'])
 @limiter.limit("10 per minute")
+@requires_services
 def search_quotations():
     try:
         data = request.get_json()
@@ -119,10 +167,7 @@ def search_quotations():
         if missing:
             return jsonify({'error': f'Missing required fields: {missing}'}), 400
 
-        if not quotation_service:
-            return jsonify({'error': 'Service unavailable'}), 503
-
-        quotations = quotation_service.get_quotations(
+        quotations = services.quotation_service.get_quotations(
             from_location=data['from_location'],
             to_location=data['to_location'],
             vehicle_type=data.get('vehicle_type'),
@@ -140,8 +185,45 @@ def search_quotations():
         logger.error(f"Error in search_quotations: {str(e)}", exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/quotations/batch', methods=['POST'])
+@limiter.limit("10 per minute")
+@requires_services
+def search_quotations_batch():
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No JSON payload provided'}), 400
+
+        lanes = data.get('lanes')
+        if not isinstance(lanes, list) or not lanes:
+            return jsonify({'error': 'lanes must be a non-empty list'}), 400
+        if len(lanes) > Config.MAX_BATCH_LANES:
+            return jsonify({'error': f'At most {Config.MAX_BATCH_LANES} lanes per request'}), 400
+
+        invalid = [i for i, lane in enumerate(lanes)
+                   if not isinstance(lane, dict) or 'from_location' not in lane or 'to_location' not in lane]
+        if invalid:
+            return jsonify({'error': f'Lanes missing from_location/to_location: {invalid}'}), 400
+
+        results = services.quotation_service.get_quotations_batch(
+            lanes,
+            max_results=data.get('max_results', 10)
+        )
+
+        return jsonify({
+            'success': True,
+            'results': results,
+            'total_lanes': len(results),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+
+    except Exception as e:
+        logger.error(f"Error in search_quotations_batch: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/analytics/dashboard', methods=['GET', 'OPTIONS'])
 @limiter.limit("5 per minute")
+@requires_services
 def get_dashboard_analytics():
     if request.method == 'OPTIONS':
         response = jsonify({'status': 'ok'})
@@ -152,7 +234,7 @@ def get_dashboard_analytics():
         return response
 
     try:
-        analytics = quotation_service.get_analytics() if quotation_service else {}
+        analytics = services.quotation_service.get_analytics()
         return jsonify({
             'success': True,
             'analytics': analytics,
@@ -163,36 +245,392 @@ def get_dashboard_analytics():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/vendors', methods=['GET'])
+@requires_services
 def get_vendors():
     try:
-        vendors = quotation_service.get_vendors()
+        vendors = services.quotation_service.get_vendors()
         return jsonify({'success': True, 'vendors': vendors})
     except Exception as e:
         logger.error(f"Error in get_vendors: {e}", exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/locations', methods=['GET'])
+@requires_services
 def get_locations():
     try:
-        locations = quotation_service.get_locations()
+        locations = services.quotation_service.get_locations()
         return jsonify({'success': True, 'locations': locations})
     except Exception as e:
         logger.error(f"Error in get_locations: {e}", exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/lanes', methods=['GET'])
+@requires_services
+def get_lanes():
+    try:
+        page = request.args.get('page', 1, type=int)
+        page_size = min(request.args.get('page_size', 50, type=int), Config.MAX_LANES_PAGE_SIZE)
+        lanes = services.quotation_service.get_lanes(
+            search=request.args.get('search', '').strip(),
+            page=page,
+            page_size=page_size
+        )
+        return jsonify({'success': True, **lanes})
+    except Exception as e:
+        logger.error(f"Error in get_lanes: {e}", exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
+
+def _sse_enabled() -> bool:
+    if Config.SSE_ENABLED == 'auto':
+        return cooperative_workers()
+    return Config.SSE_ENABLED == 'true'
+
+@app.route('/api/events', methods=['GET'])
+@limiter.exempt
+@requires_services
+def stream_events():
+    """Server-sent events announcing each new data generation
+
+    A stream holds its connection for as long as the client stays, which
+    costs a whole thread on gthread and sync workers, so by default streams
+    are only served by gevent workers. Otherwise the 204 tells EventSource
+    not to reconnect and clients fall back to time-based cache expiry.
+    """
+    if not _sse_enabled():
+        return Response(status=204)
+    quotation_service = services.quotation_service
+    events = quotation_service.events
+    if not events.subscribe():
+        return jsonify({'success': False, 'error': 'Too many event subscribers'}), 503, {'Retry-After': '60'}
+    quotation_service.ensure_auto_refresh()
+    response = Response(
+        events.stream(heartbeat=Config.SSE_HEARTBEAT_SECONDS),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # let nginx flush each event
+        }
+    )
+    # Frees the slot even if the client leaves before the first event
+    response.call_on_close(events.unsubscribe)
+    return response
+
+@app.route('/api/vehicle-types', methods=['GET'])
+@requires_services
+def get_vehicle_types():
+    try:
+        vehicle_types = services.quotation_service.get_vehicle_types()
+        return jsonify({'success': True, **vehicle_types})
+    except Exception as e:
+        logger.error(f"Error in get_vehicle_types: {e}", exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/vendor-rates', methods=['GET'])
+@requires_services
 def get_vendor_rates():
     try:
-        df = quotation_service._get_fresh_data()
+        snapshot = services.quotation_service.get_snapshot()
+        df = snapshot.data
         if df is None or df.empty:
             return jsonify({'success': False, 'rates': [], 'error': 'No data found'}), 404
-        rates = df.to_dict(orient='records')
-        return jsonify({'success': True, 'rates': rates})
+        rates = run_cpu_bound(df.to_dict, orient='records')
+        return jsonify({
+            'success': True,
+            'rates': rates,
+            'generation': snapshot.generation
+        })
     except Exception as e:
         logger.error(f"Error in get_vendor_rates: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
-# Debug route (remove in production if sensitive)
+@app.route('/api/vendor-rates/export', methods=['GET'])
+@requires_services
+def export_vendor_rates():
+    """Stream the full rate book as NDJSON, CSV or Arrow IPC.
+
+    The format comes from ?format=ndjson|csv|arrow or the Accept header.
+    """
+    from services.rate_export import EXPORT_FORMATS, RateBookExporter, negotiate_format
+
+    fmt = negotiate_format(request.args.get('format'), request.accept_mimetypes)
+    if fmt is None:
+        return jsonify({
+            'success': False,
+            'error': 'Unsupported export format',
+            'formats': list(EXPORT_FORMATS)
+        }), 406
+    try:
+        snapshot = services.quotation_service.get_snapshot()
+        df = snapshot.data
+        if df is None or df.empty:
+            return jsonify({'success': False, 'error': 'No data found'}), 404
+        generation = snapshot.generation
+        exporter = RateBookExporter(df, chunk_rows=Config.EXPORT_CHUNK_ROWS)
+        headers = {
+            'X-Data-Generation': str(generation),
+            'X-Row-Count': str(len(df)),
+            'X-Accel-Buffering': 'no',
+            'Vary': 'Accept'
+        }
+        if fmt == 'csv':
+            headers['Content-Disposition'] = f'attachment; filename="vendor-rates-{generation}.csv"'
+        return Response(exporter.stream(fmt), mimetype=EXPORT_FORMATS[fmt], headers=headers)
+    except Exception as e:
+        logger.error(f"Error in export_vendor_rates: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+def _int_arg(name, default):
+    """Query argument ``name`` as an int; None when given but not an integer"""
+    if name not in request.args:
+        return default
+    return request.args.get(name, type=int)
+
+def _history_unavailable():
+    if services.quotation_service.history is None:
+        return jsonify({'success': False, 'error': 'Rate history is disabled'}), 404
+    return None
+
+@app.route('/api/history/rates', methods=['GET'])
+@requires_services
+def get_rates_as_of():
+    """Rates in force at ?as_of= (ISO date/datetime or epoch seconds).
+
+    Optional filters: from_origin, area, vendor, vehicle_type (matched by
+    vehicle class) and limit (1..10000).
+    """
+    from models.rate_history import parse_time
+
+    unavailable = _history_unavailable()
+    if unavailable:
+        return unavailable
+    try:
+        as_of = parse_time(request.args.get('as_of'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'as_of must be an ISO date or epoch seconds'}), 400
+    if as_of is None:
+        return jsonify({'success': False, 'error': 'as_of is required'}), 400
+    limit = _int_arg('limit', 1000)
+    if limit is None or not 1 <= limit <= 10000:
+        return jsonify({'success': False, 'error': 'limit must be an integer from 1 to 10000'}), 400
+    try:
+        result = services.quotation_service.get_rates_as_of(
+            as_of,
+            from_origin=request.args.get('from_origin', '').strip(),
+            area=request.args.get('area', '').strip(),
+            vendor=request.args.get('vendor', '').strip(),
+            vehicle_type=request.args.get('vehicle_type', '').strip(),
+            limit=limit
+        )
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        logger.error(f"Error in get_rates_as_of: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+@app.route('/api/history/trend', methods=['GET'])
+@requires_services
+def get_rate_trend():
+    """Rate changes on the lane ?from_origin=&area= over the last ?months= (default 6).
+
+    Optional filters: vendor, vehicle_type.
+    """
+    unavailable = _history_unavailable()
+    if unavailable:
+        return unavailable
+    from_origin = request.args.get('from_origin', '').strip()
+    area = request.args.get('area', '').strip()
+    if not from_origin or not area:
+        return jsonify({'success': False, 'error': 'from_origin and area are required'}), 400
+    months = request.args.get('months', 6, type=float)
+    if months is None or not 0 < months <= 120:
+        return jsonify({'success': False, 'error': 'months must be between 0 and 120'}), 400
+    try:
+        trend = services.quotation_service.get_rate_trend(
+            from_origin, area, months,
+            vendor=request.args.get('vendor', '').strip(),
+            vehicle_type=request.args.get('vehicle_type', '').strip()
+        )
+        return jsonify({'success': True, **trend})
+    except Exception as e:
+        logger.error(f"Error in get_rate_trend: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+def _report_status(job):
+    """Job state plus progress and download links for the report endpoints"""
+    status = dict(job)
+    if job.get('rows_total'):
+        status['progress'] = round(min(1.0, job['rows_done'] / job['rows_total']), 3)
+    if job['state'] == 'done':
+        status['progress'] = 1.0
+        status['downloads'] = {
+            fmt: f"/api/reports/{job['job_id']}/download/{fmt}" for fmt in job['formats']
+        }
+    if job.get('preview_ready'):
+        status['preview_url'] = f"/api/reports/{job['job_id']}/preview"
+    return status
+
+@app.route('/api/reports', methods=['POST'])
+@limiter.limit("10 per minute")
+@requires_services
+def create_report():
+    """Start a bulk quotation report from an uploaded lane sheet (.xlsx).
+
+    Form fields: ``file``, ``percent`` (markup, -100..100) and ``formats``
+    (comma separated: xlsx, csv). The job fills every rate of the sheet;
+    its preview holds the first rows and their lanes' vendors.
+    """
+    from services.report_jobs import REPORT_FORMATS
+
+    upload = request.files.get('file')
+    if upload is None or not upload.filename.lower().endswith('.xlsx'):
+        return jsonify({'success': False, 'error': 'Upload a .xlsx file as "file"'}), 400
+    try:
+        percent = max(-100.0, min(100.0, float(request.form.get('percent', 0))))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'percent must be a number'}), 400
+    formats = [f.strip().lower() for f in request.form.get('formats', 'xlsx').split(',') if f.strip()]
+    unknown = [f for f in formats if f not in REPORT_FORMATS]
+    if not formats or unknown:
+        return jsonify({'success': False, 'error': f'Unsupported formats: {unknown}',
+                        'formats': list(REPORT_FORMATS)}), 400
+
+    try:
+        job = services.report_jobs.submit(upload, percent, formats)
+        return jsonify({'success': True, 'job': _report_status(job),
+                        'status_url': f"/api/reports/{job['job_id']}"}), 202
+    except Exception as e:
+        logger.error(f"Error in create_report: {e}", exc_info=True)
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+@app.route('/api/reports/<job_id>', methods=['GET'])
+@limiter.exempt
+@requires_services
+def get_report(job_id):
+    job = services.report_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Report not found'}), 404
+    return jsonify({'success': True, 'job': _report_status(job)})
+
+@app.route('/api/reports/<job_id>/preview', methods=['GET'])
+@requires_services
+def get_report_preview(job_id):
+    """First rows of a report before the markup, with their lanes' vendor details"""
+    preview = services.report_jobs.preview(job_id)
+    if preview is None:
+        return jsonify({'success': False, 'error': 'Preview not ready or not found'}), 404
+    return jsonify({'success': True, **preview})
+
+@app.route('/api/reports/<job_id>/download/<fmt>', methods=['GET'])
+@requires_services
+def download_report(job_id, fmt):
+    from services.report_jobs import REPORT_FORMATS
+
+    path = services.report_jobs.file_path(job_id, fmt)
+    if path is None:
+        return jsonify({'success': False, 'error': 'Report not ready or not found'}), 404
+    today = datetime.utcnow().strftime('%Y.%m.%d')
+    return send_file(path, mimetype=REPORT_FORMATS[fmt], as_attachment=True,
+                     download_name=f"FN_Quotation_Rate_{today}.{fmt}")
+
+def requires_admin(f):
+    """Bearer-token check for /api/admin/* and /api/debug/memory; 404 when ADMIN_TOKEN is unset"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not Config.ADMIN_TOKEN:
+            return jsonify({'error': 'Not found'}), 404
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {Config.ADMIN_TOKEN}".encode()):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+@app.route('/api/admin/profile/cpu', methods=['POST'])
+@limiter.exempt
+@requires_admin
+def profile_cpu():
+    """Profile this worker for a window of live traffic.
+
+    ?mode=sampling (default) returns collapsed stacks for flamegraph.pl or
+    speedscope; ?mode=cprofile returns pstats text, or with ?format=pstats
+    the binary dump for pstats/snakeviz. ?seconds= sets the window.
+    """
+    from utils.profiling import profiler
+
+    mode = request.args.get('mode', 'sampling')
+    try:
+        seconds = min(float(request.args.get('seconds', 10)), Config.PROFILE_MAX_SECONDS)
+        interval = max(float(request.args.get('interval', 0.005)), 0.001)
+    except ValueError:
+        return jsonify({'error': 'seconds and interval must be numbers'}), 400
+    if not 0 < seconds or not interval < seconds:
+        return jsonify({'error': f'seconds must be above interval and at most {Config.PROFILE_MAX_SECONDS:g}'}), 400
+    try:
+        if mode == 'sampling':
+            result = profiler.sample(seconds, interval)
+            return Response(profiler.collapsed(result['stacks']), mimetype='text/plain',
+                            headers={'X-Profile-Samples': str(result['samples'])})
+        if mode == 'cprofile':
+            stats = profiler.profile_requests(seconds)
+            if stats is None:
+                return jsonify({'error': 'No requests were profiled in the window'}), 404
+            if request.args.get('format') == 'pstats':
+                return Response(profiler.pstats_dump(stats), mimetype='application/octet-stream',
+                                headers={'Content-Disposition': 'attachment; filename="profile.pstats"'})
+            return Response(profiler.pstats_text(stats, request.args.get('sort', 'cumulative')),
+                            mimetype='text/plain')
+        return jsonify({'error': 'mode must be sampling or cprofile'}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+@app.route('/api/admin/profile/memory', methods=['GET', 'POST', 'DELETE'])
+@limiter.exempt
+@requires_admin
+def profile_memory():
+    """tracemalloc: POST starts tracing, GET reports, DELETE stops.
+
+    While tracing, every data refresh and clean_data call records its
+    allocation diff under 'events'; ?dataframes=1 also lists live frames.
+    """
+    from utils.profiling import profiler
+
+    if request.method == 'POST':
+        frames = _int_arg('frames', 25)
+        if frames is None or not 1 <= frames <= 100:
+            return jsonify({'error': 'frames must be an integer from 1 to 100'}), 400
+        profiler.start_memory(frames)
+        return jsonify({'success': True, 'tracing': True})
+    if request.method == 'DELETE':
+        profiler.stop_memory()
+        return jsonify({'success': True, 'tracing': False})
+    limit = _int_arg('limit', 25)
+    if limit is None or not 1 <= limit <= 1000:
+        return jsonify({'error': 'limit must be an integer from 1 to 1000'}), 400
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        return jsonify({'error': 'group_by must be lineno, filename or traceback'}), 400
+    try:
+        report = profiler.memory_report(limit, group_by)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    if request.args.get('dataframes') and services.quotation_service is not None:
+        report['dataframes'] = profiler.live_dataframes(services.quotation_service.cached_data)
+    return jsonify({'success': True, 'memory': report})
+
+# Debug routes (remove in production if sensitive)
+@app.route("/api/debug/memory")
+@requires_admin
+@requires_services
+def debug_memory():
+    try:
+        report = services.quotation_service.get_memory_report()
+        return jsonify({
+            'success': True,
+            'memory': report,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Error in debug_memory: {e}", exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route("/api/debug/routes")
 def debug_routes():
     routes = [
@@ -3,6 +3,7 @@
 # ================================
 import os
 import json
+import tempfile
 import logging as logger
 from dotenv import load_dotenv
 import traceback
@@ -21,10 +22,67 @@ class Config:
     
     GOOGLE_SHEETS_ID = '1dAnTuM6cEO1oBnUN7htxCrVOgrTr-jXfcbnhXb5UBKM'
     GOOGLE_CREDENTIALS_FILE = CREDENTIALS_PATH
+    # Comma-separated worksheets (or A1 ranges) merged into one rate book
+    GOOGLE_WORKSHEETS = [
+        name.strip()
+        for name in os.environ.get('GOOGLE_WORKSHEETS', 'FINAL-VENDOR 20-24').split(',')
+        if name.strip()
+    ]
+    SHEETS_API_BASE_URL = os.environ.get('SHEETS_API_BASE_URL', 'https://sheets.googleapis.com/v4/spreadsheets')
+    SHEETS_MAX_CONCURRENCY = int(os.environ.get('SHEETS_MAX_CONCURRENCY', '4'))
+    SHEETS_MAX_RETRIES = int(os.environ.get('SHEETS_MAX_RETRIES', '3'))
     AI_MODEL_THRESHOLD = float(os.environ.get('AI_MODEL_THRESHOLD', '0.6'))
     CACHE_TTL = int(os.environ.get('CACHE_TTL', '300'))  # 5 minutes
+    # Location matching process pool (0/1 = match inline in the request thread)
+    MATCH_PROCESSES = int(os.environ.get('MATCH_PROCESSES', '0'))
+    MATCH_PARALLEL_MIN_CANDIDATES = int(os.environ.get('MATCH_PARALLEL_MIN_CANDIDATES', '2000'))
+    MAX_BATCH_LANES = int(os.environ.get('MAX_BATCH_LANES', '500'))
+    MAX_LANES_PAGE_SIZE = int(os.environ.get('MAX_LANES_PAGE_SIZE', '500'))
+    SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))
+    # /api/events streams hold a connection each: 'auto' serves them only on
+    # gevent workers, 'true'/'false' force them on or off
+    SSE_ENABLED = os.environ.get('SSE_ENABLED', 'auto').lower()
+    # Open event streams per worker; more get a 503
+    SSE_MAX_SUBSCRIBERS = int(os.environ.get('SSE_MAX_SUBSCRIBERS', '100'))
+    # Rows serialized per chunk by the streaming rate book export
+    EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', '5000'))
+    # Bulk quotation report jobs: working directory and how long files are kept
+    REPORT_DIR = os.environ.get('REPORT_DIR', os.path.join(tempfile.gettempdir(), 'bulk-reports'))
+    REPORT_TTL_SECONDS = float(os.environ.get('REPORT_TTL_SECONDS', '3600'))
+    # Append request shapes to this file for load replay (unset = off)
+    CAPTURE_REQUESTS_FILE = os.environ.get('CAPTURE_REQUESTS_FILE')
+    CAPTURE_SAMPLE_RATE = float(os.environ.get('CAPTURE_SAMPLE_RATE', '1.0'))
+    # HMAC key for captured client ids; set one per deployment so workers agree
+    CAPTURE_CLIENT_SECRET = os.environ.get('CAPTURE_CLIENT_SECRET')
+    # Reverse proxies in front of the app (nginx = 1); their X-Forwarded-For
+    # gives the client address used by rate limits and request capture
+    TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+    # Serve a synthetic rate book of this many rows instead of Google Sheets
+    FAKE_SHEETS_ROWS = int(os.environ.get('FAKE_SHEETS_ROWS', '0'))
+    FAKE_SHEETS_LATENCY = float(os.environ.get('FAKE_SHEETS_LATENCY', '0'))
+    # Append-only rate change history for as-of and trend queries (empty = off)
+    RATE_HISTORY_DIR = os.environ.get('RATE_HISTORY_DIR', os.path.join(BACKEND_DIR, 'rate_history'))
+    # Bearer token for /api/admin/* (profiling); the endpoints are off if unset
+    ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+    # Longest profiling window; keep it under nginx's proxy_read_timeout and
+    # GUNICORN_TIMEOUT (both 60s) or the profile request is cut off
+    PROFILE_MAX_SECONDS = float(os.environ.get('PROFILE_MAX_SECONDS', '45'))
+    # JSON file of {canonical vehicle class: [aliases]}; built-in table if unset
+    VEHICLE_TYPE_ALIASES_FILE = os.environ.get('VEHICLE_TYPE_ALIASES_FILE')
+    # Store the cached rate book with categorical strings and int32 rates
+    COMPACT_DATA = os.environ.get('COMPACT_DATA', 'True').lower() == 'true'
     DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
-    #RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
+    # Build services in a background thread so /api/healthz answers immediately
+    LAZY_STARTUP = os.environ.get('LAZY_STARTUP', 'False').lower() == 'true'
+    # Store shared by workers and instances for the rate book snapshot, the
+    # data generation pointer and result caches: memory:// (per process),
+    # sqlite:///path (one host; a path on /dev/shm keeps it in shared memory)
+    # or redis://host:port/db. Unreachable stores fall back to in-process.
+    SHARED_STORE_URL = os.environ.get('SHARED_STORE_URL', 'memory://')
+    SHARED_STORE_PREFIX = os.environ.get('SHARED_STORE_PREFIX', 'logistics:')
+    # Seconds one worker may hold the shared refresh lock while fetching
+    SHARED_REFRESH_LOCK_SECONDS = float(os.environ.get('SHARED_REFRESH_LOCK_SECONDS', '60'))
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', SHARED_STORE_URL)
 
     @staticmethod
     def get_google_credentials_dict():
@@ -0,0 +1,46 @@
+# ================================
+# backend/gunicorn.conf.py
+# ================================
+# Worker profile for `gunicorn app:app -c gunicorn.conf.py`.
+#
+# SERVING_MODE:
+#   gthread (default) - threaded workers, a slow request no longer holds the
+#                       whole worker
+#   gevent            - cooperative workers for many concurrent searches,
+#                       and the only mode serving /api/events streams by
+#                       default (SSE_ENABLED); what supervisord.conf runs.
+#                       Falls back to gthread if gevent is not installed
+#   sync              - the previous one-request-per-worker behaviour
+import logging
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+serving_mode = os.environ.get('SERVING_MODE', 'gthread').lower()
+
+if serving_mode == 'gevent':
+    try:
+        import gevent  # noqa: F401
+        worker_class = 'gevent'
+        worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '200'))
+    except ImportError:
+        logging.getLogger(__name__).warning("gevent is not installed, falling back to gthread workers")
+        serving_mode = 'gthread'
+
+if serving_mode == 'gthread':
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', '8'))
+elif serving_mode == 'sync':
+    worker_class = 'sync'
+
+
+def post_fork(server, worker):
+    """Fork the location matcher pool before the worker starts any threads"""
+    match_processes = int(os.environ.get('MATCH_PROCESSES', '0'))
+    if match_processes > 1 and serving_mode != 'gevent':
+        from models.parallel_matcher import start_pool
+        start_pool(match_processes)
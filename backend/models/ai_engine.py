@@ -1,27 +1,41 @@
 # ================================
 # backend/models/ai_engine.py
 # ================================
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from difflib import SequenceMatcher
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 class AIQuotationEngine:
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            ngram_range=(1, 2),
-            stop_words='english',
-            lowercase=True,
-            analyzer='word'
-        )
+        self._vectorizer = None
+        self._vectorizer_lock = threading.Lock()
         self.location_vectors = None
         self.location_names = []
+
+    @property
+    def vectorizer(self):
+        """TF-IDF vectorizer, created on first use so scikit-learn is imported lazily"""
+        if self._vectorizer is None:
+            with self._vectorizer_lock:
+                if self._vectorizer is None:
+                    from sklearn.feature_extraction.text import TfidfVectorizer
+                    self._vectorizer = TfidfVectorizer(
+                        ngram_range=(1, 2),
+                        stop_words='english',
+                        lowercase=True,
+                        analyzer='word'
+                    )
+        return self._vectorizer
+
+    def warm_up(self):
+        """Import the scikit-learn modules ahead of the first request"""
+        from sklearn.metrics.pairwise import cosine_similarity  # noqa: F401
+        return self.vectorizer
         
     def preprocess_text(self, text: str) -> str:
         """Preprocess text for better matching"""
@@ -67,11 +81,15 @@ class AIQuotationEngine:
             if not valid_candidates:
                 return [0.0] * len(candidates)
             
+            from sklearn.metrics.pairwise import cosine_similarity
+
             # Create corpus
             corpus = [processed_query] + valid_candidates
             
-            # Vectorize
-            tfidf_matrix = self.vectorizer.fit_transform(corpus)
+            # Vectorize with a fresh copy: fitting the shared instance races
+            # when several request threads match at once
+            from sklearn.base import clone
+            tfidf_matrix = clone(self.vectorizer).fit_transform(corpus)
             
             # Calculate similarity
             similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()
@@ -92,15 +110,21 @@ class AIQuotationEngine:
             logger.error(f"Error in semantic similarity calculation: {str(e)}")
             return [0.0] * len(candidates)
     
-    def match_location(self, query: str, locations: List[str], threshold: float = 0.6) -> List[Tuple[str, float]]:
-        """Match a query location against a list of locations"""
+    def match_location(self, query: str, locations: List[str], threshold: float = 0.6,
+                       fuzzy_scores: Optional[List[float]] = None) -> List[Tuple[str, float]]:
+        """Match a query location against a list of locations
+
+        ``fuzzy_scores`` may be precomputed (e.g. by the process pool in
+        ParallelMatcher); it must be aligned with ``locations``.
+        """
         if not query or not locations:
             return []
         
         results = []
         
         # Calculate fuzzy similarities
-        fuzzy_scores = [self.calculate_fuzzy_similarity(query, loc) for loc in locations]
+        if fuzzy_scores is None:
+            fuzzy_scores = [self.calculate_fuzzy_similarity(query, loc) for loc in locations]
         
         # Calculate semantic similarities
         semantic_scores = self.calculate_semantic_similarity(query, locations)
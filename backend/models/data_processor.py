@@ -1,17 +1,20 @@
 # ================================
 # backend/models/data_processor.py
 # ================================
+import hashlib
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional
 import logging
+from models.vehicle_types import VehicleTypeCanonicalizer
 
 logger = logging.getLogger(__name__)
 
 class DataProcessor:
-    def __init__(self):
+    def __init__(self, vehicle_types: Optional[VehicleTypeCanonicalizer] = None):
         self.data_cache = None
         self.last_update = None
+        self.vehicle_types = vehicle_types or VehicleTypeCanonicalizer()
     
     def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and standardize the data"""
@@ -28,7 +31,8 @@ class DataProcessor:
                 'VEHICLE NO.': 'vehicle_no',
                 'VEHICLE TYE': 'vehicle_type',  # Note: Original has typo
                 'RATE': 'rate',
-                'VENDOR NAME': 'vendor_name'
+                'VENDOR NAME': 'vendor_name',
+                'SOURCE SHEET': 'source_sheet'
             }
             
             # Rename columns if they exist
@@ -39,7 +43,11 @@ class DataProcessor:
             # Forward-fill missing from_origin values
             if 'from_origin' in cleaned_df.columns:
                 cleaned_df['from_origin'] = cleaned_df['from_origin'].replace('', pd.NA)
-                cleaned_df['from_origin'] = cleaned_df['from_origin'].fillna(method='ffill')
+                if 'source_sheet' in cleaned_df.columns:
+                    # Merged worksheets: never carry an origin across sheets
+                    cleaned_df['from_origin'] = cleaned_df.groupby('source_sheet')['from_origin'].ffill()
+                else:
+                    cleaned_df['from_origin'] = cleaned_df['from_origin'].ffill()
             
             # Clean text fields
             text_columns = ['from_origin', 'area', 'receiver_name', 'vendor_name', 'vehicle_type']
@@ -59,6 +67,14 @@ class DataProcessor:
             
             # Remove completely empty rows
             cleaned_df = cleaned_df.dropna(how='all')
+
+            # Merged worksheets: drop rows repeated in a later sheet, but keep
+            # repeats within one sheet, which are separate vendor entries
+            if 'source_sheet' in cleaned_df.columns:
+                data_columns = [c for c in cleaned_df.columns if c != 'source_sheet']
+                row_hash = pd.util.hash_pandas_object(cleaned_df[data_columns], index=False)
+                first_sheet = cleaned_df['source_sheet'].groupby(row_hash.values).transform('first')
+                cleaned_df = cleaned_df[cleaned_df['source_sheet'] == first_sheet]
             
             # Filter out rows with no meaningful data
             cleaned_df = cleaned_df[
@@ -66,6 +82,10 @@ class DataProcessor:
                 (cleaned_df.get('area', '').str.len() > 0) |
                 (cleaned_df.get('rate', 0) > 0)
             ]
+
+            # Canonical vehicle class, derived once here instead of per request
+            if 'vehicle_type' in cleaned_df.columns:
+                cleaned_df['vehicle_class'] = self.canonicalize_vehicle_types(cleaned_df)
             
             logger.info(f"Data cleaned: {len(df)} -> {len(cleaned_df)} rows")
             return cleaned_df
@@ -73,6 +93,74 @@ class DataProcessor:
         except Exception as e:
             logger.error(f"Error cleaning data: {str(e)}")
             return df
+
+    def canonicalize_vehicle_types(self, df: pd.DataFrame) -> pd.Categorical:
+        """Categorical vehicle class per row from vehicle_type, falling back to vehicle_no
+
+        The categories are the canonical classes followed by '' (unknown), so
+        the integer codes are stable for a given alias table.
+        """
+        types = df['vehicle_type'].astype(str).tolist()
+        if 'vehicle_no' in df.columns:
+            numbers = ['' if str(v) == 'nan' else str(v) for v in df['vehicle_no'].tolist()]
+        else:
+            numbers = [''] * len(types)
+
+        resolved = {}
+        classes = []
+        for raw_type, vehicle_no in zip(types, numbers):
+            key = (raw_type, vehicle_no)
+            if key not in resolved:
+                resolved[key] = self.vehicle_types.canonicalize(raw_type, vehicle_no)
+            classes.append(resolved[key])
+        return pd.Categorical(classes, categories=self.vehicle_types.classes + [''])
+
+    def compact_data(self, df: pd.DataFrame, max_category_ratio: float = 0.5) -> pd.DataFrame:
+        """Shrink a cleaned frame for long-lived caching
+
+        Repeated string columns (vendor, vehicle type, origin, area, ...) are
+        dictionary-encoded as categoricals and whole-rupee rates are stored as
+        int32. String columns that are mostly unique stay as objects.
+        """
+        try:
+            compact_df = df.reset_index(drop=True)
+            for col in compact_df.columns:
+                series = compact_df[col]
+                if series.dtype == object:
+                    if len(series) and series.nunique(dropna=False) / len(series) <= max_category_ratio:
+                        compact_df[col] = series.astype('category')
+                elif col == 'rate' and pd.api.types.is_numeric_dtype(series):
+                    # Fractional rates keep float64 so JSON output stays exact
+                    if len(series) and (series % 1 == 0).all() and series.abs().max() < 2 ** 31:
+                        compact_df[col] = series.astype('int32')
+
+            before = df.memory_usage(deep=True).sum()
+            after = compact_df.memory_usage(deep=True).sum()
+            logger.info(f"Data compacted: {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB")
+            return compact_df
+
+        except Exception as e:
+            logger.error(f"Error compacting data: {str(e)}")
+            return df
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """Content hash of a frame, used to tell whether a refresh changed anything"""
+        digest = hashlib.sha1('|'.join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def memory_report(self, df: pd.DataFrame) -> Dict:
+        """Per-column memory usage of a frame, in bytes"""
+        usage = df.memory_usage(deep=True, index=True)
+        return {
+            'rows': len(df),
+            'total_bytes': int(usage.sum()),
+            'columns': [
+                {'column': str(col), 'dtype': str(df[col].dtype) if col in df.columns else 'index',
+                 'bytes': int(nbytes)}
+                for col, nbytes in usage.items()
+            ]
+        }
     
     def extract_locations(self, df: pd.DataFrame) -> Dict[str, List[str]]:
         """Extract unique locations from the dataset"""
@@ -154,7 +242,8 @@ class DataProcessor:
             
             # Route volume by destination
             if 'area' in valid_df.columns:
-                route_volume = valid_df['area'].value_counts().head(10)
+                route_volume = valid_df['area'].value_counts()
+                route_volume = route_volume[route_volume > 0].head(10)
                 analytics['route_volume_by_destination'] = [
                     {'area': area, 'count': int(count)}
                     for area, count in route_volume.items()
@@ -162,7 +251,7 @@ class DataProcessor:
             
             # Average rates by vehicle type
             if 'vehicle_type' in valid_df.columns:
-                avg_rates = valid_df.groupby('vehicle_type')['rate'].mean().sort_values(ascending=False)
+                avg_rates = valid_df.groupby('vehicle_type', observed=True)['rate'].mean().sort_values(ascending=False)
                 analytics['avg_rates_by_vehicle_type'] = [
                     {'vehicle_type': vtype, 'avg_rate': float(rate)}
                     for vtype, rate in avg_rates.items()
@@ -171,7 +260,7 @@ class DataProcessor:
             
             # Vendor performance
             if 'vendor_name' in valid_df.columns:
-                vendor_stats = valid_df.groupby('vendor_name').agg({
+                vendor_stats = valid_df.groupby('vendor_name', observed=True).agg({
                     'rate': ['count', 'sum', 'mean']
                 }).round(2)
                 vendor_stats.columns = ['total_routes', 'total_revenue', 'avg_rate']
@@ -191,7 +280,7 @@ class DataProcessor:
             # Vehicle deliveries to different areas from same from_origin
             if {'from_origin', 'vehicle_no', 'area'}.issubset(valid_df.columns):
                 vehicle_area = (
-                    valid_df.groupby(['from_origin', 'vehicle_no'])['area']
+                    valid_df.groupby(['from_origin', 'vehicle_no'], observed=True)['area']
                     .nunique()
                     .reset_index()
                     .rename(columns={'area': 'unique_areas'})
@@ -0,0 +1,184 @@
+# ================================
+# backend/models/lane_table.py
+# ================================
+import heapq
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class LaneTable:
+    """Per-lane rate leaderboard materialized once per data generation.
+
+    A lane is (from_origin, area, vehicle_type, vehicle_class) over all rows
+    with a positive rate. Each lane
+    keeps a top-2 heap of the highest rates and a bottom-3 heap of the
+    lowest, the row holding its maximum rate, and the savings summary the
+    route lookup screens show, so lane questions become dictionary reads.
+
+    This is finer than the grouping the route lookup screen used to do in
+    the browser (origin, area and vehicle type, skipping rows without a
+    vendor): one raw vehicle type can split into several lanes when the
+    vehicle numbers resolve to different classes, and rows without a vendor
+    count towards their lane. The class is part of the key so quotations
+    filtered by vehicle class can take their maximum from the table.
+    """
+
+    TOP_K = 2
+    BOTTOM_K = 3
+
+    def __init__(self, generation: int = 0):
+        self.generation = generation
+        self.lanes: List[Dict] = []
+        self._by_key: Dict[Tuple, int] = {}
+        self._by_origin: Dict[str, List[int]] = {}
+        self._by_area: Dict[str, List[int]] = {}
+        self._max_rows: List[Tuple[float, int]] = []
+        self._sorted: List[int] = []
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, generation: int = 0) -> 'LaneTable':
+        table = cls(generation)
+        if df is None or df.empty or not {'from_origin', 'area', 'rate'}.issubset(df.columns):
+            return table
+
+        n = len(df)
+        origins = df['from_origin'].tolist()
+        areas = df['area'].tolist()
+        rates = df['rate'].tolist()
+        vendors = df['vendor_name'].tolist() if 'vendor_name' in df.columns else [''] * n
+        types = df['vehicle_type'].tolist() if 'vehicle_type' in df.columns else [''] * n
+        classes = df['vehicle_class'].tolist() if 'vehicle_class' in df.columns else [''] * n
+        labels = df.index.tolist()
+
+        # Per lane: [top heap (min-heap of highest), bottom heap (max-heap via
+        # negation), max (rate, -position), first vendor, multi vendor,
+        # first rate, multi rate, count]
+        state: Dict[Tuple, list] = {}
+        for pos in range(n):
+            rate = rates[pos]
+            if not rate or rate <= 0:
+                continue
+            key = (origins[pos], areas[pos], types[pos], classes[pos])
+            vendor = vendors[pos]
+            lane = state.get(key)
+            if lane is None:
+                lane = state[key] = [[], [], (rate, -pos), vendor, False, rate, False, 0]
+            lane[7] += 1
+            entry = (rate, -pos, vendor)
+            if len(lane[0]) < cls.TOP_K:
+                heapq.heappush(lane[0], entry)
+            elif entry > lane[0][0]:
+                heapq.heapreplace(lane[0], entry)
+            low_entry = (-rate, pos, vendor)
+            if len(lane[1]) < cls.BOTTOM_K:
+                heapq.heappush(lane[1], low_entry)
+            elif low_entry > lane[1][0]:
+                heapq.heapreplace(lane[1], low_entry)
+            if (rate, -pos) > lane[2]:
+                lane[2] = (rate, -pos)
+            lane[4] = lane[4] or vendor != lane[3]
+            lane[6] = lane[6] or rate != lane[5]
+
+        for key, (top, bottom, max_entry, _, multi_vendor, _, multi_rate, count) in state.items():
+            highest = [{'vendor': v, 'rate': r} for r, _, v in sorted(top, reverse=True)]
+            lowest = [{'vendor': v, 'rate': -r} for r, _, v in sorted(bottom, reverse=True)]
+            no_savings = not multi_vendor or not multi_rate
+            savings = 0 if no_savings else highest[0]['rate'] - lowest[0]['rate']
+            table._add({
+                'lane_id': len(table.lanes),
+                'from_origin': key[0],
+                'area': key[1],
+                'vehicle_type': key[2],
+                'vehicle_class': key[3],
+                'count': count,
+                'highest': highest[0],
+                'second_highest': highest[1] if len(highest) > 1 else None,
+                'lowest': lowest,
+                'potential_savings': savings,
+                'savings_percentage': round(savings / highest[0]['rate'] * 100, 1) if savings else 0,
+                'no_savings_potential': no_savings,
+            }, max_entry[0], labels[-max_entry[1]])
+
+        # Most savings first, as the route lookup screen lists them
+        table._sorted = sorted(range(len(table.lanes)), key=lambda i: -table.lanes[i]['potential_savings'])
+        logger.info(f"Lane table built: {len(table.lanes)} lanes from {n} rows (generation {generation})")
+        return table
+
+    def _add(self, lane: Dict, max_rate, max_label):
+        lane_id = lane['lane_id']
+        self.lanes.append(lane)
+        self._max_rows.append((max_rate, max_label))
+        self._by_key[(lane['from_origin'], lane['area'], lane['vehicle_type'], lane['vehicle_class'])] = lane_id
+        self._by_origin.setdefault(lane['from_origin'], []).append(lane_id)
+        self._by_area.setdefault(lane['area'], []).append(lane_id)
+
+    def diff(self, previous: Optional['LaneTable']) -> List[Dict]:
+        """Keys of lanes added, removed or changed since ``previous``"""
+        def summaries(table):
+            return {
+                key: {k: v for k, v in table.lanes[lane_id].items() if k != 'lane_id'}
+                for key, lane_id in table._by_key.items()
+            }
+
+        current = summaries(self)
+        before = summaries(previous) if previous is not None else {}
+        changed = [key for key in current if before.get(key) != current[key]]
+        changed += [key for key in before if key not in current]
+        return [
+            {'from_origin': k[0], 'area': k[1], 'vehicle_type': k[2], 'vehicle_class': k[3]}
+            for k in changed
+        ]
+
+    def get(self, from_origin: str, area: str, vehicle_type: str = '', vehicle_class: str = '') -> Optional[Dict]:
+        lane_id = self._by_key.get((from_origin, area, vehicle_type, vehicle_class))
+        return self.lanes[lane_id] if lane_id is not None else None
+
+    def lane_ids(self, origins: Optional[List[str]] = None, areas: Optional[List[str]] = None) -> List[int]:
+        """Lanes whose origin is in ``origins`` and area in ``areas`` (None = any)"""
+        if origins is not None:
+            ids = [i for o in origins for i in self._by_origin.get(o, [])]
+            if areas is not None:
+                wanted = set(areas)
+                ids = [i for i in ids if self.lanes[i]['area'] in wanted]
+        elif areas is not None:
+            ids = [i for a in areas for i in self._by_area.get(a, [])]
+        else:
+            ids = list(range(len(self.lanes)))
+        return ids
+
+    def max_row(self, lane_ids: List[int]):
+        """Index label of the highest-rate row across lanes (first row on ties)"""
+        best = None
+        for lane_id in lane_ids:
+            rate, label = self._max_rows[lane_id]
+            if best is None or rate > best[0] or (rate == best[0] and label < best[1]):
+                best = (rate, label)
+        return best[1] if best else None
+
+    def search(self, query: str = '', page: int = 1, page_size: int = 50) -> Dict:
+        """Lanes matching ``query`` (substring of origin, area or vehicle), paginated"""
+        # Lanes without an origin or area only exist to back max_row()
+        ids = [i for i in self._sorted if self.lanes[i]['from_origin'] and self.lanes[i]['area']]
+        if query:
+            query = query.lower()
+            ids = [
+                i for i in ids
+                if query in str(self.lanes[i]['from_origin']).lower()
+                or query in str(self.lanes[i]['area']).lower()
+                or query in str(self.lanes[i]['vehicle_type']).lower()
+                or query in str(self.lanes[i]['vehicle_class']).lower()
+            ]
+        page = max(1, page)
+        page_size = max(1, page_size)
+        start = (page - 1) * page_size
+        return {
+            'generation': self.generation,
+            'total': len(ids),
+            'page': page,
+            'page_size': page_size,
+            'lanes': [self.lanes[i] for i in ids[start:start + page_size]]
+        }
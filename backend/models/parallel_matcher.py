@@ -0,0 +1,241 @@
+# ================================
+# backend/models/parallel_matcher.py
+# ================================
+import atexit
+import logging
+import multiprocessing
+import os
+import struct
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from models.ai_engine import AIQuotationEngine
+from utils.helpers import cooperative_workers
+
+logger = logging.getLogger(__name__)
+
+# The process pool, forked once per gunicorn worker (see start_pool)
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# In pool workers: attached index segments by name, and fully decoded lists
+# for batch tasks. Two indexes can be in use (see ParallelMatcher.publish),
+# each with an origins and a destinations list.
+_WORKER_SEGMENTS = 4
+_worker_segments: Dict[str, SharedMemory] = {}
+_worker_lists: Dict[str, List[str]] = {}
+_worker_engine: Optional[AIQuotationEngine] = None
+
+
+class MatchIndex(NamedTuple):
+    generation: int
+    locations: Dict[str, List[str]]
+    # List name -> shared memory segment holding it for the pool workers
+    segments: Dict[str, str]
+
+
+def start_pool(processes: int):
+    """Fork the matcher pool once; returns it, or None when matching runs inline.
+
+    Forking copies only the calling thread, so this should run while the
+    process is still single-threaded: gunicorn.conf.py calls it from
+    ``post_fork``, and ParallelMatcher at service start otherwise.
+    """
+    global _POOL
+    if processes <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            # Workers inherit the resource tracker, so segments they attach
+            # are tracked once, by the process that unlinks them
+            resource_tracker.ensure_running()
+            _POOL = multiprocessing.get_context('fork').Pool(processes=processes)
+            logger.info(f"Started matcher pool with {processes} processes (pid {os.getpid()})")
+        return _POOL
+
+
+def share_list(values: List[str]) -> SharedMemory:
+    """Copy a list of strings into a new shared memory segment.
+
+    Layout: the count, count + 1 offsets (int64) and the UTF-8 bytes, so a
+    reader decodes any slice without touching the rest of the list.
+    """
+    encoded = [str(value).encode('utf-8') for value in values]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    header = 8 * (len(encoded) + 2)
+    shm = SharedMemory(create=True, size=header + offsets[-1])
+    struct.pack_into(f"<{len(offsets) + 1}q", shm.buf, 0, len(encoded), *offsets)
+    shm.buf[header:header + offsets[-1]] = b''.join(encoded)
+    return shm
+
+
+def read_list(buf, start: int = 0, end: Optional[int] = None) -> List[str]:
+    """Items ``start:end`` of a list written by share_list"""
+    count = struct.unpack_from('<q', buf, 0)[0]
+    end = count if end is None else min(end, count)
+    if start >= end:
+        return []
+    offsets = struct.unpack_from(f"<{end - start + 1}q", buf, 8 * (start + 1))
+    base = 8 * (count + 2)
+    data = bytes(buf[base + offsets[0]:base + offsets[-1]])
+    return [data[a - offsets[0]:b - offsets[0]].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+
+
+def _get_worker_engine() -> AIQuotationEngine:
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = AIQuotationEngine()
+    return _worker_engine
+
+
+def _worker_segment(name: str) -> SharedMemory:
+    """Attach segment ``name`` once; the oldest attachments are closed"""
+    shm = _worker_segments.get(name)
+    if shm is None:
+        while len(_worker_segments) >= _WORKER_SEGMENTS:
+            old = next(iter(_worker_segments))
+            _worker_lists.pop(old, None)
+            _worker_segments.pop(old).close()
+        shm = _worker_segments[name] = SharedMemory(name=name)
+    return shm
+
+
+def _score_shard(task: Tuple[str, int, int, str]) -> List[float]:
+    """Fuzzy-score one slice of a location list against a query"""
+    segment, start, end, query = task
+    engine = _get_worker_engine()
+    return [engine.calculate_fuzzy_similarity(query, loc)
+            for loc in read_list(_worker_segment(segment).buf, start, end)]
+
+
+def _match_one(task: Tuple[str, str, float]) -> List[Tuple[str, float]]:
+    """Fully match one query (one lane of a batch) against a location list"""
+    segment, query, threshold = task
+    locations = _worker_lists.get(segment)
+    if locations is None:
+        locations = _worker_lists[segment] = read_list(_worker_segment(segment).buf)
+    return _get_worker_engine().match_location(query, locations, threshold)
+
+
+class ParallelMatcher:
+    """Spread location matching over a fork-based process pool.
+
+    Large candidate lists are sharded across the workers for fuzzy scoring
+    (the TF-IDF part stays in the parent because its vocabulary is fitted on
+    the whole list), and batch jobs match one query per task. With
+    ``processes`` <= 1, or where ``fork`` is not available, everything runs
+    inline through the engine.
+
+    The pool is forked once, before request threads start, so it cannot
+    inherit indexes published later. Each published list is copied into a
+    shared memory segment instead; a task names the segment it was built
+    against and a worker reads just its slice of it, so scores never line
+    up against another generation's list.
+    """
+
+    def __init__(self, ai_engine: AIQuotationEngine, processes: int = 0,
+                 min_parallel_candidates: int = 2000):
+        self.ai_engine = ai_engine
+        self.processes = processes if processes > 0 else 0
+        self.min_parallel_candidates = min_parallel_candidates
+        self._lock = threading.Lock()
+        self._index = MatchIndex(0, {}, {})
+        self._source = None
+        # Segments of the current index and of the one before it
+        self._shared: List[SharedMemory] = []
+        self._stale: List[SharedMemory] = []
+        # gevent workers match in the hub's thread pool (run_cpu_bound);
+        # a multiprocessing pool's feeder threads would be greenlets there
+        self._pool = None if cooperative_workers() else start_pool(self.processes)
+        if self._pool is not None:
+            # Unlink this process's segments rather than leave them to the tracker
+            atexit.register(self.close)
+
+    @property
+    def enabled(self) -> bool:
+        return self._pool is not None
+
+    def publish(self, build_index: Callable[[], Dict[str, List[str]]], source=None) -> MatchIndex:
+        """Make ``build_index()`` the current index, once per ``source``.
+
+        Returns the new index, or the current one when ``source`` (the
+        snapshot the index is built from) is already published.
+        """
+        with self._lock:
+            if source is not None and source is self._source:
+                return self._index
+            generation = self._index.generation + 1
+            locations = build_index()
+            shared = {}
+            if self._pool is not None:
+                shared = {name: share_list(values) for name, values in locations.items()}
+            # Tasks of the previous index may still be running; the one
+            # before it has none left
+            self._release(self._stale)
+            self._stale = self._shared
+            self._shared = list(shared.values())
+            self._index = MatchIndex(generation, locations,
+                                     {name: shm.name for name, shm in shared.items()})
+            self._source = source
+            return self._index
+
+    @staticmethod
+    def _release(segments: List[SharedMemory]):
+        for shm in segments:
+            try:
+                shm.close()
+                shm.unlink()
+            except OSError:
+                pass
+
+    def current(self) -> MatchIndex:
+        """The index, read once so a whole match uses the same generation"""
+        with self._lock:
+            return self._index
+
+    def match_location(self, query: str, name: str, threshold: float = 0.6,
+                       index: Optional[MatchIndex] = None) -> List[Tuple[str, float]]:
+        """Match a query against the list ``name`` of ``index`` (default: the current one), in rank order"""
+        index = index or self.current()
+        locations = index.locations.get(name, [])
+        if self._pool is None or name not in index.segments or len(locations) < self.min_parallel_candidates:
+            return self.ai_engine.match_location(query, locations, threshold)
+
+        try:
+            shard_size = -(-len(locations) // (self.processes * 4))
+            tasks = [
+                (index.segments[name], start, min(start + shard_size, len(locations)), query)
+                for start in range(0, len(locations), shard_size)
+            ]
+            fuzzy_scores = []
+            for shard in self._pool.map(_score_shard, tasks):
+                fuzzy_scores.extend(shard)
+            return self.ai_engine.match_location(query, locations, threshold, fuzzy_scores=fuzzy_scores)
+        except Exception as e:
+            logger.error(f"Parallel matching failed, falling back to inline: {str(e)}")
+            return self.ai_engine.match_location(query, locations, threshold)
+
+    def match_many(self, queries: List[str], name: str, threshold: float = 0.6,
+                   index: Optional[MatchIndex] = None) -> List[List[Tuple[str, float]]]:
+        """Match many queries (the lanes of a batch job) in input order"""
+        index = index or self.current()
+        locations = index.locations.get(name, [])
+        if self._pool is None or name not in index.segments or len(queries) < 2:
+            return [self.ai_engine.match_location(q, locations, threshold) for q in queries]
+
+        try:
+            tasks = [(index.segments[name], q, threshold) for q in queries]
+            return self._pool.map(_match_one, tasks)
+        except Exception as e:
+            logger.error(f"Parallel batch matching failed, falling back to inline: {str(e)}")
+            return [self.ai_engine.match_location(q, locations, threshold) for q in queries]
+
+    def close(self):
+        with self._lock:
+            self._release(self._stale)
+            self._release(self._shared)
+            self._stale, self._shared = [], []
@@ -0,0 +1,410 @@
+# ================================
+# backend/models/rate_history.py
+# ================================
+import fcntl
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# One append-only file per column; a record is the same row in each
+COLUMNS = {
+    'key': np.dtype('<u4'),
+    'time': np.dtype('<f8'),
+    'generation': np.dtype('<u4'),
+    'delta': np.dtype('<i8'),
+    'removed': np.dtype('u1'),
+}
+# Key parts, normalized by _key_part; vehicle_class falls back to the raw
+# vehicle type for types the canonicalizer does not know
+KEY_FIELDS = ('from_origin', 'area', 'vendor_name', 'vehicle_class')
+SECONDS_PER_MONTH = 30.44 * 86400
+
+
+def _norm(value) -> str:
+    return ' '.join(str(value or '').split()).lower()
+
+
+def _key_part(values: pd.Series) -> pd.Series:
+    """Key text of a column: whitespace collapsed and upper case"""
+    text = values.astype(object).where(values.notna(), '').astype(str)
+    return text.str.split().str.join(' ').str.upper()
+
+
+def _rate(paise: Optional[int]):
+    if paise is None:
+        return None
+    return paise // 100 if paise % 100 == 0 else paise / 100
+
+
+def parse_time(value) -> Optional[float]:
+    """Epoch seconds from an epoch number or an ISO date/datetime.
+
+    A bare date means the end of that day, so "as of 2026-03-31" includes
+    changes made on the 31st.
+    """
+    if value is None or str(value).strip() == '':
+        return None
+    value = str(value).strip()
+    try:
+        number = float(value)
+    except ValueError:
+        pass
+    else:
+        if not math.isfinite(number):
+            raise ValueError(f"Not a finite time: {value}")
+        return number
+    parsed = datetime.fromisoformat(value)
+    if len(value) == 10:
+        return (parsed + timedelta(days=1)).timestamp() - 1e-6
+    return parsed.timestamp()
+
+
+class RateHistoryStore:
+    """Append-only history of rates per (lane, vendor, vehicle type).
+
+    At each data generation only the keys whose rate changed are written:
+    one record of (key id, time, generation, rate delta in paise, removed
+    flag), with every field in its own fixed-width column file. Keys go to
+    ``keys.ndjson`` the first time they are seen, so a record carries a
+    4-byte id instead of four strings. A key's rate is the running sum of
+    its deltas, and a key missing from a generation gets a removed record
+    whose delta brings the sum back to zero. Disk and memory therefore grow
+    with the number of rate changes, not the number of snapshots.
+
+    The columns are loaded into numpy arrays and indexed by key (a stable
+    sort by key id keeps each key's records in time order), so an as-of or
+    trend query is a binary search per key. Other processes pick up new
+    records on their next query; writers serialize on a lock file.
+
+    Records must be appended in time order for that search, so ``head.json``
+    holds the time and generation of the last recorded snapshot. A snapshot
+    fetched before it (a slow worker finishing late) is skipped, and one whose
+    generation does not follow it is renumbered: with an in-process store,
+    workers count generations separately.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._keys_path = os.path.join(directory, 'keys.ndjson')
+        self._lock_path = os.path.join(directory, '.lock')
+        self._head_path = os.path.join(directory, 'head.json')
+        self._lock = threading.RLock()
+        self.keys: List[Tuple[str, ...]] = []
+        self._key_ids: Dict[Tuple[str, ...], int] = {}
+        self._normalized: List[Tuple[str, ...]] = []
+        self._by_lane: Dict[Tuple[str, str], List[int]] = {}
+        # Key ids by the normalized value of each key field
+        self._by_field: List[Dict[str, List[int]]] = [{} for _ in KEY_FIELDS]
+        self._keys_offset = 0
+        self._chunks: Dict[str, List[np.ndarray]] = {name: [] for name in COLUMNS}
+        self.rows = 0
+        # Latest rate per key id in paise; None once removed
+        self._latest: Dict[int, Optional[int]] = {}
+        self._index = None
+        self.sync()
+
+    # --- Storage ---
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.col")
+
+    def _disk_rows(self) -> int:
+        """Complete records on disk; a torn append leaves one column longer"""
+        rows = []
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            rows.append(os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0)
+        return min(rows)
+
+    def sync(self):
+        """Load keys and records appended since the last call, by any process"""
+        with self._lock:
+            self._load_keys()
+            total = self._disk_rows()
+            if total <= self.rows:
+                return
+            new = {}
+            for name, dtype in COLUMNS.items():
+                new[name] = np.fromfile(self._column_path(name), dtype=dtype,
+                                        count=total - self.rows, offset=self.rows * dtype.itemsize)
+                self._chunks[name].append(new[name])
+            for key_id, delta, removed in zip(new['key'].tolist(), new['delta'].tolist(),
+                                              new['removed'].tolist()):
+                self._latest[key_id] = None if removed else (self._latest.get(key_id) or 0) + delta
+            self.rows = total
+            self._index = None
+
+    def _load_keys(self):
+        if not os.path.exists(self._keys_path):
+            return
+        with open(self._keys_path, 'rb') as f:
+            f.seek(self._keys_offset)
+            data = f.read()
+        # Only whole lines; a torn append is overwritten by the next writer
+        data = data[:data.rfind(b'\n') + 1]
+        if not data:
+            return
+        for key in json.loads(b'[' + data.rstrip(b'\n').replace(b'\n', b',') + b']'):
+            self._add_key(tuple(key))
+        self._keys_offset += len(data)
+
+    def _add_key(self, key: Tuple[str, ...]) -> int:
+        key_id = len(self.keys)
+        self.keys.append(key)
+        self._key_ids[key] = key_id
+        normalized = tuple(_norm(part) for part in key)
+        self._normalized.append(normalized)
+        self._by_lane.setdefault(normalized[:2], []).append(key_id)
+        for field, value in zip(self._by_field, normalized):
+            field.setdefault(value, []).append(key_id)
+        return key_id
+
+    @contextmanager
+    def _writer(self):
+        """Exclusive across processes, with the in-memory view brought up to date"""
+        with self._lock, open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.sync()
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # --- Recording ---
+
+    @staticmethod
+    def current_rates(df: pd.DataFrame) -> Dict[Tuple[str, ...], int]:
+        """Highest positive rate per normalized key of a snapshot, in paise"""
+        required = {'rate', 'from_origin', 'area', 'vendor_name', 'vehicle_type'}
+        if df is None or df.empty or not required.issubset(df.columns):
+            return {}
+        rows = df[df['rate'] > 0]
+        keys = pd.DataFrame({field: _key_part(rows[field]) for field in KEY_FIELDS[:3]})
+        vehicle_type = _key_part(rows['vehicle_type'])
+        if 'vehicle_class' in rows.columns:
+            vehicle_class = _key_part(rows['vehicle_class'])
+            keys['vehicle_class'] = vehicle_class.where(vehicle_class != '', vehicle_type)
+        else:
+            keys['vehicle_class'] = vehicle_type
+        keys['rate'] = rows['rate'].to_numpy()
+        highest = keys.groupby(list(KEY_FIELDS), sort=False)['rate'].max()
+        return {key: int(round(float(rate) * 100)) for key, rate in zip(highest.index, highest.values)}
+
+    def _read_head(self) -> Dict:
+        try:
+            with open(self._head_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'time': 0.0, 'generation': 0}
+
+    def _write_head(self, timestamp: float, generation: int):
+        with open(self._head_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'time': timestamp, 'generation': generation}, f)
+        os.replace(self._head_path + '.tmp', self._head_path)
+
+    def record(self, df: pd.DataFrame, generation: int, timestamp: Optional[float] = None) -> int:
+        """Append the rate changes of a new snapshot; returns how many were written"""
+        timestamp = timestamp or time.time()
+        current = self.current_rates(df)
+        with self._writer():
+            head = self._read_head()
+            if timestamp < head['time']:
+                logger.warning(f"Rate history: skipping generation {generation} fetched at {timestamp}, "
+                               f"older than the last recorded snapshot ({head['time']})")
+                return 0
+            if generation <= head['generation']:
+                logger.info(f"Rate history: recording generation {generation} as {head['generation'] + 1}")
+                generation = head['generation'] + 1
+            self._write_head(timestamp, generation)
+            new_keys = []
+            records = []
+            for key, paise in current.items():
+                key_id = self._key_ids.get(key)
+                if key_id is None:
+                    key_id = self._add_key(key)
+                    new_keys.append(key)
+                previous = self._latest.get(key_id)
+                if previous != paise:
+                    records.append((key_id, paise - (previous or 0), 0))
+            for key_id, previous in self._latest.items():
+                if previous is not None and self.keys[key_id] not in current:
+                    # The delta returns the running sum to zero
+                    records.append((key_id, -previous, 1))
+            if not records:
+                return 0
+
+            if new_keys:
+                with open(self._keys_path, 'ab') as f:
+                    f.truncate(self._keys_offset)
+                    f.write(''.join(json.dumps(list(key)) + '\n' for key in new_keys).encode('utf-8'))
+                    self._keys_offset = f.tell()
+            ids, deltas, removed = zip(*records)
+            count = len(records)
+            columns = {
+                'key': np.array(ids, dtype=COLUMNS['key']),
+                'time': np.full(count, timestamp, dtype=COLUMNS['time']),
+                'generation': np.full(count, generation, dtype=COLUMNS['generation']),
+                'delta': np.array(deltas, dtype=COLUMNS['delta']),
+                'removed': np.array(removed, dtype=COLUMNS['removed']),
+            }
+            for name, dtype in COLUMNS.items():
+                with open(self._column_path(name), 'ab') as f:
+                    # Drop the tail of an append torn by a crash
+                    f.truncate(self.rows * dtype.itemsize)
+                    f.write(columns[name].tobytes())
+            for name in COLUMNS:
+                self._chunks[name].append(columns[name])
+            for key_id, delta, flag in records:
+                self._latest[key_id] = None if flag else (self._latest.get(key_id) or 0) + delta
+            self.rows += count
+            self._index = None
+        logger.info(f"Rate history: {count} changes recorded for generation {generation}")
+        return count
+
+    # --- Queries ---
+
+    def _column(self, name: str) -> np.ndarray:
+        chunks = self._chunks[name]
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0] if chunks else np.empty(0, dtype=COLUMNS[name])
+
+    def _build_index(self) -> Dict[str, np.ndarray]:
+        """Records grouped by key in time order, with each record's absolute rate"""
+        if self._index is None:
+            keys = self._column('key')
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            deltas = self._column('delta')[order]
+            removed = self._column('removed')[order].astype(bool)
+            starts = np.searchsorted(sorted_keys, np.arange(len(self.keys) + 1))
+            running = np.cumsum(deltas)
+            before = np.concatenate(([0], running))[starts[:-1]]
+            self._index = {
+                'starts': starts,
+                'time': self._column('time')[order],
+                'generation': self._column('generation')[order],
+                'rate': running - np.repeat(before, np.diff(starts)),
+                'removed': removed,
+            }
+        return self._index
+
+    def _position(self, index: Dict, key_id: int, timestamp: float) -> int:
+        """Index of the key's last record at or before ``timestamp``; -1 if none"""
+        lo, hi = int(index['starts'][key_id]), int(index['starts'][key_id + 1])
+        pos = lo + int(np.searchsorted(index['time'][lo:hi], timestamp, side='right')) - 1
+        return pos if pos >= lo else -1
+
+    def _rate_at(self, index: Dict, pos: int) -> Optional[int]:
+        if pos < 0 or index['removed'][pos]:
+            return None
+        return int(index['rate'][pos])
+
+    def _select(self, from_origin: str = '', area: str = '', vendor: str = '',
+                vehicle_class: str = '') -> List[int]:
+        """Key ids matching the filters, compared case-insensitively"""
+        wanted = [(i, _norm(value)) for i, value in enumerate((from_origin, area, vendor, vehicle_class)) if value]
+        if from_origin and area:
+            candidates = self._by_lane.get((_norm(from_origin), _norm(area)), [])
+        elif wanted:
+            candidates = min((self._by_field[i].get(value, []) for i, value in wanted), key=len)
+        else:
+            candidates = range(len(self.keys))
+        return [key_id for key_id in candidates
+                if all(self._normalized[key_id][i] == value for i, value in wanted)]
+
+    def _describe_key(self, key_id: int) -> Dict:
+        return dict(zip(KEY_FIELDS, self.keys[key_id]))
+
+    def as_of(self, timestamp: float, from_origin: str = '', area: str = '', vendor: str = '',
+              vehicle_class: str = '', limit: int = 1000) -> Dict:
+        """Rates in force at ``timestamp`` for the keys matching the filters"""
+        self.sync()
+        with self._lock:
+            index = self._build_index()
+            rates = []
+            for key_id in self._select(from_origin, area, vendor, vehicle_class):
+                pos = self._position(index, key_id, timestamp)
+                rate = self._rate_at(index, pos)
+                if rate is not None:
+                    rates.append({
+                        **self._describe_key(key_id),
+                        'rate': _rate(rate),
+                        'since': float(index['time'][pos]),
+                        'generation': int(index['generation'][pos]),
+                    })
+        rates.sort(key=lambda row: -row['rate'])
+        return {'as_of': timestamp, 'total': len(rates), 'rates': rates[:limit]}
+
+    def trend(self, from_origin: str, area: str, months: float = 6, vendor: str = '',
+              vehicle_class: str = '', until: Optional[float] = None) -> Dict:
+        """Rate changes on a lane over the last ``months``, per vendor and vehicle class.
+
+        Each series starts with the rate in force when the window opens.
+        ``highest`` is the lane's top rate after every change in the window.
+        """
+        self.sync()
+        until = until or time.time()
+        since = until - months * SECONDS_PER_MONTH
+        with self._lock:
+            index = self._build_index()
+            series = []
+            for key_id in self._select(from_origin, area, vendor, vehicle_class):
+                start = self._position(index, key_id, since)
+                end = self._position(index, key_id, until)
+                points = [{'timestamp': since, 'rate': self._rate_at(index, start)}]
+                for pos in range(max(start + 1, int(index['starts'][key_id])), end + 1):
+                    points.append({'timestamp': float(index['time'][pos]),
+                                   'generation': int(index['generation'][pos]),
+                                   'rate': self._rate_at(index, pos)})
+                if len(points) == 1 and points[0]['rate'] is None:
+                    continue
+                series.append({**self._describe_key(key_id), 'points': points})
+
+        highest, current = [], {}
+        changes = sorted((point['timestamp'], i, point['rate'])
+                         for i, entry in enumerate(series) for point in entry['points'])
+        for timestamp, i, rate in changes:
+            current[i] = rate
+            top = max((r for r in current.values() if r is not None), default=None)
+            if highest and highest[-1]['timestamp'] == timestamp:
+                highest[-1]['rate'] = _rate(top)
+            elif not highest or highest[-1]['rate'] != _rate(top):
+                highest.append({'timestamp': timestamp, 'rate': _rate(top)})
+
+        for entry in series:
+            rates = [point['rate'] for point in entry['points'] if point['rate'] is not None]
+            first, last = entry['points'][0]['rate'], entry['points'][-1]['rate']
+            entry['changes'] = len(entry['points']) - 1
+            entry['min_rate'] = _rate(min(rates)) if rates else None
+            entry['max_rate'] = _rate(max(rates)) if rates else None
+            entry['change_pct'] = round((last - first) / first * 100, 2) if first and last else None
+            for point in entry['points']:
+                point['rate'] = _rate(point['rate'])
+        series.sort(key=lambda entry: (-(entry['points'][-1]['rate'] or 0), entry['vendor_name']))
+        return {'from_origin': from_origin, 'area': area, 'since': since, 'until': until,
+                'series': series, 'highest': highest}
+
+    def stats(self) -> Dict:
+        """Size of the history on disk and in memory"""
+        self.sync()
+        files = [self._keys_path] + [self._column_path(name) for name in COLUMNS]
+        return {
+            'records': self.rows,
+            'keys': len(self.keys),
+            'live_keys': sum(1 for rate in self._latest.values() if rate is not None),
+            'disk_bytes': sum(os.path.getsize(path) for path in files if os.path.exists(path)),
+            'memory_bytes': sum(chunk.nbytes for chunks in self._chunks.values() for chunk in chunks),
+        }
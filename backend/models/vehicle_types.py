@@ -0,0 +1,129 @@
+# ================================
+# backend/models/vehicle_types.py
+# ================================
+import functools
+import json
+import logging
+import re
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Canonical vehicle classes and the raw spellings that map to them. The
+# canonical names match the vehicle rate columns of the bulk quotation sheet.
+DEFAULT_VEHICLE_TYPE_ALIASES = {
+    'TATA ACE': ['TATA ACE', 'ACE'],
+    'Bolero-Pkup': ['Bolero-Pkup', 'Pikup', 'pick up', 'pickup', 'Bolero'],
+    '407SFC': ['407SFC', 'SFC', '407-SFC'],
+    '407LPT': ['407LPT', 'LPT', '407', '407-LPT', '407 LPT'],
+    '1109': ['1109', '1109-19FT', '19FT'],
+    '22FT - 9 MT': ['22FT - 9 MT', '22FT', '9 MT'],
+    '32FT -SXL': ['32FT -SXL', '32FT SXL', 'SXL'],
+    '32FT -MXL': ['32FT -MXL', '32FT MXL', 'MXL'],
+    '12 WHEEL': ['12 WHEEL', '12 WHEELER', '12W'],
+}
+
+# Resolved raw texts kept per canonicalizer; queries are client input, so
+# the cache is bounded rather than growing with every distinct spelling
+MATCH_CACHE_SIZE = 4096
+
+
+def _normalize(value) -> str:
+    """Uppercase and strip everything but letters and digits"""
+    if value is None:
+        return ''
+    return re.sub(r'[^0-9A-Z]', '', str(value).upper())
+
+
+def _alias_pattern(alias: str):
+    """Regex finding ``alias`` as whole words: '9 MT' matches '22FT-9MT' but not '19MT'"""
+    runs = re.findall(r'[0-9]+|[A-Z]+', str(alias).upper())
+    return re.compile(r'(?<![0-9A-Z])' + r'[^0-9A-Z]*'.join(runs) + r'(?![0-9A-Z])')
+
+
+class VehicleTypeCanonicalizer:
+    """Map messy vehicle type / vehicle number strings to canonical classes.
+
+    A raw value resolves to the class of the longest alias it equals or
+    contains as whole words, so '1109-19FT' is 1109 and '407SFC' beats the
+    bare '407', while 'SPACE' is not an ACE and '19MT' not a '9 MT'.
+    Unknown values map to '' (no class).
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, List[str]]] = None):
+        self.aliases = aliases or DEFAULT_VEHICLE_TYPE_ALIASES
+        self.classes: List[str] = list(self.aliases.keys())
+        # (normalized alias, canonical class), longest alias first
+        self._lookup = sorted(
+            {(_normalize(alias), canonical)
+             for canonical, names in self.aliases.items()
+             for alias in list(names) + [canonical]
+             if _normalize(alias)},
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self._exact = {alias: canonical for alias, canonical in reversed(self._lookup)}
+        # Containment patterns in the same order: the alias's letter and digit
+        # runs, separated by anything but letters and digits, and not touching
+        # another letter or digit on either side
+        self._patterns = [
+            (_alias_pattern(alias), canonical)
+            for _, alias, canonical in sorted(
+                {(len(_normalize(alias)), alias.upper(), canonical)
+                 for canonical, names in self.aliases.items()
+                 for alias in list(names) + [canonical]
+                 if _normalize(alias)},
+                key=lambda item: (-item[0], item[1])
+            )
+        ]
+        # Word boundaries depend on the separators, so cache on the raw text
+        self._match_text = functools.lru_cache(maxsize=MATCH_CACHE_SIZE)(self._resolve)
+
+    @classmethod
+    def from_file(cls, path: Optional[str]) -> 'VehicleTypeCanonicalizer':
+        """Load an alias table ({canonical: [aliases]}) from JSON, or use the defaults"""
+        if not path:
+            return cls()
+        try:
+            with open(path, 'r') as f:
+                return cls(json.load(f))
+        except Exception as e:
+            logger.error(f"Error loading vehicle type aliases from {path}: {str(e)}")
+            return cls()
+
+    def canonicalize(self, raw_type, vehicle_no=None) -> str:
+        """Canonical class for a raw vehicle type, falling back to the vehicle number"""
+        canonical = self._match(raw_type)
+        if canonical or not vehicle_no:
+            return canonical
+
+        # Vehicle numbers look like 'WB23D1704' or 'WB23D1704-407LPT'; only
+        # the suffixes may contain a type, the registration part must match
+        # an alias exactly to avoid picking digits out of the plate.
+        parts = str(vehicle_no).split('-')
+        if self._exact.get(_normalize(parts[0])):
+            return self._exact[_normalize(parts[0])]
+        for part in parts[1:]:
+            canonical = self._match(part)
+            if canonical:
+                return canonical
+        return ''
+
+    def _match(self, raw) -> str:
+        if raw is None:
+            return ''
+        return self._match_text(str(raw).strip().upper())
+
+    def _resolve(self, text: str) -> str:
+        key = _normalize(text)
+        canonical = self._exact.get(key, '')
+        if key and not canonical:
+            for pattern, candidate in self._patterns:
+                if pattern.search(text):
+                    return candidate
+        return canonical
+
+    def code(self, raw_type) -> int:
+        """Integer code of a query's class in the categorical column, -1 if unknown"""
+        canonical = raw_type if raw_type in self.classes else self._match(raw_type)
+        return self.classes.index(canonical) if canonical else -1
@@ -0,0 +1,150 @@
+# ================================
+# backend/services/bootstrap.py
+# ================================
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Builds the backend services either eagerly or in a background thread.
+
+    The heavy modules (pandas, scikit-learn, google-auth, requests) are only
+    imported inside ``build`` so that importing the Flask app stays cheap and
+    ``/api/healthz`` can answer before the sheet has been authenticated.
+    """
+
+    # Seconds between attempts after a failed background build, doubling up
+    # to RETRY_MAX_DELAY
+    RETRY_DELAY = 5.0
+    RETRY_MAX_DELAY = 300.0
+
+    PENDING = 'pending'
+    STARTING = 'starting'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self):
+        self.sheets_service = None
+        self.ai_engine = None
+        self.quotation_service = None
+        self.report_jobs = None
+        self.state = self.PENDING
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.next_retry_at: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def build(self, warm_up: bool = False):
+        """Construct the services in the calling thread.
+
+        With ``warm_up`` the first data snapshot is fetched and cleaned before
+        the container reports ready, so the first real request is served from
+        cache.
+        """
+        with self._lock:
+            if self.state == self.READY:
+                return
+            self.state = self.STARTING
+            self.started_at = self.started_at or time.time()
+            self.attempts += 1
+
+        try:
+            from models.ai_engine import AIQuotationEngine
+            from services.google_sheets import GoogleSheetsService
+            from services.quotation_service import QuotationService
+            from services.report_jobs import ReportJobManager
+            from config import Config
+
+            if Config.FAKE_SHEETS_ROWS > 0:
+                from services.fake_sheets import FakeGoogleSheetsService
+                sheets_service = FakeGoogleSheetsService(Config.FAKE_SHEETS_ROWS, Config.FAKE_SHEETS_LATENCY)
+            else:
+                sheets_service = GoogleSheetsService()
+            ai_engine = AIQuotationEngine()
+            quotation_service = QuotationService(sheets_service, ai_engine)
+            report_jobs = ReportJobManager(quotation_service, Config.REPORT_DIR,
+                                           quotation_service.store, Config.REPORT_TTL_SECONDS)
+
+            if warm_up:
+                ai_engine.warm_up()
+                quotation_service._get_fresh_data()
+
+            self.sheets_service = sheets_service
+            self.ai_engine = ai_engine
+            self.quotation_service = quotation_service
+            self.report_jobs = report_jobs
+            self.state = self.READY
+            self.error = None
+            self.next_retry_at = None
+            self.ready_at = time.time()
+            self._ready.set()
+            logger.info(f"✅ Services initialized in {self.ready_at - self.started_at:.2f}s")
+        except Exception as e:
+            self.state = self.FAILED
+            self.error = str(e)
+            logger.critical(f"❌ Failed to initialize services: {e}", exc_info=True)
+            raise
+
+    def start_background(self, warm_up: bool = True) -> threading.Thread:
+        """Build the services in a daemon thread and return immediately"""
+        with self._lock:
+            if self._thread is not None:
+                return self._thread
+            self.started_at = time.time()
+            self._thread = threading.Thread(
+                target=self._build_quietly,
+                args=(warm_up,),
+                name='service-bootstrap',
+                daemon=True
+            )
+            self._thread.start()
+        logger.info("🚀 Service initialization started in background")
+        return self._thread
+
+    def _build_quietly(self, warm_up: bool):
+        """Build, retrying with backoff so one failed start is not permanent"""
+        delay = self.RETRY_DELAY
+        while True:
+            try:
+                self.build(warm_up=warm_up)
+                return
+            except Exception:
+                # Already logged; readiness reports the failure until a retry works
+                self.next_retry_at = time.time() + delay
+                logger.info(f"Retrying service initialization in {delay:.0f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, self.RETRY_MAX_DELAY)
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def status(self) -> Dict:
+        """Readiness details for the /api/readyz endpoint"""
+        status = {
+            'state': self.state,
+            'ready': self.is_ready(),
+        }
+        if self.started_at:
+            end = self.ready_at or time.time()
+            status['startup_seconds'] = round(end - self.started_at, 3)
+        if self.quotation_service is not None:
+            status['shared_store'] = self.quotation_service.store.describe()
+            if self.quotation_service.history is not None:
+                status['rate_history'] = self.quotation_service.history.stats()
+        if self.error:
+            status['error'] = self.error
+            status['attempts'] = self.attempts
+            if self.next_retry_at:
+                status['retry_in_seconds'] = max(0.0, round(self.next_retry_at - time.time(), 1))
+        return status
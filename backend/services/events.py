@@ -0,0 +1,127 @@
+# ================================
+# backend/services/events.py
+# ================================
+import json
+import logging
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from services.shared_store import SharedStore, create_store
+from utils.helpers import start_daemon
+
+logger = logging.getLogger(__name__)
+
+# Shared store keys: the event id counter and the last event of each type
+EVENT_ID_KEY = 'events:id'
+EVENT_KEY = 'events:last:{}'
+
+
+class EventBroker:
+    """Fan-out of server-sent events through the shared store.
+
+    ``publish`` writes the event as the last one of its type to the store,
+    with an id from a shared counter. Every worker runs one poller thread
+    while it has subscribers, which reads those keys and wakes its streams,
+    so clients on any worker hear about a generation whichever worker
+    fetched it. A stream only ever sends the latest event of each type: a
+    slow client skips events rather than queueing them, and a new client
+    learns the current data generation as soon as it connects.
+
+    At most ``max_subscribers`` streams are open per worker: ``subscribe``
+    takes a slot (False when there is none left) and the caller gives it
+    back with ``unsubscribe`` when the response is closed.
+    """
+
+    def __init__(self, store: Optional[SharedStore] = None, event_types: Sequence[str] = ('generation',),
+                 max_subscribers: int = 100, poll_interval: float = 1.0):
+        self.store = store or create_store('memory://')
+        self.event_types = list(event_types)
+        self.max_subscribers = max_subscribers
+        self.poll_interval = poll_interval
+        self._subscribers = 0
+        self._last_events: Dict[str, Dict] = {}
+        self._last_id = 0
+        self._changed = threading.Condition()
+        self._poller_started = False
+
+    def has_subscribers(self) -> bool:
+        return self._subscribers > 0
+
+    def subscribe(self) -> bool:
+        with self._changed:
+            if self._subscribers >= self.max_subscribers:
+                return False
+            self._subscribers += 1
+            start_poller = not self._poller_started
+            self._poller_started = True
+        if start_poller:
+            self._poll()
+            start_daemon(self._poll_loop, 'event-poller')
+        return True
+
+    def unsubscribe(self):
+        with self._changed:
+            self._subscribers = max(0, self._subscribers - 1)
+
+    def publish(self, event_type: str, data: Dict):
+        event = {'id': self.store.incr(EVENT_ID_KEY), 'event': event_type, 'data': data}
+        self.store.set_json(EVENT_KEY.format(event_type), event)
+        if event_type not in self.event_types:
+            self.event_types.append(event_type)
+        self._deliver([event])
+        logger.info(f"Published {event_type} event {event['id']}")
+
+    def _deliver(self, events: List[Dict]):
+        with self._changed:
+            fresh = [
+                e for e in events
+                if e['id'] > self._last_events.get(e['event'], {}).get('id', 0)
+            ]
+            for event in fresh:
+                self._last_events[event['event']] = event
+                self._last_id = max(self._last_id, event['id'])
+            if fresh:
+                self._changed.notify_all()
+
+    def _poll(self):
+        events = []
+        for event_type in list(self.event_types):
+            try:
+                event = self.store.get_json(EVENT_KEY.format(event_type))
+            except Exception as e:
+                logger.error(f"Error reading {event_type} events: {str(e)}")
+                event = None
+            if event:
+                events.append(event)
+        self._deliver(events)
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.poll_interval)
+            if self.has_subscribers():
+                self._poll()
+
+    def _pending(self, seen: int) -> List[Dict]:
+        return sorted((e for e in self._last_events.values() if e['id'] > seen), key=lambda e: e['id'])
+
+    @staticmethod
+    def format(event: Dict) -> str:
+        """Serialize an event in text/event-stream framing"""
+        return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    def stream(self, heartbeat: float = 15.0, retry_ms: Optional[int] = 5000) -> Iterator[str]:
+        """Yield SSE frames for one subscribed client until it disconnects"""
+        seen = 0
+        if retry_ms:
+            yield f"retry: {retry_ms}\n\n"
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._last_id > seen, timeout=heartbeat)
+                events = self._pending(seen)
+            if not events:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+            for event in events:
+                seen = max(seen, event['id'])
+                yield self.format(event)
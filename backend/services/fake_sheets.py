@@ -0,0 +1,78 @@
+# ================================
+# backend/services/fake_sheets.py
+# ================================
+import logging
+import random
+import time
+from typing import List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Raw spellings as they appear in the vendor sheet's VEHICLE TYE column
+FAKE_VEHICLE_TYPES = ['TATA ACE', 'Pikup', '407SFC', 'LPT', '407', '1109-19FT', '22FT',
+                      '32FT SXL', '32FT MXL', '12 WHEEL', '']
+
+
+class FakeGoogleSheetsService:
+    """Stand-in for GoogleSheetsService that serves a synthetic rate book.
+
+    Used for load tests and capacity checks: the rows are deterministic for a
+    given seed and have the vendor sheet's columns, and ``latency`` simulates
+    the Sheets API round trip. ``change_every`` rewrites a few rates every
+    N fetches so refreshes produce new data generations.
+    """
+
+    def __init__(self, rows: int = 5000, latency: float = 0.0, seed: int = 42,
+                 origins: int = 60, areas: int = 400, vendors: int = 150, change_every: int = 0):
+        self.rows = rows
+        self.latency = latency
+        self.change_every = change_every
+        self.worksheet_names = ['FAKE']
+        self.worksheet_name = 'FAKE'
+        self.loader = None
+        self.fetches = 0
+        rng = random.Random(seed)
+        self.origins = [f"ORIGIN {i:03d}" for i in range(origins)]
+        self.areas = [f"AREA {i:04d}" for i in range(areas)]
+        self.vendors = [f"VENDOR {i:03d}" for i in range(vendors)]
+        self._records = [
+            {
+                'FROM-ORIGIN': rng.choice(self.origins),
+                'PINCODE': str(rng.randint(700001, 799999)) if rng.random() < 0.3 else '',
+                'AREA': rng.choice(self.areas),
+                'RECEIVER NAME': '',
+                'VEHICLE NO.': f"WB{rng.randint(10, 99)}{chr(65 + rng.randint(0, 25))}{rng.randint(1000, 9999)}",
+                'VEHICLE TYE': rng.choice(FAKE_VEHICLE_TYPES),
+                'RATE': rng.randrange(3000, 60000, 50),
+                'VENDOR NAME': rng.choice(self.vendors),
+            }
+            for _ in range(rows)
+        ]
+        self._rng = rng
+
+    def get_data(self) -> Optional['pd.DataFrame']:
+        import pandas as pd
+
+        if self.latency:
+            time.sleep(self.latency)
+        self.fetches += 1
+        if self.change_every and self.fetches % self.change_every == 0:
+            for record in self._rng.sample(self._records, min(10, len(self._records))):
+                record['RATE'] = self._rng.randrange(3000, 60000, 50)
+        logger.info(f"Serving {self.rows} fake rate rows (fetch {self.fetches})")
+        return pd.DataFrame(self._records)
+
+    def lanes(self, count: int, seed: int = 7) -> List[dict]:
+        """Sample ``count`` (from, to, vehicle type) lanes that exist in the data"""
+        rng = random.Random(seed)
+        return [
+            {
+                'from_location': record['FROM-ORIGIN'].title(),
+                'to_location': record['AREA'].title(),
+                'vehicle_type': record['VEHICLE TYE'] or None,
+            }
+            for record in (rng.choice(self._records) for _ in range(count))
+        ]
@@ -1,72 +1,67 @@
 # ================================
 # backend/services/google_sheets.py
 # ================================
-import gspread
 import traceback
-from google.oauth2.service_account import Credentials
-import pandas as pd
 import logging
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 import os
 from config import Config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 class GoogleSheetsService:
-    def __init__(self, worksheet_name: str = 'FINAL-VENDOR 20-24'):
-        self.client = None
-        self.spreadsheet = None
-        self.worksheet = None
-        self.worksheet_name = worksheet_name
+    def __init__(self, worksheet_name: str = 'FINAL-VENDOR 20-24',
+                 worksheet_names: Optional[List[str]] = None):
+        self.loader = None
+        self.worksheet_names = worksheet_names or Config.GOOGLE_WORKSHEETS or [worksheet_name]
+        self.worksheet_name = self.worksheet_names[0]
         self._initialize_client()
     
     def _initialize_client(self):
-        """Initialize Google Sheets client"""
+        """Initialize the Sheets API loader"""
         try:
-            # Define the scope
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            
-            # Load credentials
-            credentials_dict = Config.get_google_credentials_dict()
+            from services.sheet_loader import MultiSheetLoader, SHEETS_SCOPE
+
             credentials_file = Config.GOOGLE_CREDENTIALS_FILE
-            #print("DEBUG: Looking for credentials at:", credentials_file)
-            #print("DEBUG: Credentials dict:", credentials_dict)
             if not os.path.exists(credentials_file):
                 logger.warning(f"Credentials file not found: {credentials_file}. Using demo data.")
                 return
+
+            # Every worksheet or A1 range is fetched over one pooled, authorized
+            # session; opening a worksheet first would reject A1 ranges
+            self.loader = MultiSheetLoader.from_service_account(
+                credentials_file,
+                Config.GOOGLE_SHEETS_ID,
+                self.worksheet_names,
+                # Read-write, for update_data
+                scopes=[SHEETS_SCOPE],
+                base_url=Config.SHEETS_API_BASE_URL,
+                max_concurrency=Config.SHEETS_MAX_CONCURRENCY,
+                max_retries=Config.SHEETS_MAX_RETRIES
+            )
             
-            creds = Credentials.from_service_account_file(credentials_file, scopes=scope)
-            self.client = gspread.authorize(creds)
-            
-            # Open the spreadsheet
-            self.spreadsheet = self.client.open_by_key(Config.GOOGLE_SHEETS_ID)
-            self.worksheet = self.spreadsheet.worksheet(self.worksheet_name)
-            
-            logger.info(f"Google Sheets client initialized successfully. Using worksheet: {self.worksheet_name}")
+            logger.info(f"Google Sheets loader initialized successfully. Using ranges: {self.worksheet_names}")
             
         except Exception as e:
             logger.error(f"Failed to initialize Google Sheets client: {str(e)}")
             logger.error("Failed to initialize Google Sheets client: %s", traceback.format_exc())
-            self.client = None
+            self.loader = None
     
-    def get_data(self) -> Optional[pd.DataFrame]:
+    def get_data(self) -> Optional['pd.DataFrame']:
         """Fetch data from Google Sheets"""
         try:
-            if not self.client or not self.worksheet:
+            if not self.loader:
                 logger.warning("Google Sheets not available, using demo data")
                 return self._get_demo_data()
             
-            # Get all values
-            data = self.worksheet.get_all_records()
-            
-            if not data:
+            df = self.loader.load_merged()
+            if df is None or df.empty:
                 logger.warning("No data found in spreadsheet")
                 return self._get_demo_data()
             
-            df = pd.DataFrame(data)
             logger.info(f"Fetched {len(df)} rows from Google Sheets")
             return df
             
@@ -74,8 +69,10 @@ class GoogleSheetsService:
             logger.error(f"Error fetching data from Google Sheets: {str(e)}")
             return self._get_demo_data()
     
-    def _get_demo_data(self) -> pd.DataFrame:
+    def _get_demo_data(self) -> 'pd.DataFrame':
         """Return demo data when Google Sheets is not available"""
+        import pandas as pd
+
         demo_data = [
             {
                 'FROM-ORIGIN': 'NEW KOROLA',
@@ -160,21 +157,27 @@ class GoogleSheetsService:
         ]
         
         logger.info("Using demo data")
-        return pd.DataFrame(demo_data)
+        df = pd.DataFrame(demo_data)
+        # Not a real generation: the rate history skips it, and a loaded
+        # rate book is kept rather than replaced by it
+        df.attrs['demo'] = True
+        return df
     
     def update_data(self, row_data: dict, row_index: int) -> bool:
         """Update a specific row in the spreadsheet"""
         try:
-            if not self.client or not self.worksheet:
+            if not self.loader:
                 logger.warning("Google Sheets not available for updates")
                 return False
             
-            # Convert dict to list in the correct order
-            headers = self.worksheet.row_values(1)
+            # Convert dict to list in the order of the worksheet's header row
+            sheet = self.worksheet_name.split('!')[0].strip("'").replace("'", "''")
+            header_rows = self.loader.fetch_values(f"'{sheet}'!1:1")
+            headers = header_rows[0] if header_rows else []
             row_values = [row_data.get(header, '') for header in headers]
             
             # Update the row
-            self.worksheet.update(f'A{row_index + 1}', [row_values])
+            self.loader.update_values(f"'{sheet}'!A{row_index + 1}", [row_values])
             logger.info(f"Updated row {row_index + 1} in Google Sheets")
             return True
             
@@ -1,115 +1,518 @@
 # ================================
 # backend/services/quotation_service.py
 # ================================
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional
 import pandas as pd
 import logging
 from models.data_processor import DataProcessor
 from models.ai_engine import AIQuotationEngine
+from models.lane_table import LaneTable
+from models.parallel_matcher import MatchIndex, ParallelMatcher
+from models.rate_history import RateHistoryStore
+from models.vehicle_types import VehicleTypeCanonicalizer
+from services.events import EventBroker
 from services.google_sheets import GoogleSheetsService
+from services.shared_store import SharedStore, create_store
+from services.snapshot_codec import decode_frame, encode_frame, normalize_text_columns
+from config import Config
+from utils.helpers import run_cpu_bound, start_daemon
+from utils.profiling import profiler
+import hashlib
+import json
+import os
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+# Fields of a quotation row and their defaults when the column is missing
+ROUTE_FIELDS = (
+    ('from_origin', ''),
+    ('area', ''),
+    ('vehicle_type', ''),
+    ('vehicle_class', ''),
+    ('rate', 0),
+    ('vendor_name', ''),
+    ('pincode', ''),
+    ('receiver_name', ''),
+    ('vehicle_no', ''),
+)
+
+# Shared store keys: the current snapshot's metadata, the snapshot (Arrow IPC),
+# the refresh lock and the generation counter
+SNAPSHOT_POINTER_KEY = 'rates:pointer'
+SNAPSHOT_KEY = 'rates:snapshot'
+REFRESH_LOCK_KEY = 'rates:refresh-lock'
+GENERATION_KEY = 'rates:generation'
+
+
+class RateSnapshot(NamedTuple):
+    """One generation of the rate book with the lane table and match index built from it.
+
+    Installed with a single assignment: a reader that takes the snapshot
+    once never pairs data with another generation's lane table, locations
+    or id.
+    """
+    data: Optional[pd.DataFrame]
+    lane_table: LaneTable
+    generation: int
+    fingerprint: Optional[str]
+    match_index: MatchIndex
+
+
+EMPTY_SNAPSHOT = RateSnapshot(None, LaneTable(), 0, None, MatchIndex(0, {}, {}))
+
+
 class QuotationService:
-    def __init__(self, sheets_service: GoogleSheetsService, ai_engine: AIQuotationEngine):
+    def __init__(self, sheets_service: GoogleSheetsService, ai_engine: AIQuotationEngine,
+                 store: Optional[SharedStore] = None):
         self.sheets_service = sheets_service
         self.ai_engine = ai_engine
-        self.data_processor = DataProcessor()
-        self.cached_data = None
+        # Snapshot, generation pointer and result caches shared across workers
+        self.store = store or create_store(Config.SHARED_STORE_URL, Config.SHARED_STORE_PREFIX)
+        self.vehicle_types = VehicleTypeCanonicalizer.from_file(Config.VEHICLE_TYPE_ALIASES_FILE)
+        self.data_processor = DataProcessor(self.vehicle_types)
+        self.snapshot = EMPTY_SNAPSHOT
         self.cache_timestamp = 0
         self.cache_ttl = 300  # 5 minutes
+        # Serve the expired snapshot while a single background refresh runs
+        self.stale_while_revalidate = True
+        self._refresh_lock = threading.Lock()
+        self.matcher = ParallelMatcher(
+            ai_engine,
+            processes=Config.MATCH_PROCESSES,
+            min_parallel_candidates=Config.MATCH_PARALLEL_MIN_CANDIDATES
+        )
+        # Clients listening on /api/events, on any worker, are told about
+        # each new generation
+        self.events = EventBroker(self.store, max_subscribers=Config.SSE_MAX_SUBSCRIBERS)
+        self._auto_refresh_started = False
+        # Guards check-then-act on state shared by request threads
+        self._state_lock = threading.Lock()
+        # Rate changes of every generation, for as-of and trend queries
+        self.history = None
+        if Config.RATE_HISTORY_DIR:
+            try:
+                self.history = RateHistoryStore(Config.RATE_HISTORY_DIR)
+            except Exception as e:
+                logger.error(f"Error opening rate history: {str(e)}")
     
+    # The current snapshot's parts; take ``snapshot`` once to use several
+    @property
+    def cached_data(self) -> Optional[pd.DataFrame]:
+        return self.snapshot.data
+
+    @property
+    def generation(self) -> int:
+        return self.snapshot.generation
+
+    @property
+    def lane_table(self) -> LaneTable:
+        return self.snapshot.lane_table
+
+    @property
+    def data_fingerprint(self) -> Optional[str]:
+        return self.snapshot.fingerprint
+
     def _get_fresh_data(self) -> pd.DataFrame:
-        """Get fresh data with caching"""
+        """The current rate book, refreshed as get_snapshot() describes"""
+        data = self.get_snapshot().data
+        return data if data is not None else pd.DataFrame()
+
+    def get_snapshot(self) -> RateSnapshot:
+        """Get fresh data with caching
+
+        Only the very first load blocks the caller. Once a snapshot exists an
+        expired cache is refreshed in the background and requests keep using
+        the previous snapshot until the new one is swapped in.
+        """
         current_time = time.time()
-        
-        if (self.cached_data is None or 
-            current_time - self.cache_timestamp > self.cache_ttl):
-            
-            logger.info("Fetching fresh data from Google Sheets")
-            raw_data = self.sheets_service.get_data()
-            
-            if raw_data is not None:
-                self.cached_data = self.data_processor.clean_data(raw_data)
-                self.cache_timestamp = current_time
+
+        if self.cached_data is None:
+            with self._refresh_lock:
+                if self.cached_data is None:
+                    self._refresh()
+            return self.snapshot
+
+        if current_time - self.cache_timestamp > self.cache_ttl:
+            if not self.stale_while_revalidate:
+                with self._refresh_lock:
+                    if time.time() - self.cache_timestamp > self.cache_ttl:
+                        self._refresh()
             else:
-                logger.error("Failed to fetch data")
-                return pd.DataFrame()
-        
-        return self.cached_data
+                self._refresh_in_background()
+
+        return self.snapshot
+
+    def _refresh_in_background(self):
+        """Start a refresh on a daemon thread unless one is already running"""
+        if self._refresh_lock.acquire(blocking=False):
+            start_daemon(self._refresh_and_release, 'quotation-refresh')
+
+    def _refresh(self):
+        """Fetch and clean a new snapshot; callers must hold the refresh lock
+
+        With a shared store, a snapshot another worker published within the
+        TTL is adopted instead of fetching, and only the worker holding the
+        shared refresh lock calls the Sheets API.
+        """
+        if self.store.shared and self._adopt_shared_snapshot():
+            return
+
+        owner = f"{os.getpid()}:{threading.get_ident()}".encode()
+        if not self.store.add(REFRESH_LOCK_KEY, owner, Config.SHARED_REFRESH_LOCK_SECONDS):
+            if self._wait_for_shared_snapshot():
+                return
+            logger.warning("Shared refresh lock not released in time, fetching anyway")
+
+        try:
+            self._fetch()
+        finally:
+            # Only if still ours: after a timeout another worker may hold it
+            self.store.delete_if(REFRESH_LOCK_KEY, owner)
+
+    def _fetch(self):
+        # Allocation diffs of each refresh while memory tracing is on
+        with profiler.trace('refresh'):
+            self._fetch_and_install()
+
+    def _fetch_and_install(self):
+        logger.info("Fetching fresh data from Google Sheets")
+        started = time.time()
+        raw_data = self.sheets_service.get_data()
+        demo = raw_data is not None and raw_data.attrs.get('demo', False)
+        if demo and self.cached_data is not None:
+            # A failed fetch must not replace real rates with the demo rows
+            logger.warning(f"Sheets fetch fell back to demo data, staying on generation {self.generation}")
+            self.cache_timestamp = started
+            return
+
+        if raw_data is not None:
+            # Swap in one assignment so readers never see a half-built frame
+            with profiler.trace('clean_data'):
+                cleaned = self.data_processor.clean_data(raw_data)
+            if Config.COMPACT_DATA:
+                cleaned = self.data_processor.compact_data(cleaned)
+            if self.store.shared:
+                # What the other workers will decode from the store
+                cleaned = normalize_text_columns(cleaned)
+
+            fingerprint = self.data_processor.fingerprint(cleaned)
+            if self.cached_data is not None and fingerprint == self.data_fingerprint:
+                # Unchanged sheet: keep the generation and its derived tables
+                logger.info(f"Data unchanged, staying on generation {self.generation}")
+                self.cache_timestamp = started
+                self._publish_pointer()
+                return
+
+            # Generation ids come from the store so all workers agree on them
+            generation = max(self.store.incr(GENERATION_KEY), self.generation + 1)
+            self._install(cleaned, fingerprint, generation, started)
+            if not demo:
+                self._record_history(cleaned, generation, started)
+            if self.store.shared:
+                self.store.set(SNAPSHOT_KEY, encode_frame(cleaned, {
+                    'fingerprint': fingerprint,
+                    'generation': generation
+                }))
+            self._publish_pointer()
+        else:
+            logger.error("Failed to fetch data")
+
+    def _install(self, cleaned: pd.DataFrame, fingerprint: str, generation: int, timestamp: float,
+                 announce: bool = True):
+        """Swap in a new snapshot and announce its generation
+
+        A snapshot adopted from the shared store is not announced again: the
+        worker that fetched it already published the event to every worker.
+        """
+        lane_table = LaneTable.build(cleaned, generation)
+        changed_lanes = lane_table.diff(self.snapshot.lane_table)
+        snapshot = RateSnapshot(cleaned, lane_table, generation, fingerprint, self._location_index(cleaned))
+        self.snapshot = snapshot
+        self.cache_timestamp = timestamp
+        if announce:
+            self._publish_generation(snapshot, changed_lanes)
+
+    def _record_history(self, cleaned: pd.DataFrame, generation: int, timestamp: float):
+        """Append the generation's rate changes; only the fetching worker records"""
+        if self.history is None:
+            return
+        try:
+            self.history.record(cleaned, generation, timestamp)
+        except Exception as e:
+            logger.error(f"Error recording rate history: {str(e)}")
+
+    def _publish_pointer(self):
+        snapshot = self.snapshot
+        self.store.set_json(SNAPSHOT_POINTER_KEY, {
+            'generation': snapshot.generation,
+            'fingerprint': snapshot.fingerprint,
+            'timestamp': self.cache_timestamp,
+            'row_count': len(snapshot.data)
+        })
+
+    def _adopt_shared_snapshot(self) -> bool:
+        """Use the snapshot in the shared store if it is within the TTL"""
+        try:
+            pointer = self.store.get_json(SNAPSHOT_POINTER_KEY)
+            if not pointer or time.time() - pointer['timestamp'] > self.cache_ttl:
+                return False
+            if pointer['fingerprint'] == self.data_fingerprint and self.cached_data is not None:
+                self.cache_timestamp = pointer['timestamp']
+                return True
+
+            payload = self.store.get(SNAPSHOT_KEY)
+            if payload is None:
+                return False
+            data, snapshot = decode_frame(payload)
+            if snapshot['fingerprint'] != pointer['fingerprint']:
+                # A newer snapshot is being written; fetch or retry later
+                return False
+            logger.info(f"Adopting shared snapshot, generation {snapshot['generation']}")
+            self._install(data, snapshot['fingerprint'],
+                          snapshot['generation'], pointer['timestamp'], announce=False)
+            return True
+        except Exception as e:
+            logger.error(f"Error reading shared snapshot: {str(e)}")
+            return False
+
+    def _wait_for_shared_snapshot(self) -> bool:
+        """Another worker is fetching: keep the stale snapshot, or wait for theirs"""
+        if self.cached_data is not None:
+            # Check the store again in a few seconds rather than on every request
+            self.cache_timestamp = time.time() - self.cache_ttl + 5
+            return True
+        deadline = time.time() + Config.SHARED_REFRESH_LOCK_SECONDS
+        while time.time() < deadline:
+            time.sleep(0.5)
+            if self._adopt_shared_snapshot():
+                return True
+            if self.store.get(REFRESH_LOCK_KEY) is None:
+                break
+        return False
+
+    def _cached_result(self, kind: str, generation: int, params: Dict, compute):
+        """Result of ``compute()`` cached in the shared store for ``generation``
+
+        The generation must be the one of the snapshot ``compute`` reads, so
+        a refresh in between cannot file an old result under a new id.
+        """
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        key = f"result:{kind}:{generation}:{digest}"
+        try:
+            cached = self.store.get_json(key)
+        except Exception as e:
+            logger.error(f"Error reading cached {kind}: {str(e)}")
+            cached = None
+        if cached is not None:
+            return cached
+        result = compute()
+        self.store.set_json(key, result, ttl=self.cache_ttl, cache=True)
+        return result
+
+    def _publish_generation(self, snapshot: RateSnapshot, changed_lanes: List[Dict], max_lanes: int = 100):
+        self.events.publish('generation', {
+            'generation': snapshot.generation,
+            'row_count': len(snapshot.data),
+            'timestamp': self.cache_timestamp,
+            'changed_lane_count': len(changed_lanes),
+            'changed_lanes': changed_lanes[:max_lanes],
+            'truncated': len(changed_lanes) > max_lanes
+        })
+
+    def ensure_auto_refresh(self, interval: Optional[float] = None):
+        """Keep refreshing on the TTL while event subscribers are connected
+
+        Without this an idle instance only notices sheet changes when a
+        request happens to arrive after the TTL.
+        """
+        with self._state_lock:
+            if self._auto_refresh_started:
+                return
+            self._auto_refresh_started = True
+        start_daemon(self._auto_refresh_loop, 'quotation-auto-refresh', interval or self.cache_ttl)
+
+    def _auto_refresh_loop(self, interval: float):
+        while True:
+            time.sleep(interval)
+            if self.events.has_subscribers():
+                try:
+                    self._get_fresh_data()
+                except Exception as e:
+                    logger.error(f"Error in auto refresh: {str(e)}")
+
+    def _refresh_and_release(self):
+        try:
+            self._refresh()
+        except Exception as e:
+            logger.error(f"Error refreshing data: {str(e)}")
+        finally:
+            self._refresh_lock.release()
     
+    def _location_index(self, df: pd.DataFrame) -> MatchIndex:
+        """Publish the unique origins/destinations of a new snapshot to the matcher
+
+        Only called when a snapshot is installed, so a request still holding
+        an older snapshot never publishes it again; the matcher checks and
+        publishes under its own lock.
+        """
+        return self.matcher.publish(lambda: {
+            'origins': df['from_origin'].dropna().unique().tolist(),
+            'destinations': df['area'].dropna().unique().tolist()
+        }, source=df)
+
     def get_quotations(self, from_location: str, to_location: str, 
                       vehicle_type: Optional[str] = None, 
                       max_results: int = 1000) -> Dict:
-        """Get quotations based on search criteria"""
+        """Get quotations based on search criteria
+
+        The snapshot and result cache are read here, in the
+        caller's thread or greenlet; only the matching and filtering on them
+        goes through run_cpu_bound, which takes no locks and does no I/O.
+        """
         try:
-            df = self._get_fresh_data()
+            snapshot = self.get_snapshot()
             
-            if df.empty:
+            if snapshot.data is None or snapshot.data.empty:
                 return {'max_rate': None, 'other_rates': []}
-            
-            # Filter data based on criteria
-            filtered_routes = []
-            
-            # Get all potential origin matches
-            origins = df['from_origin'].dropna().unique().tolist()
-            origin_matches = self.ai_engine.match_location(from_location, origins)
-            
-            # Get all potential destination matches
-            destinations = df['area'].dropna().unique().tolist()
-            destination_matches = self.ai_engine.match_location(to_location, destinations)
-            
-            if not origin_matches and not destination_matches:
-                logger.warning(f"No location matches found for {from_location} -> {to_location}")
-                return {'max_rate': None, 'other_rates': []}
-            
-            # Filter dataframe based on matches
-            matched_routes = df.copy()
-            
-            if origin_matches:
-                matched_origins = [match[0] for match in origin_matches]  # All matches
-                matched_routes = matched_routes[matched_routes['from_origin'].isin(matched_origins)]
-            
-            if destination_matches:
-                matched_destinations = [match[0] for match in destination_matches]  # All matches
-                matched_routes = matched_routes[matched_routes['area'].isin(matched_destinations)]
 
-            if vehicle_type:
+            return self._cached_result('quotations', snapshot.generation, {
+                'from': from_location, 'to': to_location,
+                'vehicle_type': vehicle_type, 'max_results': max_results
+            }, lambda: run_cpu_bound(self._match_and_build, snapshot, from_location,
+                                     to_location, vehicle_type, max_results))
+        except Exception as e:
+            logger.error(f"Error in get_quotations: {str(e)}")
+            return {'max_rate': None, 'other_rates': []}
+
+    def _match_and_build(self, snapshot: RateSnapshot, from_location: str, to_location: str,
+                         vehicle_type: Optional[str], max_results: int) -> Dict:
+        # Match against the snapshot's own locations, whatever was published since
+        index = snapshot.match_index
+
+        # Get all potential origin matches
+        origin_matches = self.matcher.match_location(from_location, 'origins', index=index)
+
+        # Get all potential destination matches
+        destination_matches = self.matcher.match_location(to_location, 'destinations', index=index)
+
+        return self._build_quotations(snapshot, from_location, to_location, origin_matches,
+                                      destination_matches, vehicle_type, max_results)
+
+    def get_quotations_batch(self, lanes: List[Dict], max_results: int = 1000) -> List[Dict]:
+        """Get quotations for many lanes at once
+
+        Each lane is a dict with ``from_location``, ``to_location`` and an
+        optional ``vehicle_type``. Location matching for all lanes is spread
+        over the matcher's process pool; results keep the input order.
+        """
+        empty = {'max_rate': None, 'other_rates': []}
+        try:
+            snapshot = self.get_snapshot()
+            if snapshot.data is None or snapshot.data.empty or not lanes:
+                return [dict(empty) for _ in lanes]
+            return run_cpu_bound(self._match_and_build_batch, snapshot, lanes, max_results)
+        except Exception as e:
+            logger.error(f"Error in get_quotations_batch: {str(e)}")
+            return [dict(empty) for _ in lanes]
+
+    def _match_and_build_batch(self, snapshot: RateSnapshot, lanes: List[Dict], max_results: int) -> List[Dict]:
+        index = snapshot.match_index
+        from_queries = sorted({str(lane.get('from_location', '')) for lane in lanes})
+        to_queries = sorted({str(lane.get('to_location', '')) for lane in lanes})
+        origin_matches = dict(zip(from_queries, self.matcher.match_many(from_queries, 'origins', index=index)))
+        destination_matches = dict(zip(to_queries, self.matcher.match_many(to_queries, 'destinations', index=index)))
+
+        results = []
+        for lane in lanes:
+            from_location = str(lane.get('from_location', ''))
+            to_location = str(lane.get('to_location', ''))
+            results.append(self._build_quotations(
+                snapshot, from_location, to_location,
+                origin_matches[from_location], destination_matches[to_location],
+                lane.get('vehicle_type'), lane.get('max_results', max_results)
+            ))
+        return results
+
+    def _build_quotations(self, snapshot: RateSnapshot, from_location: str, to_location: str,
+                          origin_matches: List, destination_matches: List,
+                          vehicle_type: Optional[str], max_results: int) -> Dict:
+        """Filter a snapshot by matched locations and shape the quotation result"""
+        if not origin_matches and not destination_matches:
+            logger.warning(f"No location matches found for {from_location} -> {to_location}")
+            return {'max_rate': None, 'other_rates': []}
+        
+        # Filter dataframe based on matches (boolean indexing already copies)
+        matched_routes = snapshot.data
+        matched_origins = None
+        matched_destinations = None
+        
+        if origin_matches:
+            matched_origins = [match[0] for match in origin_matches]  # All matches
+            matched_routes = matched_routes[matched_routes['from_origin'].isin(matched_origins)]
+        
+        if destination_matches:
+            matched_destinations = [match[0] for match in destination_matches]  # All matches
+            matched_routes = matched_routes[matched_routes['area'].isin(matched_destinations)]
+
+        lane_table = snapshot.lane_table
+        lane_ids = lane_table.lane_ids(matched_origins, matched_destinations)
+
+        if vehicle_type:
+            class_code = self.vehicle_types.code(vehicle_type)
+            if class_code >= 0 and 'vehicle_class' in matched_routes.columns:
+                # Integer comparison on the categorical codes
+                matched_routes = matched_routes[matched_routes['vehicle_class'].cat.codes == class_code]
+                vehicle_class = self.vehicle_types.classes[class_code]
+                lane_ids = [i for i in lane_ids if lane_table.lanes[i]['vehicle_class'] == vehicle_class]
+            else:
                 matched_routes = matched_routes[
                     matched_routes['vehicle_type'].str.lower() == vehicle_type.lower()
                 ]
-            if max_results and max_results < 10000:
-                matched_routes = matched_routes.head(max_results)
-            # Build output
-            for _, row in matched_routes.iterrows():
-                filtered_routes.append({
-                    'from_origin': row.get('from_origin', ''),
-                    'area': row.get('area', ''),
-                    'vehicle_type': row.get('vehicle_type', ''),
-                    'rate': row.get('rate', 0),
-                    'vendor_name': row.get('vendor_name', ''),
-                    'pincode': row.get('pincode', ''),
-                    'receiver_name': row.get('receiver_name', ''),
-                    'vehicle_no': row.get('vehicle_no', '')
-                })
-            filtered_routes = [r for r in filtered_routes if r['rate'] and r['rate'] > 0]
-            if not filtered_routes:
+                lane_ids = [i for i in lane_ids
+                            if str(lane_table.lanes[i]['vehicle_type']).lower() == vehicle_type.lower()]
+        total_matched = len(matched_routes)
+        if max_results and max_results < 10000:
+            matched_routes = matched_routes.head(max_results)
+        # Build output column-wise; tolist() yields plain Python values
+        n = len(matched_routes)
+        columns = [
+            matched_routes[name].tolist() if name in matched_routes.columns else [default] * n
+            for name, default in ROUTE_FIELDS
+        ]
+        field_names = [name for name, _ in ROUTE_FIELDS]
+        labels = matched_routes.index.tolist()
+
+        # The lane table knows each lane's top row; it answers unless
+        # max_results truncated the match set. The row is split off while
+        # the routes are built, so no second pass looks for it.
+        max_label = lane_table.max_row(lane_ids) if n == total_matched else None
+        max_rate_entry = None
+        other_rates = []
+        for label, values in zip(labels, zip(*columns)):
+            route = dict(zip(field_names, values))
+            if not route['rate'] or route['rate'] <= 0:
+                continue
+            if label == max_label:
+                max_rate_entry = route
+            else:
+                other_rates.append(route)
+        if max_rate_entry is None:
+            if not other_rates:
                 return {'max_rate': None, 'other_rates': []}
-            max_rate_entry = max(filtered_routes, key=lambda x: x['rate'])
-            other_rates = [r for r in filtered_routes if r != max_rate_entry]
-            return {
-                'max_rate': max_rate_entry,
-                'other_rates': other_rates,
-                'total_found': len(filtered_routes)
-            }
-        except Exception as e:
-            logger.error(f"Error in get_quotations: {str(e)}")
-            return {'max_rate': None, 'other_rates': []}
+            max_pos = max(range(len(other_rates)), key=lambda i: other_rates[i]['rate'])
+            max_rate_entry = other_rates.pop(max_pos)
+        return {
+            'max_rate': max_rate_entry,
+            'other_rates': other_rates,
+            'total_found': len(other_rates) + 1
+        }
 
     def get_analytics(self) -> Dict:
-        df = self._get_fresh_data()
-        if df.empty:
+        snapshot = self.get_snapshot()
+        df = snapshot.data
+        if df is None or df.empty:
             return {
                 'total_routes': 0,
                 'total_vendors': 0,
@@ -118,7 +521,55 @@ class QuotationService:
                 'avg_rates_by_vehicle_type': [],
                 'vendor_performance': []
             }
-        return self.data_processor.calculate_analytics(df)
+        return self._cached_result('analytics', snapshot.generation, {},
+                                   lambda: run_cpu_bound(self.data_processor.calculate_analytics, df))
+
+    def get_lanes(self, search: str = '', page: int = 1, page_size: int = 50) -> Dict:
+        """Paginated lane leaderboard of the current snapshot"""
+        return self.get_snapshot().lane_table.search(search, page, page_size)
+
+    def _record_pending_history(self):
+        """Let an expired or missing snapshot be fetched, and its changes recorded
+
+        History queries answer from the records already written and do not
+        wait for the refresh.
+        """
+        if self.cached_data is None or time.time() - self.cache_timestamp > self.cache_ttl:
+            self._refresh_in_background()
+
+    def get_rates_as_of(self, timestamp: float, from_origin: str = '', area: str = '',
+                        vendor: str = '', vehicle_type: str = '', limit: int = 1000) -> Dict:
+        """Rates in force at a past time, from the rate history"""
+        self._record_pending_history()
+        vehicle_class = self.vehicle_types.canonicalize(vehicle_type) or vehicle_type
+        return self.history.as_of(timestamp, from_origin, area, vendor, vehicle_class, limit)
+
+    def get_rate_trend(self, from_origin: str, area: str, months: float = 6,
+                       vendor: str = '', vehicle_type: str = '') -> Dict:
+        """Rate changes on a lane over the last ``months``, from the rate history"""
+        self._record_pending_history()
+        vehicle_class = self.vehicle_types.canonicalize(vehicle_type) or vehicle_type
+        return self.history.trend(from_origin, area, months, vendor, vehicle_class)
+
+    def get_memory_report(self) -> Dict:
+        """Per-column memory usage of the cached rate book"""
+        df = self._get_fresh_data()
+        return self.data_processor.memory_report(df)
+
+    def get_vehicle_types(self) -> Dict:
+        """Canonical vehicle classes with their aliases and row counts"""
+        df = self._get_fresh_data()
+        counts = {}
+        if 'vehicle_class' in df.columns:
+            counts = df['vehicle_class'].value_counts().to_dict()
+        return {
+            'classes': [
+                {'vehicle_class': name, 'aliases': list(self.vehicle_types.aliases[name]),
+                 'count': int(counts.get(name, 0))}
+                for name in self.vehicle_types.classes
+            ],
+            'unclassified': int(counts.get('', 0))
+        }
 
     def get_vendors(self) -> List[str]:
         """Get a list of all unique vendor names"""
@@ -0,0 +1,157 @@
+# ================================
+# backend/services/rate_export.py
+# ================================
+import logging
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from services.snapshot_codec import string_categories
+
+logger = logging.getLogger(__name__)
+
+# Export format -> response mimetype
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def negotiate_format(requested: Optional[str], accept) -> Optional[str]:
+    """Pick an export format from ``?format=`` or the Accept header.
+
+    ``accept`` is werkzeug's MIMEAccept. NDJSON is the default when the
+    client accepts anything; Arrow is only offered when pyarrow is installed.
+    Returns None when nothing acceptable can be produced.
+    """
+    available = [fmt for fmt in EXPORT_FORMATS if fmt != 'arrow' or arrow_available()]
+    if requested:
+        requested = requested.lower()
+        return requested if requested in available else None
+    if not accept:
+        return 'ndjson'
+
+    best = accept.best_match([EXPORT_FORMATS[fmt] for fmt in available])
+    if best is None:
+        return None
+    return next(fmt for fmt in available if EXPORT_FORMATS[fmt] == best)
+
+
+class _ChunkSink:
+    """Write-only file object the Arrow stream writer flushes into"""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+class RateBookExporter:
+    """Stream a rate book snapshot as NDJSON, CSV or Arrow IPC.
+
+    The frame is serialized ``chunk_rows`` rows at a time, so the response
+    starts after the first chunk and the extra memory is one chunk's worth of
+    output regardless of the sheet size. The exporter holds on to the frame
+    it was given, so a refresh in the middle of a download does not mix
+    two generations.
+    """
+
+    def __init__(self, df: pd.DataFrame, chunk_rows: int = 5000):
+        self.df = df
+        self.chunk_rows = max(1, chunk_rows)
+
+    def _chunks(self) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(self.df), self.chunk_rows):
+            yield self.df.iloc[start:start + self.chunk_rows]
+
+    def stream(self, fmt: str) -> Iterator[bytes]:
+        writers = {'ndjson': self.iter_ndjson, 'csv': self.iter_csv, 'arrow': self.iter_arrow}
+        return writers[fmt]()
+
+    def iter_ndjson(self) -> Iterator[bytes]:
+        """One JSON object per row, the same shape as /api/vendor-rates"""
+        for chunk in self._chunks():
+            text = chunk.to_json(orient='records', lines=True, date_format='iso')
+            if text:
+                yield (text if text.endswith('\n') else text + '\n').encode('utf-8')
+
+    def iter_csv(self) -> Iterator[bytes]:
+        yield self.df.iloc[:0].to_csv(index=False).encode('utf-8')
+        for chunk in self._chunks():
+            yield chunk.to_csv(index=False, header=False).encode('utf-8')
+
+    def _text_columns(self):
+        return [c for c in self.df.columns if self.df[c].dtype == object]
+
+    def _categorical_columns(self):
+        return [c for c in self.df.columns if isinstance(self.df[c].dtype, pd.CategoricalDtype)]
+
+    @staticmethod
+    def _as_text(chunk: pd.DataFrame, columns, categoricals=()) -> pd.DataFrame:
+        """Object columns as strings and categoricals with string categories;
+        sheet columns such as vehicle_no mix numbers and text, which Arrow
+        cannot infer one type for"""
+        if columns:
+            chunk = chunk.astype({c: 'string' for c in columns})
+        converted = {c: string_categories(chunk[c]) for c in categoricals}
+        converted = {c: series for c, series in converted.items() if series is not chunk[c]}
+        return chunk.assign(**converted) if converted else chunk
+
+    def iter_arrow(self) -> Iterator[bytes]:
+        """Arrow IPC stream: the schema, then one record batch per chunk.
+
+        Categorical columns become dictionary-encoded columns, and because
+        every chunk shares the full category list, each dictionary is sent
+        only once. Object columns are sent as strings, and categories that
+        are not all strings as their text. The schema is built
+        here rather than in the generator, so a frame Arrow cannot convert
+        fails before the response headers go out.
+        """
+        import pyarrow as pa
+
+        text_columns = self._text_columns()
+        categoricals = self._categorical_columns()
+        # Types come from the first chunk; a column that is empty there
+        # infers as null, so it falls back to string
+        first = self._as_text(self.df.iloc[:self.chunk_rows], text_columns, categoricals)
+        schema = pa.Schema.from_pandas(first, preserve_index=False)
+        for i, field in enumerate(schema):
+            if pa.types.is_null(field.type) or field.name in text_columns:
+                schema = schema.set(i, field.with_type(pa.string()))
+        # Fail now on anything else the first chunk cannot be converted for
+        pa.RecordBatch.from_pandas(first, schema=schema, preserve_index=False)
+        return self._arrow_batches(schema, text_columns, categoricals)
+
+    def _arrow_batches(self, schema, text_columns, categoricals) -> Iterator[bytes]:
+        import pyarrow as pa
+
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for chunk in self._chunks():
+                chunk = self._as_text(chunk, text_columns, categoricals)
+                writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield sink.drain()
+        # End-of-stream marker (and the schema, for an empty frame)
+        yield sink.drain()
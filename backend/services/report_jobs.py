@@ -0,0 +1,383 @@
+# ================================
+# backend/services/report_jobs.py
+# ================================
+import csv
+import json
+import logging
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence
+
+from services.shared_store import SharedStore
+from utils.helpers import start_daemon
+
+logger = logging.getLogger(__name__)
+
+# The bulk quotation screen renders the PDF from the XLSX with jsPDF
+REPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+}
+
+
+def _normalize(value) -> str:
+    """Lowercase letters and digits only, like normalizeCity() in the browser"""
+    return re.sub(r'[^a-z0-9]', '', str(value or '').lower())
+
+
+def apply_percent(value, multiplier: float):
+    """Server-side applyPercentToRates for one rate cell"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    if number > 0:
+        return int(round(number * multiplier))
+    return value
+
+
+class BulkQuoteFiller:
+    """Fill the vehicle rate columns of a customer lane sheet.
+
+    Mirrors the bulk quotation screen: a lane matches when the normalized
+    DC city and customer city equal the vendor row's origin and area, each
+    rate column gets the highest rate of its vehicle class, and the markup
+    is applied to every positive rate in those columns. Column headers are
+    resolved to vehicle classes by ``canonicalize`` (the service's
+    VehicleTypeCanonicalizer), so '407 LPT' or '32FT SXL' count too.
+    """
+
+    # Vendors kept per lane for the preview's rate details
+    DETAIL_VENDORS = 3
+
+    def __init__(self, lane_table, canonicalize: Callable[[str], str], percent: float = 0):
+        self.canonicalize = canonicalize
+        self.multiplier = 1 + percent / 100.0
+        # Lanes of the same cities and class but different raw vehicle types
+        # are merged: (origin, area, CLASS) -> highest/lowest vendors, count
+        self.lanes: Dict[tuple, Dict] = {}
+        for lane in lane_table.lanes:
+            key = (_normalize(lane['from_origin']), _normalize(lane['area']),
+                   str(lane['vehicle_class']).upper())
+            merged = self.lanes.setdefault(key, {'highest': [], 'lowest': [], 'count': 0})
+            merged['highest'] += [lane['highest']] + ([lane['second_highest']] if lane['second_highest'] else [])
+            merged['lowest'] += lane['lowest']
+            merged['count'] += lane['count']
+        for merged in self.lanes.values():
+            merged['highest'] = sorted(merged['highest'], key=lambda v: -v['rate'])[:self.DETAIL_VENDORS]
+            merged['lowest'] = sorted(merged['lowest'], key=lambda v: v['rate'])[:self.DETAIL_VENDORS]
+        self.header: List = []
+        self.filled = 0
+        self.total_cells = 0
+
+    @staticmethod
+    def find_header(row: Sequence) -> bool:
+        """The header is the first row with at least 3 non-empty cells"""
+        return sum(1 for cell in row if cell is not None and str(cell).strip()) >= 3
+
+    def set_header(self, header: Sequence):
+        self.header = ['' if h is None else h for h in header]
+        names = [_normalize(h) for h in self.header]
+
+        def index(*candidates):
+            return next((names.index(c) for c in candidates if c in names), -1)
+
+        self.origin_idx = index('dccity')
+        self.area_idx = index('customercity', 'customer')
+        classes = [self.canonicalize(str(h)) if str(h).strip() else '' for h in self.header]
+        self.rate_idx = [(i, c.upper()) for i, c in enumerate(classes) if c]
+
+    def _cities(self, row: Sequence) -> tuple:
+        origin = _normalize(row[self.origin_idx]) if self.origin_idx >= 0 else ''
+        area = _normalize(row[self.area_idx]) if self.area_idx >= 0 else ''
+        return origin, area
+
+    def fill_rates(self, row: Sequence) -> Optional[List]:
+        """The row with the highest lane rates filled in; None for repeated headers"""
+        row = ['' if cell is None else cell for cell in row]
+        if [str(c).strip() for c in row] == [str(h).strip() for h in self.header[:len(row)]]:
+            return None
+        row += [''] * (len(self.header) - len(row))
+        origin, area = self._cities(row)
+        for idx, vehicle_class in self.rate_idx:
+            self.total_cells += 1
+            lane = self.lanes.get((origin, area, vehicle_class)) if origin and area else None
+            if lane:
+                row[idx] = lane['highest'][0]['rate']
+                self.filled += 1
+        return row
+
+    def mark_up(self, row: List) -> List:
+        """Apply the markup to every positive rate of a filled row"""
+        for idx, _ in self.rate_idx:
+            row[idx] = apply_percent(row[idx], self.multiplier)
+        return row
+
+    def fill(self, row: Sequence) -> Optional[List]:
+        """The row with rates filled and marked up; None for repeated headers"""
+        row = self.fill_rates(row)
+        return self.mark_up(row) if row is not None else None
+
+    def details(self, rows: Sequence[Sequence]) -> List[Dict]:
+        """Vendor details of the lanes the given rows were filled from"""
+        details = {}
+        for row in rows:
+            origin, area = self._cities(row)
+            for idx, vehicle_class in self.rate_idx:
+                key = (origin, area, vehicle_class)
+                if key in self.lanes and key not in details:
+                    details[key] = {
+                        'dc_city': row[self.origin_idx],
+                        'customer_city': row[self.area_idx],
+                        'column': self.header[idx],
+                        'vehicle_class': vehicle_class,
+                        **self.lanes[key]
+                    }
+        return list(details.values())
+
+
+class ReportJobManager:
+    """Generate bulk quotation reports in background jobs.
+
+    An uploaded lane sheet is read row by row (openpyxl read-only mode) and
+    written at the same time to every requested format: XLSX through
+    openpyxl's write-only mode, and CSV. Memory stays flat however many
+    lanes the sheet has. The first ``PREVIEW_ROWS`` filled rows, before the
+    markup, and the vendor details of their lanes are saved as the job's
+    preview for the bulk quotation screen.
+
+    Job state lives in the shared store, or with the in-process store in a
+    file next to the job's outputs, so any worker sharing ``directory`` can
+    report progress and serve the download. The worker running a job
+    refreshes its heartbeat every ``HEARTBEAT_SECONDS``; a queued or running
+    job whose heartbeat is older than ``STALE_AFTER_SECONDS`` (its worker
+    was restarted or killed) is marked failed when it is next read.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    PROGRESS_EVERY = 500
+    PREVIEW_ROWS = 100
+    HEARTBEAT_SECONDS = 5.0
+    STALE_AFTER_SECONDS = 30.0
+
+    def __init__(self, quotation_service, directory: str, store: SharedStore, ttl: float = 3600):
+        self.quotation_service = quotation_service
+        self.directory = directory
+        self.store = store
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        # Serializes saves of a job from its worker and heartbeat threads
+        self._save_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _key(self, job_id: str) -> str:
+        return f"report:{job_id}"
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    def _save(self, job: Dict):
+        with self._save_lock:
+            job['updated_at'] = time.time()
+            if self.store.shared:
+                self.store.set_json(self._key(job['job_id']), job, ttl=self.ttl)
+                return
+            path = os.path.join(self._job_dir(job['job_id']), 'job.json')
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(job, f)
+            os.replace(path + '.tmp', path)
+
+    def _load(self, job_id: str) -> Optional[Dict]:
+        if self.store.shared:
+            return self.store.get_json(self._key(job_id))
+        try:
+            with open(os.path.join(self._job_dir(job_id), 'job.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id or ''):
+            return None
+        job = self._load(job_id)
+        if job and job['state'] in (self.QUEUED, self.RUNNING) and \
+                time.time() - job.get('heartbeat_at', job['created_at']) > self.STALE_AFTER_SECONDS:
+            logger.warning(f"Report {job_id} lost its worker {job.get('owner')}, marking it failed")
+            job['state'] = self.FAILED
+            job['error'] = 'The worker generating this report stopped; please try again'
+            job['finished_at'] = time.time()
+            self._save(job)
+        return job
+
+    def file_path(self, job_id: str, fmt: str) -> Optional[str]:
+        job = self.get(job_id)
+        if not job or job['state'] != self.DONE or fmt not in job['formats']:
+            return None
+        path = os.path.join(self._job_dir(job_id), f"report.{fmt}")
+        return path if os.path.exists(path) else None
+
+    def preview(self, job_id: str) -> Optional[Dict]:
+        """Header, first filled rows (before markup) and lane details of a job"""
+        job = self.get(job_id)
+        if not job or not job.get('preview_ready'):
+            return None
+        try:
+            with open(os.path.join(self._job_dir(job_id), 'preview.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def submit(self, upload, percent: float = 0, formats: Sequence[str] = ('xlsx',)) -> Dict:
+        """Save the uploaded workbook and start generating; returns the job"""
+        self.cleanup()
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+        upload.save(os.path.join(job_dir, 'input.xlsx'))
+        now = time.time()
+        job = {
+            'job_id': job_id,
+            'state': self.QUEUED,
+            'percent': percent,
+            'formats': list(formats),
+            'rows_done': 0,
+            'rows_total': None,
+            'preview_ready': False,
+            'owner': self.owner,
+            'created_at': now,
+            'heartbeat_at': now,
+        }
+        self._save(job)
+        start_daemon(self._run, f'report-{job_id[:8]}', job)
+        return job
+
+    def _heartbeat(self, job: Dict, finished: threading.Event):
+        while not finished.wait(self.HEARTBEAT_SECONDS):
+            job['heartbeat_at'] = time.time()
+            try:
+                self._save(job)
+            except Exception as e:
+                logger.error(f"Error saving report heartbeat: {str(e)}")
+
+    def _run(self, job: Dict):
+        finished = threading.Event()
+        start_daemon(self._heartbeat, f"report-heartbeat-{job['job_id'][:8]}", job, finished)
+        job['state'] = self.RUNNING
+        self._save(job)
+        try:
+            self._generate(job)
+            job['state'] = self.DONE
+        except Exception as e:
+            logger.error(f"Error generating report {job['job_id']}: {str(e)}", exc_info=True)
+            job['state'] = self.FAILED
+            job['error'] = str(e)
+        finally:
+            finished.set()
+            job['finished_at'] = time.time()
+            self._save(job)
+            input_path = os.path.join(self._job_dir(job['job_id']), 'input.xlsx')
+            if os.path.exists(input_path):
+                os.remove(input_path)
+
+    def _write_preview(self, job: Dict, filler: BulkQuoteFiller, rows: List[List]):
+        path = os.path.join(self._job_dir(job['job_id']), 'preview.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({
+                'header': filler.header,
+                'rows': rows,
+                'lanes': filler.details(rows),
+                'generation': job['generation']
+            }, f, default=str)
+        os.replace(path + '.tmp', path)
+        job['preview_ready'] = True
+        self._save(job)
+
+    def _generate(self, job: Dict):
+        from openpyxl import load_workbook
+
+        job_dir = self._job_dir(job['job_id'])
+        service = self.quotation_service
+        snapshot = service.get_snapshot()
+        filler = BulkQuoteFiller(snapshot.lane_table, service.vehicle_types.canonicalize, job['percent'])
+        job['generation'] = snapshot.generation
+
+        source = load_workbook(os.path.join(job_dir, 'input.xlsx'), read_only=True, data_only=True)
+        try:
+            sheet = source.worksheets[0]
+            # Known only when the workbook records its dimensions
+            job['rows_total'] = sheet.max_row
+            rows = sheet.iter_rows(values_only=True)
+            for row in rows:
+                if filler.find_header(row):
+                    filler.set_header(row)
+                    break
+            if not filler.header:
+                raise ValueError('Input sheet has no header row')
+
+            writers = self._open_writers(job, job_dir, filler.header)
+            preview = []
+            count = 0
+            try:
+                for row in rows:
+                    filled = filler.fill_rates(row)
+                    if filled is not None:
+                        if len(preview) < self.PREVIEW_ROWS:
+                            preview.append(list(filled))
+                            if len(preview) == self.PREVIEW_ROWS:
+                                self._write_preview(job, filler, preview)
+                        filled = filler.mark_up(filled)
+                        for write in writers['rows']:
+                            write(filled)
+                    count += 1
+                    if count % self.PROGRESS_EVERY == 0:
+                        job['rows_done'] = count
+                        self._save(job)
+                job['rows_done'] = count
+                if not job['preview_ready']:
+                    self._write_preview(job, filler, preview)
+            finally:
+                for close in writers['close']:
+                    close()
+        finally:
+            source.close()
+
+        job['filled_cells'] = filler.filled
+        job['total_cells'] = filler.total_cells
+        logger.info(f"Report {job['job_id']}: filled {filler.filled} of {filler.total_cells} rate cells")
+
+    def _open_writers(self, job: Dict, job_dir: str, header: List) -> Dict[str, list]:
+        writers = {'rows': [], 'close': []}
+        if 'xlsx' in job['formats']:
+            from openpyxl import Workbook
+            workbook = Workbook(write_only=True)
+            worksheet = workbook.create_sheet('Rate Quotation')
+            worksheet.append(header)
+            writers['rows'].append(worksheet.append)
+            writers['close'].append(lambda: workbook.save(os.path.join(job_dir, 'report.xlsx')))
+        if 'csv' in job['formats']:
+            csv_file = open(os.path.join(job_dir, 'report.csv'), 'w', newline='', encoding='utf-8')
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            writers['rows'].append(csv_writer.writerow)
+            writers['close'].append(csv_file.close)
+        return writers
+
+    def cleanup(self):
+        """Delete job directories older than the TTL"""
+        cutoff = time.time() - self.ttl
+        try:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+        except Exception as e:
+            logger.error(f"Error cleaning up reports: {str(e)}")
@@ -0,0 +1,384 @@
+# ================================
+# backend/services/shared_store.py
+# ================================
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from limits.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryStore:
+    """Per-process key/value store with expiry (the default, and the fallback).
+
+    Only entries written with ``cache=True`` count towards ``max_entries``
+    and are evicted, oldest first; locks, counters, pointers and job state
+    stay until they expire or are deleted.
+    """
+
+    shared = False
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: Dict[str, tuple] = {}
+        # Evictable keys in insertion order
+        self._cache_keys: Dict[str, None] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[tuple]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            self._drop(key)
+            return None
+        return entry
+
+    def _drop(self, key: str):
+        self._data.pop(key, None)
+        self._cache_keys.pop(key, None)
+
+    def _put(self, key: str, value, ttl: Optional[float], cache: bool = False):
+        self._drop(key)
+        self._data[key] = (value, time.time() + ttl if ttl else None)
+        if cache:
+            self._cache_keys[key] = None
+            if len(self._cache_keys) > self.max_entries:
+                # Dicts keep insertion order, so this drops the oldest entry
+                self._drop(next(iter(self._cache_keys)))
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, cache: bool = False):
+        with self._lock:
+            self._put(key, value, ttl, cache)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Set ``key`` only if it does not exist; True if it was set"""
+        with self._lock:
+            if self._live(key):
+                return False
+            self._put(key, value, ttl)
+            return True
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Add to a counter; ``ttl`` starts when the counter is created"""
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                self._put(key, amount, ttl)
+                return amount
+            value = int(entry[0]) + amount
+            self._data[key] = (value, entry[1])
+            return value
+
+    def expiry(self, key: str) -> Optional[float]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[1] if entry else None
+
+    def delete(self, key: str):
+        with self._lock:
+            self._drop(key)
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        """Delete ``key`` only while it holds ``value`` (releasing a lock)"""
+        with self._lock:
+            entry = self._live(key)
+            if entry is None or entry[0] != value:
+                return False
+            self._drop(key)
+            return True
+
+
+class SQLiteStore:
+    """Key/value store in a SQLite file, shared by the processes of one host.
+
+    Put the file on a tmpfs such as /dev/shm to keep it in shared memory.
+    Connections are per thread and per process, so forked workers never
+    share a handle.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS store (key TEXT PRIMARY KEY, value BLOB, expires REAL)'
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Read-modify-write under SQLite's write lock"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _row(self, conn, key: str) -> Optional[tuple]:
+        row = conn.execute('SELECT value, expires FROM store WHERE key = ?', (key,)).fetchone()
+        if row is not None and row[1] is not None and row[1] <= time.time():
+            return None
+        return row
+
+    def _write(self, conn, key: str, value, expires: Optional[float]):
+        conn.execute('INSERT OR REPLACE INTO store (key, value, expires) VALUES (?, ?, ?)',
+                     (key, value, expires))
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            conn.execute('DELETE FROM store WHERE expires <= ?', (time.time(),))
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._row(self._connect(), key)
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, cache: bool = False):
+        self._write(self._connect(), key, value, time.time() + ttl if ttl else None)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        with self._transaction() as conn:
+            if self._row(conn, key):
+                return False
+            self._write(conn, key, value, time.time() + ttl if ttl else None)
+            return True
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._transaction() as conn:
+            row = self._row(conn, key)
+            if row is None:
+                value, expires = amount, (time.time() + ttl if ttl else None)
+            else:
+                value, expires = int(row[0]) + amount, row[1]
+            self._write(conn, key, value, expires)
+            return value
+
+    def expiry(self, key: str) -> Optional[float]:
+        row = self._row(self._connect(), key)
+        return row[1] if row else None
+
+    def delete(self, key: str):
+        self._connect().execute('DELETE FROM store WHERE key = ?', (key,))
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        cursor = self._connect().execute('DELETE FROM store WHERE key = ? AND value = ?', (key, value))
+        return cursor.rowcount > 0
+
+    def delete_prefix(self, prefix: str) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM store WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+        return cursor.rowcount
+
+
+class RedisStore:
+    """Key/value store on any Redis-protocol server (Redis, Valkey, KeyDB...)"""
+
+    shared = True
+
+    # Compare-and-delete in one step on the server
+    _DELETE_IF = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        import redis
+        self._client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    @staticmethod
+    def _ms(ttl: Optional[float]) -> Optional[int]:
+        return max(1, int(ttl * 1000)) if ttl else None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, cache: bool = False):
+        self._client.set(key, value, px=self._ms(ttl))
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return bool(self._client.set(key, value, nx=True, px=self._ms(ttl)))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        pipe = self._client.pipeline()
+        if ttl:
+            # Creates the counter with its expiry only if it is new
+            pipe.set(key, 0, nx=True, px=self._ms(ttl))
+        pipe.incrby(key, amount)
+        return int(pipe.execute()[-1])
+
+    def expiry(self, key: str) -> Optional[float]:
+        ttl_ms = self._client.pttl(key)
+        return time.time() + ttl_ms / 1000.0 if ttl_ms and ttl_ms > 0 else None
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        return bool(self._client.eval(self._DELETE_IF, 1, key, value))
+
+
+def _sqlite_path(url: str) -> str:
+    # sqlite:///relative.db and sqlite:////absolute/path.db, as in SQLAlchemy
+    return url[len('sqlite:///'):] or ':memory:'
+
+
+class SharedStore:
+    """Namespaced front for a store backend with in-process fallback.
+
+    When the backend raises (Redis down, SQLite file locked for too long),
+    the call is answered from a local MemoryStore instead and the backend is
+    retried after ``retry_interval`` seconds. Meanwhile ``shared`` is False,
+    so callers stop relying on other workers.
+    """
+
+    def __init__(self, backend, prefix: str = '', retry_interval: float = 30.0):
+        self.backend = backend
+        self.prefix = prefix
+        self.retry_interval = retry_interval
+        self.local = backend if isinstance(backend, MemoryStore) else MemoryStore()
+        self._failed_at: Optional[float] = None
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared and not self._degraded()
+
+    def _degraded(self) -> bool:
+        return self._failed_at is not None and time.time() - self._failed_at < self.retry_interval
+
+    def _call(self, op: str, key: str, *args):
+        key = self.prefix + key
+        if self.backend is self.local or self._degraded():
+            return getattr(self.local, op)(key, *args)
+        try:
+            result = getattr(self.backend, op)(key, *args)
+            if self._failed_at is not None:
+                logger.info(f"Shared store {type(self.backend).__name__} is back")
+                self._failed_at = None
+            return result
+        except Exception as e:
+            if self._failed_at is None:
+                logger.error(f"Shared store unavailable, falling back to in-process: {str(e)}")
+            self._failed_at = time.time()
+            return getattr(self.local, op)(key, *args)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call('get', key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None, cache: bool = False):
+        """``cache=True`` marks a value that can be recomputed, so an
+        in-process store may evict it when full"""
+        self._call('set', key, value, ttl, cache)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        return self._call('add', key, value, ttl)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        return self._call('incr', key, amount, ttl)
+
+    def delete(self, key: str):
+        self._call('delete', key)
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        return self._call('delete_if', key, value)
+
+    def get_json(self, key: str) -> Any:
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, key: str, value: Any, ttl: Optional[float] = None, cache: bool = False):
+        try:
+            encoded = json.dumps(value).encode('utf-8')
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Not caching {key}: {str(e)}")
+            return
+        self.set(key, encoded, ttl, cache)
+
+    def describe(self) -> Dict:
+        return {
+            'backend': type(self.backend).__name__,
+            'shared': self.shared,
+            'degraded': self._degraded()
+        }
+
+
+def create_store(url: Optional[str], prefix: str = '') -> SharedStore:
+    """Build a SharedStore from a URL: memory://, sqlite:///path or redis://host:port/db"""
+    url = url or 'memory://'
+    try:
+        if url.startswith(('redis://', 'rediss://', 'unix://')):
+            backend = RedisStore(url)
+        elif url.startswith('sqlite:///'):
+            backend = SQLiteStore(_sqlite_path(url))
+        else:
+            if not url.startswith('memory://'):
+                logger.error(f"Unknown shared store URL {url}, using in-process store")
+            backend = MemoryStore()
+    except Exception as e:
+        logger.error(f"Error creating shared store {url}, using in-process store: {str(e)}")
+        backend = MemoryStore()
+    logger.info(f"Shared store: {type(backend).__name__}")
+    return SharedStore(backend, prefix)
+
+
+class SQLiteLimiterStorage(Storage):
+    """flask-limiter counters in a SQLiteStore (``sqlite:///`` storage URIs).
+
+    Redis URIs go to the limits library's own Redis storage; this backs the
+    single-host stand-in. Only the fixed-window strategy is supported.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        self.store = SQLiteStore(_sqlite_path(uri or 'sqlite:///'))
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return self.store.incr(key, amount, expiry)
+
+    def get(self, key: str) -> int:
+        value = self.store.get(key)
+        return int(value) if value is not None else 0
+
+    def get_expiry(self, key: str) -> float:
+        return self.store.expiry(key) or time.time()
+
+    def check(self) -> bool:
+        try:
+            self.store.get('LIMITER/check')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        return self.store.delete_prefix('LIMITER')
+
+    def clear(self, key: str) -> None:
+        self.store.delete(key)
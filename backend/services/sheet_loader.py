@@ -0,0 +1,182 @@
+# ================================
+# backend/services/sheet_loader.py
+# ================================
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SHEETS_API_BASE_URL = 'https://sheets.googleapis.com/v4/spreadsheets'
+SHEETS_READONLY_SCOPE = 'https://www.googleapis.com/auth/spreadsheets.readonly'
+SHEETS_SCOPE = 'https://www.googleapis.com/auth/spreadsheets'
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class SheetLoadError(RuntimeError):
+    """A range could not be fetched, so the merged rate book would be partial"""
+
+
+class MultiSheetLoader:
+    """Fetch several worksheets/ranges concurrently and merge them into one frame.
+
+    All requests share one pooled keep-alive session (an ``AuthorizedSession``
+    in production, any ``requests.Session`` against a stub server in tests),
+    so a refresh costs roughly the time of the slowest sheet rather than the
+    sum of all of them.
+    """
+
+    def __init__(self, spreadsheet_id: str, ranges: List[str], session=None,
+                 base_url: str = SHEETS_API_BASE_URL, max_concurrency: int = 4,
+                 max_retries: int = 3, backoff: float = 0.5, timeout: float = 30.0):
+        self.spreadsheet_id = spreadsheet_id
+        self.ranges = list(ranges)
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session if session is not None else self._plain_session()
+
+    @classmethod
+    def from_service_account(cls, credentials_file: str, spreadsheet_id: str,
+                             ranges: List[str], scopes: Optional[List[str]] = None,
+                             **kwargs) -> 'MultiSheetLoader':
+        """Build a loader over an authorized session for a service account"""
+        from google.oauth2.service_account import Credentials
+        from google.auth.transport.requests import AuthorizedSession
+
+        creds = Credentials.from_service_account_file(
+            credentials_file, scopes=scopes or [SHEETS_READONLY_SCOPE]
+        )
+        session = AuthorizedSession(creds)
+        cls._mount_pool(session, kwargs.get('max_concurrency', 4))
+        return cls(spreadsheet_id, ranges, session=session, **kwargs)
+
+    def _plain_session(self):
+        import requests
+
+        session = requests.Session()
+        self._mount_pool(session, self.max_concurrency)
+        return session
+
+    @staticmethod
+    def _mount_pool(session, pool_size: int):
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+    @staticmethod
+    def _a1_range(sheet_range: str) -> str:
+        """Quote a bare worksheet name; explicit A1 ranges pass through"""
+        if '!' in sheet_range or sheet_range.startswith("'"):
+            return sheet_range
+        return "'{}'".format(sheet_range.replace("'", "''"))
+
+    def _url(self, sheet_range: str) -> str:
+        return '{}/{}/values/{}'.format(
+            self.base_url, self.spreadsheet_id, quote(self._a1_range(sheet_range), safe='')
+        )
+
+    def fetch_values(self, sheet_range: str) -> List[List]:
+        """Fetch the raw cell values of one range, retrying transient failures"""
+        import requests
+
+        params = {'valueRenderOption': 'UNFORMATTED_VALUE', 'majorDimension': 'ROWS'}
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(self._url(sheet_range), params=params, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json().get('values', [])
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+
+            if attempt >= self.max_retries:
+                raise RuntimeError(f"Giving up on range {sheet_range!r} after {attempt + 1} attempts: {error}")
+            delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+            logger.warning(f"Retrying range {sheet_range!r} in {delay:.2f}s ({error})")
+            time.sleep(delay)
+            attempt += 1
+
+    def update_values(self, sheet_range: str, values: List[List]) -> Dict:
+        """Overwrite the cells of one range; needs the read-write scope"""
+        response = self.session.put(
+            self._url(sheet_range),
+            params={'valueInputOption': 'RAW'},
+            json={'range': self._a1_range(sheet_range), 'majorDimension': 'ROWS', 'values': values},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def values_to_frame(values: List[List]) -> 'pd.DataFrame':
+        """Convert a values payload (header row first) into a DataFrame"""
+        import pandas as pd
+
+        if not values:
+            return pd.DataFrame()
+        headers = [str(h).strip() for h in values[0]]
+        width = len(headers)
+        rows = [list(row[:width]) + [''] * (width - len(row)) for row in values[1:]]
+        return pd.DataFrame(rows, columns=headers)
+
+    def _load_one(self, sheet_range: str) -> Tuple[str, Optional['pd.DataFrame']]:
+        try:
+            started = time.time()
+            df = self.values_to_frame(self.fetch_values(sheet_range))
+            logger.info(f"Fetched {len(df)} rows from {sheet_range!r} in {time.time() - started:.2f}s")
+            return sheet_range, df
+        except Exception as e:
+            logger.error(f"Error fetching range {sheet_range!r}: {str(e)}")
+            return sheet_range, None
+
+    def load(self) -> List[Tuple[str, 'pd.DataFrame']]:
+        """Fetch all ranges concurrently.
+
+        Raises SheetLoadError when any range still fails after its retries:
+        a rate book missing a sheet would be installed as a new generation
+        that removed every lane of that sheet.
+        """
+        workers = min(self.max_concurrency, len(self.ranges)) or 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sheet-loader') as pool:
+            results = list(pool.map(self._load_one, self.ranges))
+        failed = [name for name, df in results if df is None]
+        if failed:
+            raise SheetLoadError(f"Failed to fetch {len(failed)} of {len(results)} ranges: {failed}")
+        return results
+
+    def load_merged(self) -> Optional['pd.DataFrame']:
+        """Fetch all ranges and merge them into one raw frame.
+
+        With more than one range each row is tagged with its ``SOURCE SHEET``
+        so that cleaning can forward-fill origins within a sheet and drop
+        rows repeated across sheets afterwards.
+        """
+        import pandas as pd
+
+        frames = []
+        for name, df in self.load():
+            if df.empty:
+                continue
+            if len(self.ranges) > 1:
+                df = df.copy()
+                df['SOURCE SHEET'] = name
+            frames.append(df)
+        if not frames:
+            return None
+
+        merged = pd.concat(frames, ignore_index=True, sort=False).fillna('')
+        logger.info(f"Merged {len(frames)} ranges into {len(merged)} rows")
+        return merged
@@ -0,0 +1,90 @@
+# ================================
+# backend/services/snapshot_codec.py
+# ================================
+import json
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Schema metadata key holding the snapshot's generation and fingerprint
+METADATA_KEY = b'rate_snapshot'
+
+
+def string_categories(series: pd.Series) -> pd.Series:
+    """A categorical whose categories are not all strings, with string ones.
+
+    compact_data() turns mixed columns such as vehicle_no ('WB1' next to
+    1109) into categoricals with mixed categories, which Arrow cannot encode.
+    Categories that become equal as text (1109 and '1109') are merged.
+    """
+    categories = series.cat.categories
+    if pd.api.types.infer_dtype(categories, skipna=True) in ('string', 'empty'):
+        return series
+    text = pd.Index([str(c) for c in categories])
+    unique = pd.Index(text.unique())
+    mapping = unique.get_indexer(text)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, mapping[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, unique), index=series.index, name=series.name)
+
+
+def normalize_text_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Object columns holding anything but strings turned to strings.
+
+    Sheet columns such as vehicle_no mix numbers and text, which Arrow has
+    no single type for. Missing values become None, as decoding yields them,
+    so the fetching worker holds exactly what the others decode. Categorical
+    columns get string categories (see string_categories).
+    """
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            normalized = string_categories(series)
+            if normalized is not series:
+                converted[column] = normalized
+            continue
+        if series.dtype != object:
+            continue
+        if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty') and not series.isna().any():
+            continue
+        converted[column] = pd.Series([
+            None if value is None or (isinstance(value, float) and value != value)
+            else value if isinstance(value, str) else str(value)
+            for value in series.tolist()
+        ], index=df.index, dtype=object)
+    if not converted:
+        return df
+    df = df.copy()
+    for column, values in converted.items():
+        df[column] = values
+    return df
+
+
+def encode_frame(df: pd.DataFrame, metadata: Dict) -> bytes:
+    """Serialize a normalized frame and its metadata as an Arrow IPC stream.
+
+    Unlike a pickle, decoding the payload cannot run code, so a shared store
+    reachable by others than this application's workers is no RCE risk.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        METADATA_KEY: json.dumps(metadata).encode('utf-8')
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_frame(payload: bytes) -> Tuple[pd.DataFrame, Dict]:
+    """The frame and metadata of an encode_frame() payload"""
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(payload).read_all()
+    metadata = json.loads(table.schema.metadata[METADATA_KEY])
+    return table.to_pandas(), metadata
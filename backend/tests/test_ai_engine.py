@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from models.ai_engine import AIQuotationEngine
+from utils.helpers import run_cpu_bound
+
+CANDIDATES = [f"AREA {i} {name}" for i, name in enumerate(
+    ['RANCHI', 'PATNA', 'MALDA', 'SILIGURI', 'KATIHAR', 'RAIPUR', 'GELEPHU', 'KISHANGANJ'] * 25)]
+
+
+def test_semantic_similarity_is_thread_safe():
+    engine = AIQuotationEngine()
+    queries = ['ranchi', 'patna', 'malda road', 'siliguri', 'raipur'] * 8
+    expected = [engine.calculate_semantic_similarity(q, CANDIDATES) for q in queries]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda q: engine.calculate_semantic_similarity(q, CANDIDATES), queries))
+
+    assert results == expected
+    assert all(max(scores) > 0 for scores in results)
+
+
+def test_run_cpu_bound_runs_inline_without_gevent():
+    assert run_cpu_bound(sum, [1, 2, 3]) == 6
+    assert run_cpu_bound(dict, a=1) == {'a': 1}
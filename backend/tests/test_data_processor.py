@@ -0,0 +1,31 @@
+import pandas as pd
+
+from models.data_processor import DataProcessor
+
+COLUMNS = ['FROM-ORIGIN', 'AREA', 'VEHICLE NO.', 'VEHICLE TYE', 'RATE', 'VENDOR NAME', 'SOURCE SHEET']
+
+
+def frame(rows):
+    return pd.DataFrame([dict(zip(COLUMNS, row)) for row in rows])
+
+
+def test_duplicates_dropped_across_sheets_only():
+    cleaned = DataProcessor().clean_data(frame([
+        ('KOLKATA', 'PATNA', 'WB01', 'LPT', 1000, 'V1', 'one'),
+        ('KOLKATA', 'PATNA', 'WB01', 'LPT', 1000, 'V1', 'one'),
+        ('KOLKATA', 'PATNA', 'WB01', 'LPT', 1000, 'V1', 'two'),
+        ('SILIGURI', 'MALDA', 'WB02', '407', 2000, 'V2', 'two'),
+    ]))
+
+    assert cleaned['source_sheet'].tolist() == ['one', 'one', 'two']
+    assert cleaned['area'].tolist() == ['PATNA', 'PATNA', 'MALDA']
+
+
+def test_origin_not_carried_across_sheets():
+    cleaned = DataProcessor().clean_data(frame([
+        ('KOLKATA', 'PATNA', 'WB01', 'LPT', 1000, 'V1', 'one'),
+        ('', 'RANCHI', 'WB03', 'LPT', 1500, 'V1', 'one'),
+        ('', 'MALDA', 'WB02', '407', 2000, 'V2', 'two'),
+    ]))
+
+    assert cleaned['from_origin'].fillna('').tolist() == ['KOLKATA', 'KOLKATA', '']
@@ -0,0 +1,46 @@
+import json
+
+from services.events import EventBroker
+from services.shared_store import create_store
+
+
+def frames(stream, count):
+    return [next(stream) for _ in range(count)]
+
+
+def test_events_reach_streams_on_other_workers(tmp_path):
+    url = f"sqlite:///{tmp_path / 'store.db'}"
+    publisher = EventBroker(create_store(url))
+    listener = EventBroker(create_store(url), poll_interval=0.05)
+
+    publisher.publish('generation', {'generation': 1})
+    assert listener.subscribe()
+    stream = listener.stream(heartbeat=2, retry_ms=None)
+    first = next(stream)
+    publisher.publish('generation', {'generation': 2})
+    second = next(stream)
+
+    assert first.startswith('id: 1\nevent: generation\n')
+    assert json.loads(second.split('data: ')[1]) == {'generation': 2}
+
+
+def test_slow_stream_gets_latest_event_only():
+    broker = EventBroker()
+    broker.subscribe()
+    stream = broker.stream(heartbeat=0.05, retry_ms=None)
+    assert next(stream) == ': keep-alive\n\n'
+    for generation in range(1, 4):
+        broker.publish('generation', {'generation': generation})
+
+    assert frames(stream, 2) == [
+        'id: 3\nevent: generation\ndata: {"generation": 3}\n\n',
+        ': keep-alive\n\n'
+    ]
+
+
+def test_subscriber_cap():
+    broker = EventBroker(max_subscribers=2)
+    assert broker.subscribe() and broker.subscribe()
+    assert not broker.subscribe()
+    broker.unsubscribe()
+    assert broker.subscribe()
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from models.lane_table import LaneTable
+
+
+def frame(*rows):
+    return pd.DataFrame([
+        {'from_origin': o, 'area': a, 'vehicle_type': t, 'vehicle_class': c, 'rate': r, 'vendor_name': v}
+        for o, a, t, c, r, v in rows
+    ])
+
+
+BASE = [
+    ('KOLKATA', 'PATNA', 'LPT', '407LPT', 1000, 'V1'),
+    ('KOLKATA', 'PATNA', 'LPT', '407LPT', 3000, 'V2'),
+    ('SILIGURI', 'MALDA', '407', '407LPT', 500, 'V1'),
+]
+
+
+def test_lane_keeps_highest_and_lowest_vendors():
+    lane = LaneTable.build(frame(*BASE)).get('KOLKATA', 'PATNA', 'LPT', '407LPT')
+
+    assert lane['highest'] == {'vendor': 'V2', 'rate': 3000}
+    assert lane['lowest'][0] == {'vendor': 'V1', 'rate': 1000}
+    assert (lane['count'], lane['potential_savings']) == (2, 2000)
+
+
+def test_diff_lists_added_changed_and_removed_lanes():
+    before = LaneTable.build(frame(*BASE), generation=1)
+    after = LaneTable.build(frame(
+        ('KOLKATA', 'PATNA', 'LPT', '407LPT', 1000, 'V1'),
+        ('KOLKATA', 'PATNA', 'LPT', '407LPT', 3500, 'V2'),
+        ('PUNE', 'GOA', 'ACE', 'TATA ACE', 800, 'V3'),
+    ), generation=2)
+
+    changed = {(lane['from_origin'], lane['area']) for lane in after.diff(before)}
+
+    assert changed == {('KOLKATA', 'PATNA'), ('PUNE', 'GOA'), ('SILIGURI', 'MALDA')}
+    assert after.diff(after) == []
+    assert len(before.diff(None)) == 2
@@ -0,0 +1,78 @@
+import pytest
+
+from models.ai_engine import AIQuotationEngine
+from models import parallel_matcher
+from multiprocessing.shared_memory import SharedMemory
+
+from models.parallel_matcher import ParallelMatcher, read_list, share_list
+
+ORIGINS = [f"ORIGIN {i:03d}" for i in range(60)] + ['SILIGURI', 'KOLKATA']
+NEW_ORIGINS = ['RANCHI', 'PATNA'] + [f"TOWN {i:03d}" for i in range(60)]
+
+
+@pytest.fixture
+def matcher():
+    matcher = ParallelMatcher(AIQuotationEngine(), processes=2, min_parallel_candidates=10)
+    if not matcher.enabled:
+        pytest.skip('fork start method not available')
+    yield matcher
+    matcher.close()
+
+
+def test_pool_matches_like_inline(matcher):
+    matcher.publish(lambda: {'origins': ORIGINS})
+    inline = AIQuotationEngine().match_location('siliguri', ORIGINS, 0.6)
+
+    assert matcher.match_location('siliguri', 'origins') == inline
+    assert matcher.match_many(['siliguri', 'kolkata'], 'origins')[0] == inline
+
+
+def test_publish_once_per_source(matcher):
+    source = object()
+    index = matcher.publish(lambda: {'origins': ORIGINS}, source=source)
+    assert matcher.publish(lambda: {'origins': NEW_ORIGINS}, source=source) is index
+    assert matcher.match_location('siliguri', 'origins')[0][0] == 'SILIGURI'
+
+
+def test_match_uses_one_index_across_publish(matcher):
+    old = matcher.publish(lambda: {'origins': ORIGINS})
+    matcher.publish(lambda: {'origins': NEW_ORIGINS})
+
+    # A task built against the old index still scores the old list
+    scores = matcher._pool.map(parallel_matcher._score_shard,
+                               [(old.segments['origins'], 0, len(ORIGINS), 'siliguri')])[0]
+    assert len(scores) == len(ORIGINS)
+    assert scores[ORIGINS.index('SILIGURI')] == 1.0
+    assert matcher.match_location('siliguri', 'origins', index=old)[0][0] == 'SILIGURI'
+    assert matcher.match_location('patna', 'origins')[0][0] == 'PATNA'
+    assert matcher.match_many(['siliguri', 'kolkata'], 'origins', index=old)[1][0][0] == 'KOLKATA'
+
+
+def test_shared_list_slices():
+    values = ['KOLKATA', '', 'কলকাতা', 'NEW TOWN', 1109]
+    shm = share_list(values)
+    try:
+        assert read_list(shm.buf) == ['KOLKATA', '', 'কলকাতা', 'NEW TOWN', '1109']
+        assert read_list(shm.buf, 2, 4) == ['কলকাতা', 'NEW TOWN']
+        assert read_list(shm.buf, 3, 99) == ['NEW TOWN', '1109']
+        assert read_list(shm.buf, 5) == []
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_old_index_segments_are_released(matcher):
+    names = []
+    for i in range(4):
+        names.append(matcher.publish(lambda: {'origins': ORIGINS[i:]}).segments['origins'])
+
+    def exists(name):
+        try:
+            SharedMemory(name=name).close()
+            return True
+        except FileNotFoundError:
+            return False
+
+    assert [exists(name) for name in names] == [False, False, True, True]
+    matcher.close()
+    assert not any(exists(name) for name in names)
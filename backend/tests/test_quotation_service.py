@@ -0,0 +1,225 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from config import Config
+from models.ai_engine import AIQuotationEngine
+from services.quotation_service import QuotationService
+from services.shared_store import create_store
+from utils import helpers
+
+COLUMNS = ['FROM-ORIGIN', 'AREA', 'VEHICLE NO.', 'VEHICLE TYE', 'RATE', 'VENDOR NAME']
+
+
+class StaticSheets:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_data(self):
+        return pd.DataFrame([dict(zip(COLUMNS, row)) for row in self.rows])
+
+
+ROWS = [
+    ('KOLKATA', 'PATNA', 'WB01', 'LPT', 1000, 'V1'),
+    ('KOLKATA', 'PATNA', 'WB02', 'LPT', 3000, 'V2'),
+    ('KOLKATA', 'PATNA', 'WB03', 'LPT', 3000, 'V3'),
+    ('KOLKATA', 'PATNA', 1109, 'ACE', 2000, 'V4'),
+    ('SILIGURI', 'MALDA', 'WB05', '407', 500, 'V1'),
+]
+
+
+class DemoSheets(StaticSheets):
+    def get_data(self):
+        df = super().get_data()
+        df.attrs['demo'] = True
+        return df
+
+
+class BlockingSheets(StaticSheets):
+    def __init__(self, rows):
+        super().__init__(rows)
+        self.release = threading.Event()
+
+    def get_data(self):
+        assert self.release.wait(5), 'fetch was never released'
+        return super().get_data()
+
+
+class FailingSheets:
+    def get_data(self):
+        raise AssertionError('adopting worker must not fetch')
+
+
+class FakeThreadPool:
+    """Stands in for the gevent hub's pool: runs each call on a native thread"""
+
+    def __init__(self):
+        self.calls = []
+
+    def apply(self, func, args=(), kwargs=None):
+        self.calls.append(func.__name__)
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(value=func(*args, **(kwargs or {}))),
+                                  name='hub-threadpool')
+        thread.start()
+        thread.join()
+        return result['value']
+
+
+class FakeHub:
+    def __init__(self):
+        self.threadpool = FakeThreadPool()
+
+
+@pytest.fixture(autouse=True)
+def config(monkeypatch):
+    monkeypatch.setattr(Config, 'RATE_HISTORY_DIR', '')
+    monkeypatch.setattr(Config, 'MATCH_PROCESSES', 0)
+
+
+@pytest.fixture
+def service():
+    return QuotationService(StaticSheets(ROWS), AIQuotationEngine(), create_store('memory://'))
+
+
+def test_snapshot_keeps_data_lane_table_and_generation_together(service):
+    first = service.get_snapshot()
+    service.sheets_service.rows = service.sheets_service.rows[:2]
+    service._fetch_and_install()
+    second = service.get_snapshot()
+
+    assert second.generation == first.generation + 1
+    assert first.lane_table.generation == first.generation
+    assert second.lane_table.generation == second.generation
+    assert len(first.data) == 5 and len(second.data) == 2
+    assert service.get_lanes()['generation'] == second.generation
+
+
+def test_max_rate_is_first_highest_row(service):
+    result = service.get_quotations('Kolkata', 'Patna')
+
+    assert result['max_rate']['vendor_name'] == 'V2'
+    assert [r['vendor_name'] for r in result['other_rates']] == ['V1', 'V3', 'V4']
+    assert result['total_found'] == 4
+
+
+def test_max_rate_when_results_are_truncated(service):
+    result = service.get_quotations('Kolkata', 'Patna', max_results=1)
+
+    assert result['max_rate']['vendor_name'] == 'V1'
+    assert result['other_rates'] == []
+
+
+def test_worker_adopts_snapshot_from_shared_store(tmp_path):
+    url = f"sqlite:///{tmp_path / 'store.db'}"
+    fetcher = QuotationService(StaticSheets(ROWS), AIQuotationEngine(), create_store(url))
+    adopter = QuotationService(FailingSheets(), AIQuotationEngine(), create_store(url))
+
+    fetched = fetcher.get_snapshot()
+    adopted = adopter.get_snapshot()
+
+    assert adopted.generation == fetched.generation == 1
+    assert adopted.fingerprint == fetched.fingerprint
+    pd.testing.assert_frame_equal(adopted.data, fetched.data)
+    assert adopted.lane_table.lanes == fetched.lane_table.lanes
+    assert fetcher.store.get('rates:refresh-lock') is None
+
+
+def test_cached_results_are_keyed_by_the_snapshot_generation(service):
+    snapshot = service.get_snapshot()
+    service.sheets_service.rows = ROWS[:1]
+    service._fetch_and_install()
+
+    # A request that took the old snapshot files its result under that id
+    assert service._cached_result('test', snapshot.generation, {}, lambda: 'old') == 'old'
+    assert service._cached_result('test', service.generation, {}, lambda: 'new') == 'new'
+
+
+def test_demo_fallback_keeps_real_rates_and_skips_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'RATE_HISTORY_DIR', str(tmp_path / 'history'))
+    service = QuotationService(StaticSheets(ROWS), AIQuotationEngine(), create_store('memory://'))
+    first = service.get_snapshot()
+
+    service.sheets_service = DemoSheets(ROWS[:1])
+    service._fetch_and_install()
+
+    assert service.get_snapshot() is first
+    assert service.history.stats()['records'] == 5
+
+    monkeypatch.setattr(Config, 'RATE_HISTORY_DIR', str(tmp_path / 'demo-history'))
+    demo_only = QuotationService(DemoSheets(ROWS), AIQuotationEngine(), create_store('memory://'))
+    assert len(demo_only.get_snapshot().data) == 5
+    assert demo_only.history.stats()['records'] == 0
+
+
+def test_compacted_mixed_columns_are_shared(tmp_path):
+    rows = [('KOLKATA', 'PATNA', 'WB1' if i % 2 else 1109, 'LPT', 1000 + i, f'V{i % 3}') for i in range(20)]
+    url = f"sqlite:///{tmp_path / 'store.db'}"
+    fetcher = QuotationService(StaticSheets(rows), AIQuotationEngine(), create_store(url))
+    adopter = QuotationService(FailingSheets(), AIQuotationEngine(), create_store(url))
+
+    assert fetcher.get_quotations('Kolkata', 'Patna')['total_found'] == 20
+    assert fetcher.store.get_json('rates:pointer')['generation'] == fetcher.generation
+    assert adopter.get_snapshot().data['vehicle_no'].astype(str).tolist() == \
+        fetcher.get_snapshot().data['vehicle_no'].astype(str).tolist()
+
+
+def test_gevent_offloads_only_the_computation(service, monkeypatch):
+    hub = FakeHub()
+    monkeypatch.setattr(helpers, '_GET_HUB', lambda: hub)
+    threads = []
+
+    def record(obj, name):
+        method = getattr(obj, name)
+
+        def wrapper(*args, **kwargs):
+            threads.append((name, threading.current_thread().name))
+            return method(*args, **kwargs)
+        monkeypatch.setattr(obj, name, wrapper)
+
+    record(service.sheets_service, 'get_data')
+    record(service, 'get_snapshot')
+    record(service.store, 'get_json')
+    record(service.store, 'set_json')
+
+    result = service.get_quotations('Kolkata', 'Patna')
+    batch = service.get_quotations_batch([{'from_location': 'Kolkata', 'to_location': 'Patna'}])
+    analytics = service.get_analytics()
+
+    assert result['max_rate']['vendor_name'] == 'V2'
+    assert batch == [result]
+    assert analytics['total_routes'] == 5
+    assert hub.threadpool.calls == ['_match_and_build', '_match_and_build_batch', 'calculate_analytics']
+    # Snapshot, sheet fetch and cache I/O stay on the caller
+    assert {name for name, _ in threads} == {'get_data', 'get_snapshot', 'get_json', 'set_json'}
+    assert all(thread != 'hub-threadpool' for _, thread in threads)
+
+
+def test_quotations_match_the_snapshot_own_locations(service):
+    snapshot = service.get_snapshot()
+    service.sheets_service.rows = ROWS[:1]
+    service._fetch_and_install()
+
+    # A request that took the old snapshot still finds the lanes only it has
+    result = service._match_and_build(snapshot, 'Siliguri', 'Malda', None, 10)
+    assert result['max_rate']['vendor_name'] == 'V1'
+    assert service.get_quotations('Siliguri', 'Malda')['max_rate'] is None
+    assert snapshot.match_index.generation < service.get_snapshot().match_index.generation
+
+
+def test_history_queries_do_not_wait_for_the_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'RATE_HISTORY_DIR', str(tmp_path / 'history'))
+    service = QuotationService(BlockingSheets(ROWS), AIQuotationEngine(), create_store('memory://'))
+
+    # Cold cache: answered from the (empty) history while the fetch hangs
+    assert service.get_rates_as_of(time.time())['total'] == 0
+    assert service.get_rate_trend('KOLKATA', 'PATNA')['series'] == []
+
+    service.sheets_service.release.set()
+    # The background refresh holds the lock until the history is written
+    assert service._refresh_lock.acquire(timeout=5)
+    service._refresh_lock.release()
+    assert service.get_rates_as_of(time.time())['total'] == 5
+    assert len(service.get_rate_trend('KOLKATA', 'PATNA')['series']) == 4
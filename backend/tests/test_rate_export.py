@@ -0,0 +1,45 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from services.rate_export import RateBookExporter
+
+
+def read_arrow(exporter):
+    return pa.ipc.open_stream(b''.join(exporter.stream('arrow'))).read_all()
+
+
+def test_arrow_export_of_mixed_type_columns():
+    df = pd.DataFrame({
+        'vehicle_no': ['WB23D1704', 1109, None, 407.0],
+        'receiver_name': [None, None, 'RAM', None],
+        'rate': [1000, 2000, 3000, 4000],
+        'vehicle_class': pd.Categorical(['1109', '1109', '', '407LPT']),
+    })
+
+    table = read_arrow(RateBookExporter(df, chunk_rows=2))
+
+    assert table.schema.field('vehicle_no').type == pa.string()
+    assert table.column('vehicle_no').to_pylist() == ['WB23D1704', '1109', None, '407.0']
+    assert table.column('receiver_name').to_pylist() == [None, None, 'RAM', None]
+    assert table.column('rate').to_pylist() == [1000, 2000, 3000, 4000]
+    assert pa.types.is_dictionary(table.schema.field('vehicle_class').type)
+
+
+def test_arrow_export_of_a_compacted_sheet():
+    from tests.test_shared_store import compacted_sheet
+
+    df = compacted_sheet()
+
+    table = read_arrow(RateBookExporter(df, chunk_rows=7))
+
+    assert table.num_rows == 20
+    assert table.column('vehicle_no').to_pylist() == df['vehicle_no'].astype(str).tolist()
+    assert pa.types.is_dictionary(table.schema.field('vehicle_no').type)
+
+
+def test_arrow_conversion_errors_raise_before_streaming():
+    df = pd.DataFrame({'rate': [1 + 2j]})
+
+    with pytest.raises(pa.ArrowException):
+        RateBookExporter(df).stream('arrow')
@@ -0,0 +1,86 @@
+import math
+
+import pandas as pd
+import pytest
+
+from models.rate_history import RateHistoryStore, parse_time
+
+DAY = 86400.0
+
+
+def snapshot(*rows):
+    return pd.DataFrame([
+        {'from_origin': o, 'area': a, 'vendor_name': v, 'vehicle_type': t, 'vehicle_class': c, 'rate': r}
+        for o, a, v, t, c, r in rows
+    ])
+
+
+@pytest.fixture
+def history(tmp_path):
+    return RateHistoryStore(str(tmp_path / 'history'))
+
+
+def test_as_of_and_trend_follow_changes(history):
+    history.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 1000)), 1, 10 * DAY)
+    history.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 1200)), 2, 20 * DAY)
+    history.record(snapshot(), 3, 30 * DAY)
+
+    assert history.as_of(5 * DAY)['rates'] == []
+    assert [r['rate'] for r in history.as_of(15 * DAY)['rates']] == [1000]
+    assert history.as_of(25 * DAY)['rates'][0]['generation'] == 2
+    assert history.as_of(35 * DAY)['rates'] == []
+
+    trend = history.trend('kolkata', 'patna', months=1, until=31 * DAY)
+    points = trend['series'][0]['points']
+    assert [p['rate'] for p in points] == [None, 1000, 1200, None]
+    assert [h['rate'] for h in trend['highest']] == [None, 1000, 1200, None]
+
+
+def test_older_snapshot_recorded_late_is_skipped(history):
+    history.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 1200)), 2, 20 * DAY)
+
+    assert history.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 1000)), 1, 10 * DAY) == 0
+    assert history.as_of(25 * DAY)['rates'][0]['rate'] == 1200
+
+
+def test_colliding_generations_are_renumbered(history):
+    history.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 1000)), 5, 10 * DAY)
+    history.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 1100)), 5, 20 * DAY)
+
+    generations = [p.get('generation') for p in history.trend('kolkata', 'patna', 1, until=21 * DAY)
+                   ['series'][0]['points'][1:]]
+    assert generations == [5, 6]
+
+
+def test_records_are_seen_by_another_store(history, tmp_path):
+    history.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 1000)), 1, 10 * DAY)
+    other = RateHistoryStore(history.directory)
+    other.record(snapshot(('KOLKATA', 'PATNA', 'V1', 'LPT', '407LPT', 900)), 1, 20 * DAY)
+
+    assert [r['rate'] for r in history.as_of(25 * DAY)['rates']] == [900]
+
+
+def test_keys_are_normalized_and_use_the_vehicle_class(history):
+    history.record(snapshot(
+        ('Kolkata', 'Patna', 'V1', 'LPT', '407LPT', 1000),
+        ('KOLKATA ', ' patna', 'v1', '407 LPT', '407LPT', 1500),
+        ('KOLKATA', 'PATNA', 'V1', 'ODD TRUCK', '', 700),
+    ), 1, 10 * DAY)
+
+    rates = history.as_of(15 * DAY)['rates']
+    assert [(r['from_origin'], r['vehicle_class'], r['rate']) for r in rates] == [
+        ('KOLKATA', '407LPT', 1500), ('KOLKATA', 'ODD TRUCK', 700)]
+    assert len(history.as_of(15 * DAY, vehicle_class='407lpt')['rates']) == 1
+
+
+@pytest.mark.parametrize('value', ['nan', 'inf', '-inf', 'tomorrow'])
+def test_parse_time_rejects_non_times(value):
+    with pytest.raises(ValueError):
+        parse_time(value)
+
+
+def test_parse_time_reads_dates_as_end_of_day():
+    assert parse_time('') is None
+    assert parse_time('86400') == 86400.0
+    end = parse_time('2026-03-31')
+    assert math.isclose(end - parse_time('2026-03-31T00:00:00'), DAY, abs_tol=1e-3)
@@ -0,0 +1,103 @@
+import json
+import os
+import time
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from models.ai_engine import AIQuotationEngine
+from services.quotation_service import QuotationService
+from services.report_jobs import ReportJobManager
+from services.shared_store import create_store
+from tests.test_quotation_service import ROWS, StaticSheets, config  # noqa: F401
+
+HEADER = ['DC City', 'Customer City', '407 LPT', 'TATA ACE', 'Remarks']
+
+
+class Upload:
+    """The part of a werkzeug FileStorage the manager uses"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def save(self, path):
+        workbook = Workbook()
+        for row in self.rows:
+            workbook.active.append(row)
+        workbook.save(path)
+
+
+def wait(manager, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['state'] in (ReportJobManager.DONE, ReportJobManager.FAILED):
+            return job
+        time.sleep(0.05)
+    raise AssertionError('report did not finish')
+
+
+@pytest.fixture
+def store():
+    return create_store('memory://')
+
+
+@pytest.fixture
+def manager(tmp_path, store):
+    service = QuotationService(StaticSheets(ROWS), AIQuotationEngine(), store)
+    return ReportJobManager(service, str(tmp_path / 'reports'), store)
+
+
+def test_report_fills_marks_up_and_previews_unmarked_rows(manager, monkeypatch):
+    monkeypatch.setattr(ReportJobManager, 'PREVIEW_ROWS', 2)
+    lanes = [['Kolkata', 'Patna', '', '', 'x'], ['Siliguri', 'Malda', '', '', ''], ['Pune', 'Goa', '', '', '']]
+
+    job = wait(manager, manager.submit(Upload([HEADER] + lanes), percent=10, formats=['xlsx', 'csv'])['job_id'])
+
+    assert job['state'] == ReportJobManager.DONE
+    assert (job['rows_done'], job['filled_cells'], job['total_cells']) == (3, 3, 6)
+    report = list(load_workbook(manager.file_path(job['job_id'], 'xlsx')).active.values)
+    assert report[1][:4] == ('Kolkata', 'Patna', 3300, 2200)
+    assert report[2][2] == 550
+    assert manager.file_path(job['job_id'], 'csv')
+
+    preview = manager.preview(job['job_id'])
+    assert preview['header'] == HEADER
+    assert preview['rows'] == [['Kolkata', 'Patna', 3000, 2000, 'x'], ['Siliguri', 'Malda', 500, '', '']]
+    lane = next(lane for lane in preview['lanes'] if lane['column'] == '407 LPT' and lane['dc_city'] == 'Kolkata')
+    assert lane['highest'][0]['rate'] == 3000 and lane['lowest'][0] == {'vendor': 'V1', 'rate': 1000}
+    assert lane['count'] == 3
+
+
+def test_job_state_is_shared_through_the_job_directory(manager, store):
+    job = wait(manager, manager.submit(Upload([HEADER]))['job_id'])
+    other = ReportJobManager(manager.quotation_service, manager.directory, store)
+
+    assert other.get(job['job_id'])['state'] == ReportJobManager.DONE
+    assert os.path.exists(os.path.join(manager.directory, job['job_id'], 'job.json'))
+
+
+def test_job_state_lives_in_a_shared_store(tmp_path):
+    store = create_store(f"sqlite:///{tmp_path / 'store.db'}")
+    service = QuotationService(StaticSheets(ROWS), AIQuotationEngine(), store)
+    manager = ReportJobManager(service, str(tmp_path / 'reports'), store)
+
+    job = wait(manager, manager.submit(Upload([HEADER]))['job_id'])
+
+    assert store.get_json(f"report:{job['job_id']}")['state'] == ReportJobManager.DONE
+    assert not os.path.exists(os.path.join(manager.directory, job['job_id'], 'job.json'))
+
+
+def test_job_without_heartbeat_is_marked_failed(manager):
+    job_id = 'a' * 32
+    os.makedirs(os.path.join(manager.directory, job_id))
+    stale = time.time() - ReportJobManager.STALE_AFTER_SECONDS - 1
+    with open(os.path.join(manager.directory, job_id, 'job.json'), 'w') as f:
+        json.dump({'job_id': job_id, 'state': ReportJobManager.RUNNING, 'formats': ['xlsx'],
+                   'owner': 'gone:1', 'created_at': stale, 'heartbeat_at': stale}, f)
+
+    job = manager.get(job_id)
+
+    assert job['state'] == ReportJobManager.FAILED and 'stopped' in job['error']
+    assert manager.get(job_id)['state'] == ReportJobManager.FAILED
+    assert manager.file_path(job_id, 'xlsx') is None
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import time
+
+import pytest
+from flask import Flask, jsonify
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from tools import replay
+from utils.request_capture import RequestCapture, normalize_request
+
+
+def test_client_ids_are_keyed_by_the_deployment_secret(tmp_path):
+    path = str(tmp_path / 'capture.jsonl')
+    first = RequestCapture(path, secret='deployment-a')
+    second = RequestCapture(path, secret='deployment-a')
+    other = RequestCapture(path, secret='deployment-b')
+
+    assert first.client_id('10.0.0.1') == second.client_id('10.0.0.1')
+    assert first.client_id('10.0.0.1') != first.client_id('10.0.0.2')
+    assert first.client_id('10.0.0.1') != other.client_id('10.0.0.1')
+    assert not hashlib.sha1(b'10.0.0.1').hexdigest().startswith(first.client_id('10.0.0.1')[:8])
+
+
+def test_normalize_request_keeps_the_lane_shape():
+    search = {'from_location': 'Kolkata', 'to_location': 'Patna', 'vehicle_type': '',
+              'max_results': 5, 'extra': 'dropped'}
+    batch = {'lanes': [{'from_location': 'A', 'to_location': 'B', 'vehicle_type': 'LPT'}, 'bad'],
+             'max_results': 10}
+
+    assert normalize_request('search_quotations', search, {}) == \
+        {'from': 'Kolkata', 'to': 'Patna', 'vehicle_type': None, 'max_results': 5}
+    assert normalize_request('search_quotations_batch', batch, {}) == \
+        {'lanes': [{'from': 'A', 'to': 'B', 'vehicle_type': 'LPT'}], 'max_results': 10}
+    assert normalize_request('search_quotations_batch', {'lanes': 'bad'}, {}) == \
+        {'lanes': [], 'max_results': None}
+    assert normalize_request('get_lanes', None, {'search': 'patna'}) == {'search': 'patna'}
+
+
+def read_records(path, count, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if path.exists():
+            lines = path.read_text().splitlines()
+            if len(lines) >= count:
+                return [json.loads(line) for line in lines]
+        time.sleep(0.02)
+    raise AssertionError(f'{count} capture records not written in {timeout}s')
+
+
+def test_capture_writes_one_line_per_request_behind_a_proxy(tmp_path):
+    path = tmp_path / 'capture.jsonl'
+    app = Flask(__name__)
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+
+    @app.route('/api/quotations/search', methods=['POST'])
+    def search_quotations():
+        return jsonify({'success': True})
+
+    @app.route('/api/health')
+    def health():
+        return jsonify({'status': 'healthy'})
+
+    capture = RequestCapture(str(path), secret='deployment-a')
+    capture.init_app(app)
+    client = app.test_client()
+    for address in ('203.0.113.7', '198.51.100.2'):
+        client.post('/api/quotations/search', json={'from_location': 'Kolkata', 'to_location': 'Patna'},
+                    headers={'X-Forwarded-For': address}, environ_base={'REMOTE_ADDR': '127.0.0.1'})
+    client.get('/api/health')
+
+    records = read_records(path, 2)
+    assert len(records) == 2
+    assert [r['c'] for r in records] == [capture.client_id('203.0.113.7'), capture.client_id('198.51.100.2')]
+    assert records[0]['e'] == 'search_quotations' and records[0]['s'] == 200
+    assert records[0]['q'] == {'from': 'Kolkata', 'to': 'Patna', 'vehicle_type': None, 'max_results': None}
+
+
+def test_build_request_rebuilds_bodies_and_query_strings():
+    search = {'e': 'search_quotations', 'm': 'POST', 'p': '/api/quotations/search',
+              'q': {'from': 'Kolkata', 'to': 'Patna', 'vehicle_type': None, 'max_results': 5}}
+    batch = {'e': 'search_quotations_batch', 'm': 'POST', 'p': '/api/quotations/batch',
+             'q': {'lanes': [{'from': 'A', 'to': 'B', 'vehicle_type': 'LPT'}], 'max_results': None}}
+    lanes = {'e': 'get_lanes', 'm': 'GET', 'p': '/api/lanes', 'q': {'search': 'new town', 'page': '2'}}
+
+    assert replay.build_request(search) == \
+        ('POST', '/api/quotations/search', {'from_location': 'Kolkata', 'to_location': 'Patna', 'max_results': 5})
+    assert replay.build_request(batch) == \
+        ('POST', '/api/quotations/batch',
+         {'lanes': [{'from_location': 'A', 'to_location': 'B', 'vehicle_type': 'LPT'}]})
+    assert replay.build_request(lanes) == ('GET', '/api/lanes?search=new+town&page=2', None)
+    assert replay.build_request({'e': 'get_vendors', 'm': 'GET', 'p': '/api/vendors'}) == \
+        ('GET', '/api/vendors', None)
+
+
+@pytest.mark.parametrize('pct, expected', [(0, 1), (50, 50), (95, 95), (99, 99), (100, 100)])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert replay._percentile([float(v) for v in range(1, 101)], pct) == expected
+
+
+def test_percentile_of_no_values():
+    assert replay._percentile([], 95) == 0.0
+
+
+def test_summarize_counts_errors_and_rate_limits_per_endpoint():
+    results = [
+        ('search_quotations', 200, 0.010, 0.0),
+        ('search_quotations', 429, 0.002, 0.0),
+        ('search_quotations', 500, 0.030, 0.005),
+        ('get_lanes', 0, 0.050, 0.0),
+        ('get_lanes', 404, 0.001, 0.0),
+    ]
+    summary = replay.summarize(results, wall=2.0)
+
+    search = summary['search_quotations']
+    assert search['requests'] == 3
+    assert search['throughput_rps'] == 1.5
+    assert search['p50_ms'] == 10.0 and search['max_ms'] == 30.0
+    assert search['error_rate'] == round(1 / 3, 4)
+    assert search['rate_limited'] == 1 and search['client_errors'] == 0
+    assert search['max_lag_ms'] == 5.0
+    assert summary['get_lanes']['error_rate'] == 0.5
+    assert summary['get_lanes']['client_errors'] == 1
+    assert summary['ALL']['requests'] == 5
+    assert summary['ALL']['error_rate'] == 0.4
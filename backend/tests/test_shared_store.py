@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from services.shared_store import MemoryStore, SQLiteStore
+from services.snapshot_codec import decode_frame, encode_frame, normalize_text_columns
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryStore()
+    return SQLiteStore(str(tmp_path / 'store.db'))
+
+
+def test_lock_is_released_only_by_its_owner(backend):
+    assert backend.add('lock', b'worker-1', 30)
+    assert not backend.add('lock', b'worker-2', 30)
+
+    assert not backend.delete_if('lock', b'worker-2')
+    assert backend.get('lock') == b'worker-1'
+    assert backend.delete_if('lock', b'worker-1')
+    assert backend.get('lock') is None
+    assert backend.add('lock', b'worker-2', 30)
+
+
+def test_memory_store_evicts_cache_entries_only():
+    store = MemoryStore(max_entries=2)
+    store.add('lock', b'owner', 30)
+    store.incr('generation')
+    store.set('pointer', b'{}')
+    for i in range(5):
+        store.set(f'result:{i}', b'x', ttl=60, cache=True)
+
+    assert store.get('lock') == b'owner'
+    assert store.get('generation') == 1
+    assert store.get('pointer') == b'{}'
+    assert [store.get(f'result:{i}') for i in range(5)] == [None, None, None, b'x', b'x']
+
+
+def test_snapshot_round_trip():
+    df = pd.DataFrame({
+        'from_origin': pd.Categorical(['KOLKATA', 'PATNA', 'KOLKATA']),
+        'vehicle_no': ['WB23D1704', 1109, float('nan')],
+        'area': ['PATNA', None, 'MALDA'],
+        'rate': pd.Series([1000, 2000, 3000], dtype='int32'),
+    }, index=[3, 7, 9])
+    normalized = normalize_text_columns(df)
+
+    decoded, metadata = decode_frame(encode_frame(normalized, {'generation': 4, 'fingerprint': 'abc'}))
+
+    assert metadata == {'generation': 4, 'fingerprint': 'abc'}
+    pd.testing.assert_frame_equal(decoded, normalized)
+    assert decoded['vehicle_no'].tolist() == ['WB23D1704', '1109', None]
+    assert decoded.index.tolist() == [3, 7, 9]
+
+
+def compacted_sheet():
+    """A cleaned and compacted sheet whose vehicle_no mixes text and numbers"""
+    from models.data_processor import DataProcessor
+
+    processor = DataProcessor()
+    raw = pd.DataFrame([
+        {'FROM-ORIGIN': 'KOLKATA', 'AREA': 'PATNA', 'VEHICLE NO.': 'WB1' if i % 2 else 1109,
+         'VEHICLE TYE': 'LPT', 'RATE': 1000 + i, 'VENDOR NAME': f'V{i % 3}'}
+        for i in range(20)
+    ])
+    return processor.compact_data(processor.clean_data(raw))
+
+
+def test_compacted_sheet_round_trip():
+    df = compacted_sheet()
+    assert isinstance(df['vehicle_no'].dtype, pd.CategoricalDtype)
+
+    normalized = normalize_text_columns(df)
+    decoded, _ = decode_frame(encode_frame(normalized, {'generation': 1}))
+
+    assert set(decoded['vehicle_no'].astype(str)) == {'WB1', '1109'}
+    assert decoded['vehicle_no'].astype(str).tolist() == df['vehicle_no'].astype(str).tolist()
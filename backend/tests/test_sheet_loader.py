@@ -0,0 +1,129 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from services.sheet_loader import MultiSheetLoader, SheetLoadError
+
+SHEETS = {
+    "'Sheet A'": [['FROM-ORIGIN', 'AREA', 'RATE'], ['KOLKATA', 'PATNA', 1000], ['', 'RANCHI']],
+    "Sheet B!A1:C": [['FROM-ORIGIN', 'AREA', 'RATE'], ['SILIGURI', 'MALDA', 2000]],
+}
+
+
+class StubSheetsAPI(BaseHTTPRequestHandler):
+    """Serves SHEETS at /v4/spreadsheets/<id>/values/<range>"""
+
+    failures = {}
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        sheet_range = unquote(url.path.rsplit('/values/', 1)[1])
+        self.requests.append((sheet_range, parse_qs(url.query)))
+        if self.failures.get(sheet_range, 0) > 0:
+            self.failures[sheet_range] -= 1
+            self._send(503, {'error': 'unavailable'})
+        elif sheet_range in SHEETS:
+            self._send(200, {'range': sheet_range, 'values': SHEETS[sheet_range]})
+        else:
+            self._send(400, {'error': 'Unable to parse range'})
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api():
+    StubSheetsAPI.failures = {}
+    StubSheetsAPI.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubSheetsAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v4/spreadsheets"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetches_worksheets_and_a1_ranges(stub_api):
+    loader = MultiSheetLoader('sheet-id', ['Sheet A', 'Sheet B!A1:C'], base_url=stub_api)
+
+    merged = loader.load_merged()
+
+    assert sorted(r for r, _ in StubSheetsAPI.requests) == ["'Sheet A'", 'Sheet B!A1:C']
+    assert StubSheetsAPI.requests[0][1]['valueRenderOption'] == ['UNFORMATTED_VALUE']
+    assert merged['SOURCE SHEET'].tolist() == ['Sheet A', 'Sheet A', 'Sheet B!A1:C']
+    # Short rows are padded to the header width
+    assert merged['RATE'].tolist() == [1000, '', 2000]
+
+
+def test_single_range_is_not_tagged(stub_api):
+    merged = MultiSheetLoader('sheet-id', ['Sheet B!A1:C'], base_url=stub_api).load_merged()
+
+    assert list(merged.columns) == ['FROM-ORIGIN', 'AREA', 'RATE']
+
+
+def test_retries_transient_errors(stub_api):
+    StubSheetsAPI.failures = {"'Sheet A'": 2}
+    loader = MultiSheetLoader('sheet-id', ['Sheet A'], base_url=stub_api, backoff=0.01)
+
+    assert loader.fetch_values('Sheet A') == SHEETS["'Sheet A'"]
+    assert len(StubSheetsAPI.requests) == 3
+
+
+def test_failed_range_fails_the_load(stub_api):
+    StubSheetsAPI.failures = {"'Sheet A'": 5}
+    loader = MultiSheetLoader('sheet-id', ['Sheet A', 'Sheet B!A1:C'], base_url=stub_api,
+                              max_retries=1, backoff=0.01)
+
+    with pytest.raises(SheetLoadError, match='Sheet A'):
+        loader.load()
+    with pytest.raises(SheetLoadError):
+        loader.load_merged()
+
+
+def test_service_builds_loader_for_a1_range(stub_api, tmp_path, monkeypatch):
+    from config import Config
+    from services.google_sheets import GoogleSheetsService
+
+    credentials = tmp_path / 'credentials.json'
+    credentials.write_text('{}')
+    monkeypatch.setattr(Config, 'GOOGLE_CREDENTIALS_FILE', str(credentials))
+    monkeypatch.setattr(
+        MultiSheetLoader, 'from_service_account',
+        classmethod(lambda cls, path, sheet_id, ranges, scopes=None, **kwargs:
+                    cls(sheet_id, ranges, base_url=stub_api))
+    )
+
+    service = GoogleSheetsService(worksheet_names=['Sheet B!A1:C'])
+
+    assert service.get_data()['FROM-ORIGIN'].tolist() == ['SILIGURI']
+
+
+def test_service_falls_back_to_flagged_demo_data_on_a_failed_range(stub_api, tmp_path, monkeypatch):
+    from config import Config
+    from services.google_sheets import GoogleSheetsService
+
+    StubSheetsAPI.failures = {"'Sheet A'": 5}
+    credentials = tmp_path / 'credentials.json'
+    credentials.write_text('{}')
+    monkeypatch.setattr(Config, 'GOOGLE_CREDENTIALS_FILE', str(credentials))
+    monkeypatch.setattr(
+        MultiSheetLoader, 'from_service_account',
+        classmethod(lambda cls, path, sheet_id, ranges, scopes=None, **kwargs:
+                    cls(sheet_id, ranges, base_url=stub_api, max_retries=1, backoff=0.01))
+    )
+
+    data = GoogleSheetsService(worksheet_names=['Sheet A', 'Sheet B!A1:C']).get_data()
+
+    assert data.attrs.get('demo') is True
@@ -0,0 +1,56 @@
+import pytest
+
+from models import vehicle_types
+from models.vehicle_types import VehicleTypeCanonicalizer
+from services.report_jobs import BulkQuoteFiller
+
+
+@pytest.mark.parametrize('raw, expected', [
+    ('TATA ACE', 'TATA ACE'),
+    ('ace', 'TATA ACE'),
+    ('Tata-Ace open', 'TATA ACE'),
+    ('407 LPT', '407LPT'),
+    ('407', '407LPT'),
+    ('407-SFC', '407SFC'),
+    ('1109-19FT', '1109'),
+    ('22FT-9MT', '22FT - 9 MT'),
+    ('32FT SXL', '32FT -SXL'),
+    ('12 WHEELER', '12 WHEEL'),
+    ('pick up', 'Bolero-Pkup'),
+])
+def test_aliases(raw, expected):
+    assert VehicleTypeCanonicalizer().canonicalize(raw) == expected
+
+
+@pytest.mark.parametrize('raw', ['SPACE', 'PLACE', '19MT', 'X407', '4070', 'SXLR', '', None])
+def test_aliases_inside_other_words_do_not_match(raw):
+    assert VehicleTypeCanonicalizer().canonicalize(raw) == ''
+
+
+def test_vehicle_number_suffix():
+    canonicalizer = VehicleTypeCanonicalizer()
+    assert canonicalizer.canonicalize('', 'WB23D1704-407LPT') == '407LPT'
+    assert canonicalizer.canonicalize('', 'WB23D1407') == ''
+
+
+def test_report_headers_resolve_through_canonicalizer():
+    class Lanes:
+        lanes = [{'from_origin': 'Kolkata', 'area': 'Patna', 'vehicle_class': '407LPT', 'count': 1,
+                  'highest': {'vendor': 'V1', 'rate': 5000}, 'second_highest': None,
+                  'lowest': [{'vendor': 'V1', 'rate': 5000}]}]
+
+    filler = BulkQuoteFiller(Lanes(), VehicleTypeCanonicalizer().canonicalize)
+    filler.set_header(['DC City', 'Customer City', ' 407 LPT ', 'SPACE', 'TATA ACE'])
+
+    assert filler.fill(['KOLKATA', 'PATNA', '', '', '']) == ['KOLKATA', 'PATNA', 5000, '', '']
+    assert filler.total_cells == 2
+
+
+def test_query_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(vehicle_types, 'MATCH_CACHE_SIZE', 8)
+    canonicalizer = VehicleTypeCanonicalizer()
+
+    for i in range(100):
+        assert canonicalizer.code(f"query {i}") == -1
+    assert canonicalizer.code('407 lpt') == canonicalizer.classes.index('407LPT')
+    assert canonicalizer._match_text.cache_info().currsize == 8
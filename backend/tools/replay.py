@@ -0,0 +1,304 @@
+# ================================
+# backend/tools/replay.py
+# ================================
+"""Replay a captured or synthetic request trace and report per-endpoint latency.
+
+    python -m tools.replay capture.ndjson --concurrency 8 --speed 2
+    python -m tools.replay --synthetic 2000 --rate 50 --rows 20000
+    python -m tools.replay capture.ndjson --url http://localhost:5000
+
+Run from the backend directory. Captures come from CAPTURE_REQUESTS_FILE.
+Without --url the app is imported in-process, backed by
+FakeGoogleSheetsService (--rows, --sheet-latency), and every captured client
+keeps its own address so the rate limits in app.py apply as in production.
+With --url the target should be started with FAKE_SHEETS_ROWS set (same
+--rows) so synthetic lanes exist in its data, and with RATE_HISTORY_DIR=
+so the synthetic rates are not recorded as rate history.
+
+--speed scales the captured inter-arrival times (2 = twice as fast, 0 = as
+fast as the concurrency allows).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Synthetic traffic mix: endpoint -> share of requests
+SYNTHETIC_MIX = {
+    'search_quotations': 0.70,
+    'search_quotations_batch': 0.05,
+    'get_lanes': 0.10,
+    'get_vendors': 0.05,
+    'get_dashboard_analytics': 0.05,
+    'get_vehicle_types': 0.05,
+}
+ENDPOINT_PATHS = {
+    'search_quotations': ('POST', '/api/quotations/search'),
+    'search_quotations_batch': ('POST', '/api/quotations/batch'),
+    'get_lanes': ('GET', '/api/lanes'),
+    'get_vendors': ('GET', '/api/vendors'),
+    'get_dashboard_analytics': ('GET', '/api/analytics/dashboard'),
+    'get_vehicle_types': ('GET', '/api/vehicle-types'),
+}
+
+
+def load_trace(path: str, limit: Optional[int] = None) -> List[Dict]:
+    """Captured records sorted by time, with ``t`` relative to the first"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda r: r['t'])
+    if limit:
+        records = records[:limit]
+    if records:
+        start = records[0]['t']
+        for record in records:
+            record['t'] -= start
+    return records
+
+
+def synthetic_trace(count: int, rate: float, lanes: List[Dict], clients: int = 20, seed: int = 1) -> List[Dict]:
+    """Poisson arrivals at ``rate`` requests/s over the SYNTHETIC_MIX"""
+    rng = random.Random(seed)
+    endpoints, weights = zip(*SYNTHETIC_MIX.items())
+    records, t = [], 0.0
+    for _ in range(count):
+        t += rng.expovariate(rate) if rate > 0 else 0
+        endpoint = rng.choices(endpoints, weights)[0]
+        lane = rng.choice(lanes)
+        if endpoint == 'search_quotations':
+            q = {'from': lane['from_location'], 'to': lane['to_location'],
+                 'vehicle_type': lane['vehicle_type'], 'max_results': 1000}
+        elif endpoint == 'search_quotations_batch':
+            q = {'lanes': [{'from': l['from_location'], 'to': l['to_location'],
+                            'vehicle_type': l['vehicle_type']} for l in rng.sample(lanes, min(20, len(lanes)))],
+                 'max_results': 100}
+        elif endpoint == 'get_lanes':
+            q = {'search': lane['to_location'].split()[-1], 'page': '1', 'page_size': '50'}
+        else:
+            q = {}
+        method, path = ENDPOINT_PATHS[endpoint]
+        records.append({'t': t, 'c': f"client{rng.randrange(clients)}", 'm': method,
+                        'p': path, 'e': endpoint, 'q': q})
+    return records
+
+
+def _lane_body(lane: Dict) -> Dict:
+    body = {'from_location': lane.get('from'), 'to_location': lane.get('to')}
+    if lane.get('vehicle_type'):
+        body['vehicle_type'] = lane['vehicle_type']
+    return body
+
+
+def build_request(record: Dict) -> Tuple[str, str, Optional[Dict]]:
+    """(method, path with query string, JSON body) for a trace record"""
+    q = record.get('q') or {}
+    if record['e'] == 'search_quotations':
+        body = _lane_body(q)
+        if q.get('max_results'):
+            body['max_results'] = q['max_results']
+        return record['m'], record['p'], body
+    if record['e'] == 'search_quotations_batch':
+        body = {'lanes': [_lane_body(lane) for lane in q.get('lanes', [])]}
+        if q.get('max_results'):
+            body['max_results'] = q['max_results']
+        return record['m'], record['p'], body
+    path = record['p'] + ('?' + urllib.parse.urlencode(q) if q else '')
+    return record['m'], path, None
+
+
+class InProcessTarget:
+    """The Flask app in this process, one test client per worker thread"""
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+        self._local = threading.local()
+        self._addresses: Dict[str, str] = {}
+        self._addresses_lock = threading.Lock()
+
+    def _address(self, client: str) -> str:
+        # Worker threads share the table; two new clients must not get one address
+        with self._addresses_lock:
+            if client not in self._addresses:
+                n = len(self._addresses) + 1
+                self._addresses[client] = f"10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}"
+            return self._addresses[client]
+
+    def send(self, method: str, path: str, body: Optional[Dict], client: str) -> int:
+        test_client = getattr(self._local, 'client', None)
+        if test_client is None:
+            test_client = self._local.client = self.app.test_client()
+        response = test_client.open(path, method=method, json=body,
+                                    environ_base={'REMOTE_ADDR': self._address(client)})
+        response.close()
+        return response.status_code
+
+
+class HttpTarget:
+    """A running instance reached over HTTP"""
+
+    def __init__(self, base_url: str, timeout: float = 60.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, method: str, path: str, body: Optional[Dict], client: str) -> int:
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'} if data else {})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def replay(records: List[Dict], target, concurrency: int = 8, speed: float = 1.0) -> Tuple[List[Tuple], float]:
+    """Send the trace; returns ([(endpoint, status, latency s, lag s)], wall time)"""
+    results = []
+    results_lock = threading.Lock()
+    slots = threading.Semaphore(concurrency)
+
+    def run(record, scheduled):
+        method, path, body = build_request(record)
+        started = time.perf_counter()
+        try:
+            status = target.send(method, path, body, record.get('c', ''))
+        except Exception:
+            status = 0
+        finally:
+            slots.release()
+        latency = time.perf_counter() - started
+        with results_lock:
+            results.append((record['e'], status, latency, max(0.0, started - scheduled)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in records:
+            scheduled = start + (record['t'] / speed if speed > 0 else 0)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            slots.acquire()
+            pool.submit(run, record, scheduled)
+    return results, time.perf_counter() - start
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(results: List[Tuple], wall: float) -> Dict:
+    """Throughput, latency percentiles (ms) and error rates per endpoint"""
+    by_endpoint: Dict[str, List[Tuple]] = {}
+    for result in results:
+        by_endpoint.setdefault(result[0], []).append(result)
+    by_endpoint['ALL'] = results
+
+    summary = {}
+    for endpoint, rows in by_endpoint.items():
+        latencies = sorted(r[2] * 1000 for r in rows)
+        statuses = [r[1] for r in rows]
+        count = len(rows)
+        summary[endpoint] = {
+            'requests': count,
+            'throughput_rps': round(count / wall, 2) if wall else 0,
+            'p50_ms': round(_percentile(latencies, 50), 2),
+            'p95_ms': round(_percentile(latencies, 95), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2) if latencies else 0,
+            'error_rate': round(sum(1 for s in statuses if s == 0 or s >= 500) / count, 4) if count else 0,
+            'rate_limited': sum(1 for s in statuses if s == 429),
+            'client_errors': sum(1 for s in statuses if 400 <= s < 500 and s != 429),
+            'max_lag_ms': round(max((r[3] for r in rows), default=0) * 1000, 2),
+        }
+    return summary
+
+
+def print_summary(summary: Dict, wall: float):
+    columns = ['requests', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+               'error_rate', 'rate_limited', 'client_errors', 'max_lag_ms']
+    width = max(len(name) for name in summary) + 2
+    print(f"Replayed {summary['ALL']['requests']} requests in {wall:.2f}s")
+    print('endpoint'.ljust(width) + ''.join(c.rjust(15) for c in columns))
+    for endpoint in sorted(summary, key=lambda e: (e == 'ALL', e)):
+        print(endpoint.ljust(width) + ''.join(str(summary[endpoint][c]).rjust(15) for c in columns))
+
+
+def _in_process_app(args):
+    """Import the app against a fake sheet; must run before anything imports config"""
+    os.environ['FAKE_SHEETS_ROWS'] = str(args.rows)
+    os.environ['FAKE_SHEETS_LATENCY'] = str(args.sheet_latency)
+    # Synthetic rates must never reach the rate history of the checkout
+    os.environ['RATE_HISTORY_DIR'] = ''
+    os.environ.setdefault('LAZY_STARTUP', 'false')
+    import app as backend_app
+
+    if args.no_limits:
+        backend_app.limiter.enabled = False
+    backend_app.services.wait_ready()
+    backend_app.services.quotation_service._get_fresh_data()
+    return backend_app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay a request trace and report latency per endpoint')
+    parser.add_argument('trace', nargs='?', help='capture file (NDJSON) from CAPTURE_REQUESTS_FILE')
+    parser.add_argument('--synthetic', type=int, default=0, help='generate this many requests instead')
+    parser.add_argument('--rate', type=float, default=20.0, help='synthetic arrival rate (requests/s)')
+    parser.add_argument('--clients', type=int, default=20, help='distinct synthetic clients')
+    parser.add_argument('--limit', type=int, help='replay at most this many captured requests')
+    parser.add_argument('--concurrency', type=int, default=8, help='requests in flight at most')
+    parser.add_argument('--speed', type=float, default=1.0, help='time scale; 0 = no pacing')
+    parser.add_argument('--url', help='replay over HTTP against this base URL')
+    parser.add_argument('--rows', type=int, default=5000, help='rows in the fake rate book')
+    parser.add_argument('--sheet-latency', type=float, default=0.0, help='fake Sheets API latency (s)')
+    parser.add_argument('--no-limits', action='store_true', help='disable rate limits (in-process only)')
+    parser.add_argument('--json', help='also write the summary to this file')
+    args = parser.parse_args(argv)
+
+    if not args.trace and not args.synthetic:
+        parser.error('give a capture file or --synthetic N')
+
+    backend_app = None
+    if args.url:
+        target = HttpTarget(args.url)
+    else:
+        backend_app = _in_process_app(args)
+        target = InProcessTarget(backend_app.app)
+
+    if args.trace:
+        records = load_trace(args.trace, args.limit)
+    else:
+        if backend_app is not None:
+            fake = backend_app.services.sheets_service
+        else:
+            from services.fake_sheets import FakeGoogleSheetsService
+            fake = FakeGoogleSheetsService(args.rows)
+        records = synthetic_trace(args.synthetic, args.rate, fake.lanes(500), args.clients)
+
+    results, wall = replay(records, target, args.concurrency, args.speed)
+    summary = summarize(results, wall)
+    print_summary(summary, wall)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'wall_seconds': round(wall, 3), 'endpoints': summary}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
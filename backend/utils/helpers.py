@@ -1 +1,50 @@
+# ================================
+# backend/utils/helpers.py
+# ================================
+import threading
 
+
+def _gevent_hub():
+    """The gevent hub getter when gevent has patched threading, else None.
+
+    Checked once at import: gunicorn's gevent worker patches before it
+    loads the app, and importing a missing module on every call is slow.
+    """
+    try:
+        from gevent import monkey
+        if monkey.is_module_patched('threading'):
+            from gevent import get_hub
+            return get_hub
+    except ImportError:
+        pass
+    return None
+
+
+_GET_HUB = _gevent_hub()
+
+
+def cooperative_workers() -> bool:
+    """True under gevent workers, where an idle connection costs a greenlet, not a thread"""
+    return _GET_HUB is not None
+
+
+def run_cpu_bound(func, *args, **kwargs):
+    """Run CPU-heavy work without blocking the event loop of gevent workers.
+
+    Under gevent the call is handed to the hub's native thread pool so other
+    greenlets keep serving I/O; with sync or threaded workers, where each
+    request has its own thread already, it runs inline.
+
+    ``func`` runs outside the hub, so it must not do I/O, take locks or
+    start threads: read snapshots and caches first and pass them in.
+    """
+    if _GET_HUB is not None:
+        return _GET_HUB().threadpool.apply(func, args, kwargs)
+    return func(*args, **kwargs)
+
+
+def start_daemon(target, name: str, *args) -> threading.Thread:
+    """Start a named daemon thread (a greenlet when gevent has patched threading)"""
+    thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,240 @@
+# ================================
+# backend/utils/profiling.py
+# ================================
+import cProfile
+import gc
+import io
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})"
+
+
+class Profiler:
+    """On-demand CPU and memory profiling of a live worker.
+
+    Nothing runs until a session is started: the sampler is a thread that
+    only exists for the length of a window, the per-request cProfile hook
+    is a single flag check while idle, and tracemalloc is only switched on
+    between ``start_memory`` and ``stop_memory``.
+
+    CPU profiles come in two kinds:
+    - sampling: every thread's stack is read ``interval`` seconds apart
+      and aggregated as collapsed stacks, the input format of
+      flamegraph.pl and speedscope.
+    - cprofile: each request in the window is profiled deterministically,
+      and the stats are merged into one pstats dump.
+    Under gevent, greenlets that are not running when sampled are not
+    seen; use cprofile there.
+    """
+
+    def __init__(self, memory_history: int = 10):
+        self._cpu_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.cprofile_active = False
+        self._stats: Optional[pstats.Stats] = None
+        self._memory_baseline = None
+        self.memory_events = deque(maxlen=memory_history)
+
+    # --- CPU ---
+
+    def sample(self, seconds: float, interval: float = 0.005) -> Dict:
+        """Sample all thread stacks for ``seconds``; returns collapsed stack counts"""
+        if not self._cpu_lock.acquire(blocking=False):
+            raise RuntimeError('A CPU profile is already running')
+        try:
+            own = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            deadline = time.time() + seconds
+            while time.time() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stacks[';'.join(reversed(labels))] += 1
+                samples += 1
+                time.sleep(interval)
+            return {'samples': samples, 'stacks': stacks}
+        finally:
+            self._cpu_lock.release()
+
+    @staticmethod
+    def collapsed(stacks: Counter, skip_idle: bool = True) -> str:
+        """Collapsed stack text (``frame;frame;frame count`` per line)"""
+        idle = ('wait (threading.py', 'select (selectors.py', 'accept (socket.py', '_worker (thread.py')
+        lines = []
+        for stack, count in stacks.most_common():
+            leaf = stack.rsplit(';', 1)[-1]
+            if skip_idle and leaf.startswith(idle):
+                continue
+            lines.append(f"{stack} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def profile_requests(self, seconds: float) -> pstats.Stats:
+        """cProfile every request that starts within the next ``seconds``"""
+        if not self._cpu_lock.acquire(blocking=False):
+            raise RuntimeError('A CPU profile is already running')
+        try:
+            with self._stats_lock:
+                self._stats = None
+            self.cprofile_active = True
+            time.sleep(seconds)
+            self.cprofile_active = False
+            # Let requests started inside the window finish and report
+            time.sleep(min(1.0, seconds))
+            with self._stats_lock:
+                stats, self._stats = self._stats, None
+            return stats
+        finally:
+            self.cprofile_active = False
+            self._cpu_lock.release()
+
+    def request_started(self) -> Optional[cProfile.Profile]:
+        if not self.cprofile_active:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process, so
+            # overlapping requests are skipped there
+            return None
+        return profile
+
+    def request_finished(self, profile: Optional[cProfile.Profile]):
+        if profile is None:
+            return
+        profile.disable()
+        with self._stats_lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+
+    @staticmethod
+    def pstats_text(stats: pstats.Stats, sort: str = 'cumulative', limit: int = 50) -> str:
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    @staticmethod
+    def pstats_dump(stats: pstats.Stats) -> bytes:
+        """The stats in the binary format of ``pstats.Stats(path)`` / snakeviz"""
+        return marshal.dumps(stats.stats)
+
+    # --- Memory ---
+
+    @property
+    def memory_active(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start_memory(self, frames: int = 25):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._memory_baseline = tracemalloc.take_snapshot()
+        self.memory_events.clear()
+
+    def stop_memory(self):
+        tracemalloc.stop()
+        self._memory_baseline = None
+
+    @staticmethod
+    def _filter(snapshot):
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    @staticmethod
+    def _top(stats, limit: int) -> List[Dict]:
+        rows = []
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            row = {'location': f"{frame.filename}:{frame.lineno}", 'size_kb': round(stat.size / 1024, 1),
+                   'count': stat.count}
+            if hasattr(stat, 'size_diff'):
+                row['size_diff_kb'] = round(stat.size_diff / 1024, 1)
+                row['count_diff'] = stat.count_diff
+            rows.append(row)
+        return rows
+
+    def memory_report(self, limit: int = 25, group_by: str = 'lineno') -> Dict:
+        """Top allocations now, and the growth since ``start_memory``"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError('Memory tracing is not running')
+        snapshot = self._filter(tracemalloc.take_snapshot())
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            'traced_kb': round(current / 1024, 1),
+            'peak_kb': round(peak / 1024, 1),
+            'top': self._top(snapshot.statistics(group_by), limit),
+            'events': list(self.memory_events),
+        }
+        if self._memory_baseline is not None:
+            diff = snapshot.compare_to(self._filter(self._memory_baseline), group_by)
+            report['since_start'] = self._top(diff, limit)
+        return report
+
+    @contextmanager
+    def trace(self, label: str, limit: int = 10):
+        """Record the allocation diff of a block while memory tracing is on"""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        before = tracemalloc.take_snapshot()
+        started = time.time()
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot()
+            diff = self._filter(after).compare_to(self._filter(before), 'lineno')
+            self.memory_events.append({
+                'label': label,
+                'timestamp': started,
+                'seconds': round(time.time() - started, 3),
+                'net_kb': round(sum(stat.size_diff for stat in diff) / 1024, 1),
+                'top': self._top(diff, limit),
+            })
+
+    @staticmethod
+    def live_dataframes(current=None) -> List[Dict]:
+        """Every DataFrame the garbage collector can see, largest first.
+
+        More than one large frame after a refresh usually means an old
+        snapshot is still referenced somewhere.
+        """
+        import pandas as pd
+
+        frames = [obj for obj in gc.get_objects() if isinstance(obj, pd.DataFrame)]
+        rows = [
+            {
+                'id': hex(id(df)),
+                'rows': len(df),
+                'columns': len(df.columns),
+                'size_kb': round(df.memory_usage(deep=True).sum() / 1024, 1),
+                'current': df is current,
+            }
+            for df in frames
+        ]
+        return sorted(rows, key=lambda row: -row['size_kb'])
+
+
+profiler = Profiler()
@@ -0,0 +1,112 @@
+# ================================
+# backend/utils/request_capture.py
+# ================================
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import random
+import secrets
+import time
+from typing import Dict, Optional
+
+from flask import Flask, g, request
+
+from utils.helpers import start_daemon
+
+logger = logging.getLogger(__name__)
+
+# Endpoints never captured: streams and probes would only skew the trace
+SKIP_ENDPOINTS = {'stream_events', 'health', 'readiness', 'static', 'options_preflight'}
+
+
+def _lane(body: Dict) -> Dict:
+    return {
+        'from': body.get('from_location'),
+        'to': body.get('to_location'),
+        'vehicle_type': body.get('vehicle_type') or None,
+    }
+
+
+def normalize_request(endpoint: str, body: Optional[Dict], args: Dict) -> Dict:
+    """The parts of a request that shape its cost, in a compact form"""
+    body = body if isinstance(body, dict) else {}
+    if endpoint == 'search_quotations':
+        return {**_lane(body), 'max_results': body.get('max_results')}
+    if endpoint == 'search_quotations_batch':
+        lanes = body.get('lanes') if isinstance(body.get('lanes'), list) else []
+        return {'lanes': [_lane(lane) for lane in lanes if isinstance(lane, dict)],
+                'max_results': body.get('max_results')}
+    return dict(args)
+
+
+class RequestCapture:
+    """Opt-in recorder of request shapes for load replay (tools/replay.py).
+
+    Each finished request becomes one JSON line: the epoch time, a short
+    HMAC of the client address, method, path, endpoint, the normalized
+    body, status and server-side duration in ms. Lines are written by a
+    background thread, so a request only pays for building the record, and
+    each line is a single append so gunicorn workers can share one file.
+    ``sample_rate`` < 1 records a random fraction.
+
+    The HMAC key is the deployment's ``secret``: without it an address hash
+    is reversed by hashing all IPv4 addresses. With no secret a random key
+    is used, so client ids only match within one worker process.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, queue_size: int = 10000,
+                 secret: Optional[str] = None):
+        self.path = path
+        self.sample_rate = sample_rate
+        if not secret:
+            logger.warning("CAPTURE_CLIENT_SECRET is not set; captured client ids differ per worker")
+        self._secret = secret.encode('utf-8') if secret else secrets.token_bytes(32)
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def init_app(self, app: Flask):
+        app.before_request(self._before)
+        app.after_request(self._after)
+        start_daemon(self._writer, 'request-capture')
+        logger.info(f"📼 Capturing requests to {self.path}")
+
+    def client_id(self, address: Optional[str]) -> str:
+        return hmac.new(self._secret, (address or '').encode('utf-8'), hashlib.sha256).hexdigest()[:12]
+
+    def _before(self):
+        g.capture_start = time.perf_counter()
+
+    def _after(self, response):
+        start = g.pop('capture_start', None)
+        endpoint = request.endpoint or ''
+        if start is None or endpoint in SKIP_ENDPOINTS or request.method == 'OPTIONS':
+            return response
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return response
+        record = {
+            't': round(time.time(), 3),
+            'c': self.client_id(request.remote_addr),
+            'm': request.method,
+            'p': request.path,
+            'e': endpoint,
+            'q': normalize_request(endpoint, request.get_json(silent=True), request.args.to_dict()),
+            's': response.status_code,
+            'd': round((time.perf_counter() - start) * 1000, 2),
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        return response
+
+    def _writer(self):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        while True:
+            record = self._queue.get()
+            try:
+                os.write(fd, (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8'))
+            except Exception as e:
+                logger.error(f"Error writing request capture: {str(e)}")
@@ -61,102 +61,42 @@ const VendorAvatar = styled(Avatar)(({ theme }) => ({
   }
 }));
 
-function BestVendorContacts({ previewData, vendorRatesData, VEHICLE_RATE_COLUMNS, findColIdx, normalizeCity, findVendorCol, extractVehicleType }) {
-  if (!previewData || !previewData.length || !vendorRatesData || !vendorRatesData.length) {
+// lanes: the report preview's lane details (dc_city, customer_city, column,
+// highest and lowest vendors), in the order of the previewed rows
+function BestVendorContacts({ lanes, normalizeCity }) {
+  if (!lanes || !lanes.length) {
     return null;
   }
 
-  const header = previewData[0];
-  
-  // Find column indexes
-  const dcCityIdx = findColIdx(header, 'dc city');
-  const customerCityIdx = findColIdx(header, 'customer city') !== -1
-    ? findColIdx(header, 'customer city')
-    : findColIdx(header, 'customer');
-
   // Group by unique routes
-  const uniqueRoutes = [];
   const routeMap = new Map();
 
-  previewData.slice(1).forEach((row) => {
-    const dcCity = row[dcCityIdx] || '';
-    const customerCity = row[customerCityIdx] || '';
-    
-    if (dcCity && customerCity) {
-      const routeKey = `${dcCity.toString().trim()}-${customerCity.toString().trim()}`;
-      
-      if (!routeMap.has(routeKey)) {
-        routeMap.set(routeKey, {
-          dcCity,
-          customerCity,
-          bestVendors: {}
-        });
-        uniqueRoutes.push(routeKey);
-      }
+  lanes.forEach((lane) => {
+    if (!lane.lowest || !lane.lowest.length || !lane.highest || !lane.highest.length) {
+      return;
     }
-  });
-
-  // For each unique route, find the best vendor rates
-  uniqueRoutes.forEach(routeKey => {
-    const routeData = routeMap.get(routeKey);
-    const { dcCity, customerCity } = routeData;
-    const normDcCity = normalizeCity(dcCity);
-    const normCustomerCity = normalizeCity(customerCity);
-
-    // Find all matching vendor rates for this route
-    const matchingRoutes = vendorRatesData.filter(rate => {
-      const fromOriginCol = findVendorCol(rate, 'from-origin');
-      const areaCol = findVendorCol(rate, 'area');
-      const originMatch = normDcCity && fromOriginCol && rate[fromOriginCol] &&
-        normDcCity === normalizeCity(rate[fromOriginCol]);
-      const destMatch = normCustomerCity && areaCol && rate[areaCol] &&
-        normCustomerCity === normalizeCity(rate[areaCol]);
-      return originMatch && destMatch;
-    });
-
-    // For each vehicle type, find the lowest rate
-    VEHICLE_RATE_COLUMNS.forEach(vehicleType => {
-      // Get all rates for this vehicle type
-      const ratesForType = matchingRoutes.filter(rate => {
-        const vehicleTypeExtracted = extractVehicleType(rate);
-        if (!vehicleTypeExtracted) return false;
-        
-        const normExtracted = vehicleTypeExtracted.replace(/\s+/g, '').toUpperCase();
-        const normVehicleType = vehicleType.replace(/\s+/g, '').toUpperCase();
-        
-        return (
-          normExtracted === normVehicleType ||
-          normExtracted.includes(normVehicleType) ||
-          normVehicleType.includes(normExtracted)
-        );
+    const routeKey = `${normalizeCity(lane.dc_city)}-${normalizeCity(lane.customer_city)}`;
+    if (!routeMap.has(routeKey)) {
+      routeMap.set(routeKey, {
+        dcCity: lane.dc_city,
+        customerCity: lane.customer_city,
+        bestVendors: {}
       });
+    }
 
-      if (ratesForType.length > 0) {
-        // Find the lowest rate vendor
-        const lowestRateVendor = ratesForType.reduce((min, curr) => 
-          Number(curr['rate']) < Number(min['rate']) ? curr : min, ratesForType[0]
-        );
-        
-        // Find the highest rate for comparison
-        const highestRate = Math.max(...ratesForType.map(r => Number(r['rate'])));
-        
-        // Calculate savings percentage
-        const savingsPercent = ((highestRate - Number(lowestRateVendor['rate'])) / highestRate * 100).toFixed(1);
-        
-        const vendorCol = findVendorCol(lowestRateVendor, 'vendor name') || 
-                          findVendorCol(lowestRateVendor, 'vendor') || 
-                          findVendorCol(lowestRateVendor, 'name');
-        
-        routeData.bestVendors[vehicleType] = {
-          vendorName: vendorCol ? lowestRateVendor[vendorCol] : 'Unknown Vendor',
-          rate: Number(lowestRateVendor['rate']),
-          highestRate: highestRate,
-          savingsPercent: savingsPercent,
-          contactInfo: lowestRateVendor['contact'] || lowestRateVendor['phone'] || lowestRateVendor['email'] || '',
-          vehicleType
-        };
-      }
-    });
+    // The lowest rate vendor of each vehicle type column
+    const lowestRateVendor = lane.lowest[0];
+    const highestRate = Number(lane.highest[0].rate);
+    const savingsPercent = ((highestRate - Number(lowestRateVendor.rate)) / highestRate * 100).toFixed(1);
+
+    routeMap.get(routeKey).bestVendors[lane.column] = {
+      vendorName: lowestRateVendor.vendor || 'Unknown Vendor',
+      rate: Number(lowestRateVendor.rate),
+      highestRate: highestRate,
+      savingsPercent: savingsPercent,
+      contactInfo: '',
+      vehicleType: lane.column
+    };
   });
 
   // Prepare data for display
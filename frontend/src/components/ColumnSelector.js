@@ -3,7 +3,7 @@ import { Box, Typography, FormControl, InputLabel, Select, MenuItem, Checkbox, L
 import ExpandMoreIcon from '@mui/icons-material/ExpandMore';
 import ExpandLessIcon from '@mui/icons-material/ExpandLess';
 
-function ColumnSelector({ previewData, columnVisibility, setColumnVisibility, VEHICLE_RATE_COLUMNS, showColumnSelector }) {
+function ColumnSelector({ previewData, columnVisibility, setColumnVisibility, isVehicleRateColumn, showColumnSelector }) {
   const [open, setOpen] = useState(true);
   if (!showColumnSelector || !previewData.length) return null;
   return (
@@ -64,9 +64,7 @@ function ColumnSelector({ previewData, columnVisibility, setColumnVisibility, VE
                   <Checkbox checked={columnVisibility[idx] !== false} />
                   <ListItemText 
                     primary={col} 
-                    secondary={VEHICLE_RATE_COLUMNS.some(v => 
-                      v.toUpperCase() === col.toString().trim().toUpperCase()
-                    ) ? 'Vehicle Rate Column' : 'Data Column'}
+                    secondary={isVehicleRateColumn(col) ? 'Vehicle Rate Column' : 'Data Column'}
                   />
                 </MenuItem>
               ))}
@@ -17,14 +17,9 @@ import {
   LocalShipping, AttachMoney, Timeline, PieChart as PieChartIcon,
   Speed, CompareArrows, Visibility, VisibilityOff, Refresh
 } from '@mui/icons-material';
-import { getDashboardAnalytics } from '../services/api';
-import axios from 'axios';
+import { getDashboardAnalytics, getVendorRates, subscribeToDataChanges } from '../services/api';
 
 // Constants
-const API_URL = process.env.REACT_APP_API_URL || 
-  (window.location.hostname === 'localhost' ? 
-    'http://localhost:5000/api' : 
-    'https://logistics-services-4ikv.onrender.com/api');
 const COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#8884d8', '#82ca9d'];
 const ANOMALY_THRESHOLD = 25; // Percentage threshold for anomaly detection
 
@@ -61,9 +56,9 @@ function Dashboard() {
     
     async function fetchVendorRates() {
       try {
-        const response = await axios.get(`${API_URL}/vendor-rates`);
-        if (response.data && response.data.success) {
-          setVendorRates(response.data.rates || []);
+        const response = await getVendorRates();
+        if (response && response.success) {
+          setVendorRates(response.rates || []);
         }
       } catch (err) {
         console.error("Error fetching vendor rates:", err);
@@ -74,6 +69,9 @@ function Dashboard() {
     fetchAnalytics();
   }, [refreshing]);
 
+  // Reload when the backend announces a new data generation
+  useEffect(() => subscribeToDataChanges(() => setRefreshing(prev => !prev)), []);
+
   // Handle manual refresh of dashboard data
   const handleRefresh = () => {
     setRefreshing(prev => !prev);
@@ -1,7 +1,7 @@
 import React from 'react';
 import { Box, Typography, Paper, Table, TableBody, TableCell, TableContainer, TableHead, TableRow } from '@mui/material';
 
-function OutputPreview({ previewData, getVisibleColumns, handleCellClick, VEHICLE_RATE_COLUMNS }) {
+function OutputPreview({ previewData, getVisibleColumns, handleCellClick, isVehicleRateColumn }) {
   if (!previewData.length) return null;
   return (
     <Box mt={4}>
@@ -14,9 +14,7 @@ function OutputPreview({ previewData, getVisibleColumns, handleCellClick, VEHICL
                 {getVisibleColumns().map((col) => (
                   <TableCell key={col.index} sx={{ 
                     fontWeight: 'bold',
-                    backgroundColor: VEHICLE_RATE_COLUMNS.some(v => 
-                      v.toUpperCase() === col.name.toString().trim().toUpperCase()
-                    ) ? '#e3f2fd' : '#f3f6fa',
+                    backgroundColor: isVehicleRateColumn(col.name) ? '#e3f2fd' : '#f3f6fa',
                     position: 'sticky',
                     top: 0,
                     zIndex: 2
@@ -31,26 +29,23 @@ function OutputPreview({ previewData, getVisibleColumns, handleCellClick, VEHICL
                 <TableRow key={rIdx}>
                   {getVisibleColumns().map((col) => {
                     const cell = row[col.index];
-                    const colName = col.name.toString().toUpperCase();
-                    const isVehicleRateColumn = VEHICLE_RATE_COLUMNS.some(col =>
-                      col.toUpperCase() === colName
-                    );
+                    const isRateColumn = isVehicleRateColumn(col.name);
                     const isNumericRate = !isNaN(Number(cell)) && Number(cell) > 0;
                     
                     return (
                       <TableCell
                         key={col.index}
                         sx={{
-                          backgroundColor: isVehicleRateColumn && isNumericRate ? '#e8f5e8' : 'inherit',
-                          fontWeight: isVehicleRateColumn && isNumericRate ? 'bold' : 'normal',
-                          color: isVehicleRateColumn && isNumericRate ? '#2e7d32' : 'inherit',
-                          border: isVehicleRateColumn ? '2px solid #4caf50' : '1px solid #d0d7de',
-                          cursor: isVehicleRateColumn && isNumericRate ? 'pointer' : 'default',
+                          backgroundColor: isRateColumn && isNumericRate ? '#e8f5e8' : 'inherit',
+                          fontWeight: isRateColumn && isNumericRate ? 'bold' : 'normal',
+                          color: isRateColumn && isNumericRate ? '#2e7d32' : 'inherit',
+                          border: isRateColumn ? '2px solid #4caf50' : '1px solid #d0d7de',
+                          cursor: isRateColumn && isNumericRate ? 'pointer' : 'default',
                           position: 'relative'
                         }}
                         onClick={(e) => handleCellClick(e, rIdx + 1, col.index)}
                       >
-                        {isVehicleRateColumn && isNumericRate ? `₹${cell}` : cell}
+                        {isRateColumn && isNumericRate ? `₹${cell}` : cell}
                       </TableCell>
                     );
                   })}
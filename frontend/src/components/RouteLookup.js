@@ -1,7 +1,8 @@
 import React, { useEffect, useState } from 'react';
-import { Box, Typography, CircularProgress, Paper, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, TextField, IconButton } from '@mui/material';
+import { Box, Typography, CircularProgress, Paper, Table, TableBody, TableCell, TableContainer, TableHead, TableRow, TablePagination, TextField, IconButton } from '@mui/material';
 import SearchIcon from '@mui/icons-material/Search';
 import axios from 'axios';
+import { subscribeToDataChanges } from '../services/api';
 
 const API_URL = process.env.REACT_APP_API_URL || 
   (window.location.hostname === 'localhost' ? 
@@ -9,109 +10,66 @@ const API_URL = process.env.REACT_APP_API_URL ||
     'https://logistics-services-4ikv.onrender.com/api');
 
 function RouteLookup() {
-  const [vendorRates, setVendorRates] = useState([]);
+  const [lanes, setLanes] = useState([]);
+  const [totalLanes, setTotalLanes] = useState(0);
   const [loading, setLoading] = useState(true);
   const [routeSearch, setRouteSearch] = useState('');
   const [routeSearchInput, setRouteSearchInput] = useState('');
+  const [page, setPage] = useState(0);
+  const [rowsPerPage, setRowsPerPage] = useState(50);
+  const [generation, setGeneration] = useState(null);
 
+  // Refetch the current page when the backend swaps in new data
+  useEffect(() => subscribeToDataChanges(info => setGeneration(info.generation)), []);
+
+  // Lane summaries (highest, second highest, three lowest, savings) are
+  // precomputed by the backend per data generation and searched/paged there
   useEffect(() => {
     async function fetchData() {
       setLoading(true);
-      const resp = await axios.get(`${API_URL}/vendor-rates`);
-      if (resp.data && resp.data.success) {
-        setVendorRates(resp.data.rates);
+      try {
+        const resp = await axios.get(`${API_URL}/lanes`, {
+          params: { search: routeSearch, page: page + 1, page_size: rowsPerPage }
+        });
+        if (resp.data && resp.data.success) {
+          setLanes(resp.data.lanes);
+          setTotalLanes(resp.data.total);
+        }
+      } finally {
+        setLoading(false);
       }
-      setLoading(false);
     }
     fetchData();
-  }, []);
+  }, [routeSearch, page, rowsPerPage, generation]);
 
-  // Prepare route comparison data with highest, second highest, and lowest rates
-  const routeComparisonData = React.useMemo(() => {
-    if (!vendorRates.length) return [];
-    
-    // Group by route+vehicle
-    const grouped = {};
-    vendorRates.forEach(r => {
-      if (!r.from_origin || !r.area || !r.vendor_name || !r.rate) return;
-      
-      const key = `${r.from_origin}  ${r.area} | ${r.vehicle_type || 'Unknown'}`;
-      if (!grouped[key]) {
-        grouped[key] = {
-          route: key,
-          origin: r.from_origin || '',
-          dest: r.area || '',
-          vehicle: r.vehicle_type || 'Unknown',
-          rates: []
-        };
-      }
-      
-      grouped[key].rates.push({
-        vendor: r.vendor_name,
-        rate: Number(r.rate)
-      });
-    });
-    
-    // Process each route to get highest, second highest, and lowest rates
-    const processedRoutes = Object.values(grouped).map(route => {
-      // Sort rates from highest to lowest
-      const sortedRates = [...route.rates].sort((a, b) => b.rate - a.rate);
-      
-      // Get highest and second highest rates
-      const highest = sortedRates[0] || { vendor: '-', rate: 0 };
-      const secondHighest = sortedRates[1] || { vendor: '-', rate: 0 };
-      
-      // Get three lowest rates (from the end of the sorted array)
-      const lowestRates = sortedRates.slice(-3).reverse();
+  const filteredRows = React.useMemo(() => {
+    const empty = { vendor: '-', rate: 0 };
+    return lanes.map(lane => {
+      // Same column order as before: lowest first, padded to three
+      const lowestRates = [...lane.lowest];
       while (lowestRates.length < 3) {
-        lowestRates.push({ vendor: '-', rate: 0 });
+        lowestRates.push(empty);
       }
-      
-      // Check if there's no potential for savings
-      // This happens when:
-      // 1. There's only one unique vendor with non-zero rates
-      // 2. All non-zero rates are the same
-      const nonZeroRates = sortedRates.filter(r => r.rate > 0);
-      const uniqueVendorsWithRates = new Set(nonZeroRates.map(r => r.vendor));
-      const uniqueRateValues = new Set(nonZeroRates.map(r => r.rate));
-      
-      // If there's only one vendor with rates or all rates are the same, no savings potential
-      const noSavingsPotential = uniqueVendorsWithRates.size <= 1 || uniqueRateValues.size <= 1;
-      
-      // Find the lowest non-zero rate for accurate savings calculation
-      const lowestNonZeroRate = nonZeroRates.length > 0 ? nonZeroRates[nonZeroRates.length - 1].rate : 0;
-      
-      // Calculate potential savings (difference between highest and lowest non-zero rate)
-      const potentialSavings = noSavingsPotential ? 0 : highest.rate - lowestNonZeroRate;
-      const savingsPercentage = noSavingsPotential ? 0 : (highest.rate > 0 ? ((potentialSavings / highest.rate) * 100).toFixed(1) : 0);
-      
       return {
-        ...route,
-        highest,
-        secondHighest,
+        origin: lane.from_origin,
+        dest: lane.area,
+        vehicle: lane.vehicle_type || 'Unknown',
+        highest: lane.highest || empty,
+        secondHighest: lane.second_highest || empty,
         thirdLowest: lowestRates[0],
         secondLowest: lowestRates[1],
         lowest: lowestRates[2],
-        potentialSavings,
-        savingsPercentage,
-        noSavingsPotential
+        potentialSavings: lane.potential_savings,
+        savingsPercentage: lane.savings_percentage,
+        noSavingsPotential: lane.no_savings_potential
       };
     });
-    
-    // Sort by potential savings (highest first)
-    return processedRoutes.sort((a, b) => b.potentialSavings - a.potentialSavings);
-  }, [vendorRates]);
+  }, [lanes]);
 
-  // Filtered rows based on search
-  const filteredRows = React.useMemo(() => {
-    if (!routeSearch) return routeComparisonData;
-    const search = routeSearch.toLowerCase();
-    return routeComparisonData.filter(row =>
-      row.origin.toLowerCase().includes(search) ||
-      row.dest.toLowerCase().includes(search) ||
-      row.vehicle.toLowerCase().includes(search)
-    );
-  }, [routeComparisonData, routeSearch]);
+  const applySearch = () => {
+    setPage(0);
+    setRouteSearch(routeSearchInput.trim());
+  };
 
   return (
     <Box sx={{ maxWidth: 1200, mx: 'auto', p: 3 }}>
@@ -133,9 +91,9 @@ function RouteLookup() {
               onChange={e => setRouteSearchInput(e.target.value)}
               placeholder="Search routes..."
               sx={{ width: 250 }}
-              onKeyDown={e => { if (e.key === 'Enter') setRouteSearch(routeSearchInput); }}
+              onKeyDown={e => { if (e.key === 'Enter') applySearch(); }}
             />
-            <IconButton onClick={() => setRouteSearch(routeSearchInput)}>
+            <IconButton onClick={applySearch}>
               <SearchIcon />
             </IconButton>
           </Box>
@@ -215,6 +173,15 @@ function RouteLookup() {
               </TableBody>
             </Table>
           </TableContainer>
+          <TablePagination
+            component="div"
+            count={totalLanes}
+            page={page}
+            onPageChange={(e, newPage) => setPage(newPage)}
+            rowsPerPage={rowsPerPage}
+            onRowsPerPageChange={e => { setRowsPerPage(parseInt(e.target.value, 10)); setPage(0); }}
+            rowsPerPageOptions={[25, 50, 100, 250]}
+          />
         </>
       )}
     </Box>
@@ -21,14 +21,7 @@ import WarningIcon from '@mui/icons-material/Warning';
 import TrendingDownIcon from '@mui/icons-material/TrendingDown';
 import TrendingUpIcon from '@mui/icons-material/TrendingUp';
 import { useTheme } from '@mui/material/styles';
-import axios from 'axios';
-
-// API URL configuration for both development and production environments
-const API_URL = process.env.REACT_APP_API_BASE_URL || 
-  (window.location.hostname === 'localhost' ? 
-    'http://localhost:5000/api' : 
-    'https://logistics-services-4ikv.onrender.com/api');
-console.log(`Using API URL: ${API_URL}`);
+import { getVendorRates } from '../services/api';
 
 // Price tag colors
 const priceTagColors = {
@@ -66,12 +59,10 @@ function VendorComparison() {
       setError(null);
       
       try {
-        const resp = await axios.get(`${API_URL}/vendor-rates`, {
-          timeout: 8000
-        });
+        const resp = await getVendorRates();
         
-        if (resp.data && resp.data.success) {
-          const rates = resp.data.rates || [];
+        if (resp && resp.success) {
+          const rates = resp.rates || [];
           setAllVendorRates(rates);
           
           // Extract unique vendors, sort alphabetically
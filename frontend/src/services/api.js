@@ -45,6 +45,71 @@ const apiCache = {
 // Cache expiration time (5 minutes)
 const CACHE_EXPIRY = 5 * 60 * 1000;
 
+// Data generation pushed by the backend over Server-Sent Events. While the
+// stream is connected, cached responses stay valid until the generation
+// changes; if it drops, caching falls back to CACHE_EXPIRY.
+const EVENTS_RETRY_MS = 5 * 60 * 1000;
+const dataEvents = {
+  source: null,
+  connected: false,
+  generation: null,
+  listeners: new Set()
+};
+
+const clearDataCache = () => {
+  apiCache.vendorRates = null;
+  apiCache.vendorRatesTimestamp = null;
+  apiCache.vendors = null;
+  apiCache.vendorsTimestamp = null;
+};
+
+const connectDataEvents = () => {
+  if (dataEvents.source || typeof window === 'undefined' || !window.EventSource) {
+    return;
+  }
+  const source = new EventSource(`${API_BASE_URL}/events`);
+  dataEvents.source = source;
+  source.onopen = () => {
+    dataEvents.connected = true;
+  };
+  source.onerror = () => {
+    // EventSource reconnects on its own; use time-based expiry meanwhile
+    dataEvents.connected = false;
+    if (source.readyState === EventSource.CLOSED) {
+      // The server turned the stream down (204: streams off, 503: too many
+      // subscribers) and EventSource will not retry; try again much later
+      dataEvents.source = null;
+      setTimeout(connectDataEvents, EVENTS_RETRY_MS);
+    }
+  };
+  source.addEventListener('generation', (event) => {
+    const info = JSON.parse(event.data);
+    const previous = dataEvents.generation;
+    dataEvents.generation = info.generation;
+    const cachedGeneration = apiCache.vendorRates && apiCache.vendorRates.generation;
+    if (previous !== info.generation || (cachedGeneration && cachedGeneration !== info.generation)) {
+      clearDataCache();
+    }
+    if (previous !== null && previous !== info.generation) {
+      console.log(`Data generation ${info.generation}: ${info.changed_lane_count} lanes changed`);
+      dataEvents.listeners.forEach(listener => listener(info));
+    }
+  });
+};
+
+const isCacheFresh = (timestamp) => {
+  if (!timestamp) return false;
+  return dataEvents.connected || (Date.now() - timestamp < CACHE_EXPIRY);
+};
+
+// Call listener(info) whenever the backend swaps in a new data generation.
+// Returns an unsubscribe function.
+export const subscribeToDataChanges = (listener) => {
+  connectDataEvents();
+  dataEvents.listeners.add(listener);
+  return () => dataEvents.listeners.delete(listener);
+};
+
 export const searchQuotations = async (params) => {
   // Add max_results parameter to get all available results
   const searchParams = {
@@ -60,12 +125,17 @@ export const getDashboardAnalytics = async () => {
   return response.data;
 };
 
+// Canonical vehicle classes with their aliases
+export const getVehicleTypes = async () => {
+  const response = await axios.get(`${API_BASE_URL}/vehicle-types`);
+  return response.data;
+};
+
 // Cached and throttled vendor rates API
 export const getVendorRates = async () => {
+  connectDataEvents();
   // Check if we have a valid cached response
-  const now = Date.now();
-  if (apiCache.vendorRates && apiCache.vendorRatesTimestamp && 
-      (now - apiCache.vendorRatesTimestamp < CACHE_EXPIRY)) {
+  if (apiCache.vendorRates && isCacheFresh(apiCache.vendorRatesTimestamp)) {
     console.log('Using cached vendor rates data');
     return apiCache.vendorRates;
   }
@@ -115,10 +185,9 @@ export const getVendorRates = async () => {
 
 // Get all vendors
 export const getVendors = async () => {
+  connectDataEvents();
   // Check if we have a valid cached response
-  const now = Date.now();
-  if (apiCache.vendors && apiCache.vendorsTimestamp && 
-      (now - apiCache.vendorsTimestamp < CACHE_EXPIRY)) {
+  if (apiCache.vendors && isCacheFresh(apiCache.vendorsTimestamp)) {
     console.log('Using cached vendors data');
     return apiCache.vendors;
   }
@@ -159,3 +228,46 @@ export const getVendors = async () => {
   
   return apiCache.pendingVendorsPromise;
 };
+
+// Bulk quotation reports are generated by the backend in background jobs.
+// Uploads the lane sheet and returns { success, job, status_url }.
+export const createReport = async (file, percent, formats = ['xlsx']) => {
+  const form = new FormData();
+  form.append('file', file);
+  form.append('percent', percent);
+  form.append('formats', formats.join(','));
+  const response = await axios.post(`${API_BASE_URL}/reports`, form, { timeout: 120000 });
+  return response.data;
+};
+
+export const getReport = async (jobId) => {
+  const response = await axios.get(`${API_BASE_URL}/reports/${jobId}`);
+  return response.data;
+};
+
+// Poll a report job until it is done or failed; onProgress(job) sees each update
+export const waitForReport = async (jobId, onProgress, interval = 1000) => {
+  for (;;) {
+    const { job } = await getReport(jobId);
+    if (onProgress) onProgress(job);
+    if (job.state === 'done' || job.state === 'failed') {
+      return job;
+    }
+    await new Promise(resolve => setTimeout(resolve, interval));
+  }
+};
+
+// First rows of a finished report before the markup: { header, rows, lanes }
+export const getReportPreview = async (jobId) => {
+  const response = await axios.get(`${API_BASE_URL}/reports/${jobId}/preview`);
+  return response.data;
+};
+
+export const getReportDownloadUrl = (jobId, format) =>
+  `${API_BASE_URL}/reports/${jobId}/download/${format}`;
+
+// A finished report's file as an ArrayBuffer
+export const getReportFile = async (jobId, format) => {
+  const response = await axios.get(getReportDownloadUrl(jobId, format), { responseType: 'arraybuffer', timeout: 120000 });
+  return response.data;
+};